@@ -0,0 +1,154 @@
+"""Compare the Pydantic-model estimator with the slotted-record pipeline.
+
+Usage: python benchmarks/bench_estimator.py [--estimates 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from pydantic_core import to_json
+
+from vic_rego_estimator.models.schemas import EstimateResult, FeeLineItem, FeeSnapshot, NormalizedVehicleRequest
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+from vic_rego_estimator.tools.estimator import ESTIMATE_RECORD_ADAPTER, estimate_record, estimate_registration_cost
+from vic_rego_estimator.tools.fee_schedule import BUSINESS_ADMIN_FEE, compile_fee_schedule
+from vic_rego_estimator.tools.normalize import normalize_vehicle_request
+
+
+def legacy_estimate(normalized: NormalizedVehicleRequest, snapshot: FeeSnapshot) -> EstimateResult:
+    # The previous implementation: FeeLineItem models throughout and a nested override loop.
+    schedule = compile_fee_schedule(snapshot)
+    lines: list[FeeLineItem] = []
+    assumptions = list(normalized.assumptions)
+    reg_fee = schedule.registration_fee[(normalized.vehicle_category, normalized.term_months)]
+    tac = schedule.tac_charge[normalized.term_months]
+    concessions_applied = [
+        flag for flag, enabled in normalized.concession_flags.items() if enabled and flag in schedule.concession_names
+    ]
+    reg_fee *= schedule.concession_discounts[frozenset(concessions_applied)]
+    lines.append(FeeLineItem(key="registration_fee", label="Registration fee", amount_min=round(reg_fee, 2), amount_max=round(reg_fee, 2), source=schedule.source_at(0)))
+    lines.append(FeeLineItem(key="tac_charge", label="TAC charge", amount_min=round(tac, 2), amount_max=round(tac, 2), source=schedule.source_at(0)))
+    if normalized.transaction_type == "transfer":
+        lines.append(FeeLineItem(key="transfer_fee", label="Transfer fee", amount_min=schedule.transfer_fee, amount_max=schedule.transfer_fee, source=schedule.source_at(2)))
+        if normalized.market_value_aud is None:
+            duty_min, duty_max = schedule.unknown_value_duty
+            assumptions.append("Used $10k-$45k market value range for duty.")
+        else:
+            duty_min = duty_max = schedule.duty_amount(normalized.market_value_aud)
+        lines.append(FeeLineItem(key="motor_vehicle_duty", label="Motor vehicle duty (stamp duty)", amount_min=duty_min, amount_max=duty_max, source=schedule.source_at(3)))
+    if normalized.transaction_type == "new_registration":
+        lines.append(FeeLineItem(key="number_plate_fee", label="Number plate fee", amount_min=schedule.number_plate_fee, amount_max=schedule.number_plate_fee, source=schedule.source_at(0)))
+    if normalized.use_type == "business":
+        lines.append(FeeLineItem(key="business_admin", label="Business processing surcharge", amount_min=BUSINESS_ADMIN_FEE, amount_max=BUSINESS_ADMIN_FEE, source=schedule.source_at(0), notes="May vary by channel."))
+    for key, value in normalized.manual_overrides.items():
+        for line in lines:
+            if line.key == key:
+                line.amount_min = value
+                line.amount_max = value
+                line.notes = "Manually overridden in widget"
+    total_min = round(sum(item.amount_min for item in lines), 2)
+    total_max = round(sum(item.amount_max for item in lines), 2)
+    uncertainty_points = len(normalized.unknown_fields) + (1 if total_min != total_max else 0)
+    confidence = "high" if uncertainty_points == 0 else "medium" if uncertainty_points <= 2 else "low"
+    return EstimateResult(
+        transaction_type=normalized.transaction_type,
+        vehicle_category=normalized.vehicle_category,
+        total_min=total_min,
+        total_max=total_max,
+        confidence=confidence,
+        confidence_score=max(0.3, round(1 - uncertainty_points * 0.15, 2)),
+        line_items=lines,
+        assumptions=assumptions,
+        concessions_applied=concessions_applied,
+        last_refresh=snapshot.refreshed_at,
+        source_urls=snapshot.sources,
+    )
+
+
+# (estimate function, serializer) per variant; records go through their TypeAdapter.
+VARIANTS = {
+    "legacy models": (legacy_estimate, to_json),
+    "records -> models": (estimate_registration_cost, to_json),
+    "records": (estimate_record, ESTIMATE_RECORD_ADAPTER.dump_json),
+}
+
+
+def _requests(count: int) -> list[NormalizedVehicleRequest]:
+    rng = random.Random(1)
+    requests = []
+    for _ in range(count):
+        requests.append(
+            normalize_vehicle_request(
+                {
+                    "transaction_type": rng.choice(["renewal", "transfer", "new_registration"]),
+                    "vehicle_category": rng.choice(["passenger_car", "motorcycle", "bus"]),
+                    "use_type": rng.choice(["private", "business"]),
+                    "market_value_aud": rng.choice([None, 25000, 80000]),
+                    "concession_flags": {"pensioner": rng.random() < 0.3},
+                    "manual_overrides": {"tac_charge": 500.0} if rng.random() < 0.2 else {},
+                }
+            )
+        )
+    return requests
+
+
+def _best_of(work, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        work()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(estimates: int) -> None:
+    snapshot = fallback_snapshot()
+    requests = _requests(estimates)
+    print(f"{estimates:,} estimates, line items 2-5 per estimate")
+    for name, (estimate, serialize) in VARIANTS.items():
+        for normalized in requests[:1000]:
+            serialize(estimate(normalized, snapshot))
+
+        def compute_only():
+            for normalized in requests:
+                estimate(normalized, snapshot)
+
+        def compute_and_serialize():
+            for normalized in requests:
+                serialize(estimate(normalized, snapshot))
+
+        compute = _best_of(compute_only)
+        to_bytes = _best_of(compute_and_serialize)
+
+        # Retained memory: keep every result alive and measure what it costs.
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        results = [estimate(normalized, snapshot) for normalized in requests]
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        blocks = sys.getallocatedblocks() - blocks_before
+        del results
+
+        print(
+            f"  {name:<18} estimate {compute / estimates * 1e6:6.2f} us"
+            f"  estimate+to_json {to_bytes / estimates * 1e6:6.2f} us"
+            f"  retained {retained / estimates:6.0f} B, {blocks / estimates:5.1f} blocks per result"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--estimates", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.estimates)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare /mcp latency through the combined ASGI middleware and the old BaseHTTPMiddleware stack.
+
+Usage: python benchmarks/bench_middleware.py [--requests 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+import vic_rego_estimator.main as main_module
+from vic_rego_estimator.main import MCPGatewayMiddleware, app
+
+PAYLOAD = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+
+
+def build_stack(user_middleware: list[Middleware]):
+    app.user_middleware = user_middleware
+    return app.build_middleware_stack()
+
+
+def legacy_middleware() -> list[Middleware]:
+    # The three @app.middleware("http") layers as they were registered; the last
+    # registered layer (rate limiting) ends up outermost.
+    async def request_audit_log(request, call_next):
+        request.state.request_id = request.headers.get("x-request-id") or str(uuid4())
+        started_at = time.perf_counter()
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request.state.request_id
+        MCPGatewayMiddleware._audit(request, request.state.request_id, response.status_code, started_at)
+        return response
+
+    async def enforce_mcp_auth(request, call_next):
+        return await call_next(request)
+
+    async def enforce_mcp_rate_limit(request, call_next):
+        decision = await main_module.rate_limiter.check(main_module._request_identity(request))
+        if not decision.allowed:
+            return main_module._rate_limited_response(request, decision)
+        return await call_next(request)
+
+    return [
+        Middleware(BaseHTTPMiddleware, dispatch=dispatch)
+        for dispatch in (enforce_mcp_rate_limit, enforce_mcp_auth, request_audit_log)
+    ]
+
+
+async def _measure(asgi_app, requests: int) -> list[float]:
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):
+            await client.post("/mcp", json=PAYLOAD)
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.post("/mcp", json=PAYLOAD)
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    for logger_name in ("vic_rego_estimator", "httpx"):
+        logging.getLogger(logger_name).setLevel(logging.WARNING)
+    main_module.authenticator = None
+    main_module.rate_limiter.max_requests = 10**9
+
+    stacks = {
+        "BaseHTTPMiddleware x3": build_stack(legacy_middleware()),
+        "MCPGatewayMiddleware": build_stack([Middleware(MCPGatewayMiddleware)]),
+    }
+    for name, asgi_app in stacks.items():
+        samples = sorted(asyncio.run(_measure(asgi_app, args.requests)))
+        print(
+            f"{name:<24} mean {statistics.fmean(samples) * 1e6:7.0f} us"
+            f"  p50 {samples[len(samples) // 2] * 1e6:7.0f} us"
+            f"  p99 {samples[int(len(samples) * 0.99)] * 1e6:7.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
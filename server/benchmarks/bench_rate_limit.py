@@ -0,0 +1,83 @@
+"""Compare the in-memory rate limiters at a large number of distinct identities.
+
+Usage: python benchmarks/bench_rate_limit.py [--identities 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from vic_rego_estimator.rate_limit import GCRARateLimiter, SlidingWindowRateLimiter
+
+LIMITERS = {
+    "sliding-window (deque)": SlidingWindowRateLimiter,
+    "gcra (ordered TAT)": GCRARateLimiter,
+}
+
+
+async def _fill(limiter, identities: int, requests_per_identity: int, start: float) -> float:
+    started = time.perf_counter()
+    for round_index in range(requests_per_identity):
+        now = start + round_index
+        for index in range(identities):
+            await limiter.check(f"ip:{index}", now=now)
+    return time.perf_counter() - started
+
+
+async def _hot_key(limiter, checks: int, start: float) -> float:
+    started = time.perf_counter()
+    for index in range(checks):
+        await limiter.check("sub:hot", now=start + index * 0.001)
+    return time.perf_counter() - started
+
+
+def _state_size(limiter) -> int:
+    return len(limiter._requests) if hasattr(limiter, "_requests") else len(limiter)
+
+
+def run(identities: int, requests_per_identity: int, max_requests: int, window_seconds: int) -> None:
+    total = identities * requests_per_identity
+    print(f"{identities:,} identities x {requests_per_identity} requests, limit {max_requests}/{window_seconds}s")
+    for name, factory in LIMITERS.items():
+        gc.collect()
+        limiter = factory(max_requests=max_requests, window_seconds=window_seconds)
+        elapsed = asyncio.run(_fill(limiter, identities, requests_per_identity, start=0.0))
+
+        gc.collect()
+        tracemalloc.start()
+        measured = factory(max_requests=max_requests, window_seconds=window_seconds)
+        asyncio.run(_fill(measured, identities, requests_per_identity, start=0.0))
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        hot = asyncio.run(_hot_key(factory(max_requests=max_requests, window_seconds=window_seconds), 100_000, 0.0))
+        # One request after every identity has gone idle shows what is retained.
+        asyncio.run(limiter.check("ip:late", now=window_seconds * 1000.0))
+        if hasattr(limiter, "sweep"):
+            limiter.sweep(now=window_seconds * 1000.0)
+
+        print(
+            f"  {name:<24} fill {elapsed / total * 1e9:8.0f} ns/check"
+            f"  hot key {hot / 100_000 * 1e9:6.0f} ns/check"
+            f"  memory {current / 1024 / 1024:8.1f} MiB ({current / identities:6.0f} B/identity)"
+            f"  keys retained when idle {_state_size(limiter):,}"
+        )
+        del limiter, measured
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--identities", type=int, default=1_000_000)
+    parser.add_argument("--requests-per-identity", type=int, default=3)
+    parser.add_argument("--max-requests", type=int, default=60)
+    parser.add_argument("--window-seconds", type=int, default=60)
+    args = parser.parse_args()
+    run(args.identities, args.requests_per_identity, args.max_requests, args.window_seconds)
+
+
+if __name__ == "__main__":
+    main()
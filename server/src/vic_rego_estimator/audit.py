@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import sys
+from collections.abc import Callable
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the optional "audit" extra
+    orjson = None
+
+from vic_rego_estimator.config import settings
+
+ALWAYS_LOGGED_STATUS = 400
+
+
+def dumps(payload: dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str).decode()
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    # Never blocks the caller: when the writer falls behind, events are counted and dropped.
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The message is already an encoded JSON string; skip the copy and re-format.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AuditLog:
+    # Request audit events are encoded on the request path and written by a
+    # QueueListener thread, so a slow stdout never stalls the event loop. Healthy
+    # responses are sampled at sample_rate; 4xx/5xx (including 401/403/429) always log.
+    def __init__(
+        self,
+        sample_rate: float,
+        queue_size: int,
+        handlers: list[logging.Handler] | None = None,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self._rng = rng
+        self._queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=queue_size)
+        self._queue_handler = DroppingQueueHandler(self._queue)
+        self._logger = logging.Logger("vic_rego_estimator.audit", logging.INFO)
+        self._logger.addHandler(self._queue_handler)
+        if handlers is None:
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(logging.Formatter("%(message)s"))
+            handlers = [stream]
+        self._listener = QueueListener(self._queue, *handlers)
+        self._running = False
+        self.sampled_out = 0
+
+    @classmethod
+    def from_settings(cls) -> AuditLog:
+        return cls(sample_rate=settings.audit_sample_rate, queue_size=settings.audit_queue_size)
+
+    @property
+    def dropped(self) -> int:
+        return self._queue_handler.dropped
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def record(self, event: dict[str, Any]) -> None:
+        if event.get("status_code", 500) < ALWAYS_LOGGED_STATUS and self._rng() >= self.sample_rate:
+            self.sampled_out += 1
+            return
+        self._logger.info(dumps(event))
+
+    def start(self) -> None:
+        if not self._running:
+            self._listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        # Drains whatever is queued before returning.
+        if self._running:
+            self._listener.stop()
+            self._running = False
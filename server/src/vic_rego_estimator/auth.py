@@ -1,20 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import json
 import logging
+import re
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 
+from vic_rego_estimator.cache import LRUCache
 from vic_rego_estimator.config import settings
 
 logger = logging.getLogger("vic_rego_estimator")
 
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
 
 class AuthError(Exception):
     def __init__(self, message: str, error: str = "invalid_token", status_code: int = 401) -> None:
@@ -33,6 +39,18 @@ class OIDCAuthenticator:
     authorization_url: str
     algorithms: list[str]
     required_scope: str | None
+    jwks_cache: JWKSCache | None = field(default=None)
+    token_cache: LRUCache[bytes, dict[str, Any]] | None = field(default=None)
+
+    def __post_init__(self) -> None:
+        if self.jwks_cache is None:
+            self.jwks_cache = JWKSCache(
+                self.jwks_url,
+                ttl_seconds=settings.oidc_jwks_cache_ttl_seconds,
+                min_refetch_interval_seconds=settings.oidc_jwks_min_refetch_seconds,
+            )
+        if self.token_cache is None:
+            self.token_cache = LRUCache(max_size=settings.oidc_token_cache_size)
 
     @classmethod
     def from_settings(cls) -> OIDCAuthenticator | None:
@@ -62,7 +80,10 @@ class OIDCAuthenticator:
             required_scope=settings.oidc_required_scope,
         )
 
-    def validate_authorization_header(self, authorization_header: str | None) -> dict[str, Any]:
+    async def aclose(self) -> None:
+        await self.jwks_cache.aclose()
+
+    async def validate_authorization_header(self, authorization_header: str | None) -> dict[str, Any]:
         if not authorization_header:
             raise AuthError("Missing bearer token", error="invalid_request")
 
@@ -70,16 +91,24 @@ class OIDCAuthenticator:
         if scheme.lower() != "bearer" or not token:
             raise AuthError("Authorization header must be a bearer token", error="invalid_request")
 
-        return self.validate_token(token)
+        return await self.validate_token(token)
+
+    async def validate_token(self, token: str) -> dict[str, Any]:
+        # Tokens that already passed signature, issuer, audience and scope checks are
+        # cached until their exp; a hit only re-runs the time-based claim checks.
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        cached = self.token_cache.get(cache_key)
+        if cached is not None:
+            _validate_time_claims(cached)
+            return cached
 
-    def validate_token(self, token: str) -> dict[str, Any]:
         try:
             header, payload, signature, signing_input = _split_jwt(token)
             if header.get("alg") not in self.algorithms:
                 raise AuthError(f"Unsupported signing algorithm: {header.get('alg')}")
             if header.get("alg") != "RS256":
                 raise AuthError("Only RS256 tokens are supported")
-            key = self._resolve_key(header)
+            key = await self._resolve_key(header)
             key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
             _validate_registered_claims(payload, issuer=self.issuer, audience=self.audience)
         except AuthError:
@@ -95,18 +124,15 @@ class OIDCAuthenticator:
                 status_code=403,
             )
 
+        self.token_cache.set(cache_key, payload, expires_at=float(payload["exp"]))
         return payload
 
-    def _resolve_key(self, header: dict[str, Any]) -> rsa.RSAPublicKey:
+    async def _resolve_key(self, header: dict[str, Any]) -> rsa.RSAPublicKey:
         kid = header.get("kid")
         if not kid:
             raise AuthError("Token header missing 'kid'")
 
-        jwks = _fetch_jwks(self.jwks_url)
-        for jwk in jwks.get("keys", []):
-            if jwk.get("kid") == kid:
-                return _jwk_to_rsa_public_key(jwk)
-        raise AuthError("Unable to find signing key for token")
+        return await self.jwks_cache.get_key(kid)
 
     def challenge_header(self, error: str, description: str) -> str:
         parts = [
@@ -122,6 +148,112 @@ class OIDCAuthenticator:
         return ", ".join(parts)
 
 
+class JWKSCache:
+    # kid -> RSA public key index. Keys are served from memory until the JWKS
+    # Cache-Control max-age (or the configured TTL) lapses; an unknown kid triggers a
+    # refetch, but never more than once per min_refetch_interval_seconds.
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl_seconds: float = 3600,
+        min_refetch_interval_seconds: float = 30,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.jwks_url = jwks_url
+        self.ttl_seconds = ttl_seconds
+        self.min_refetch_interval_seconds = min_refetch_interval_seconds
+        self._client = client
+        self._keys: dict[str, rsa.RSAPublicKey | None] = {}
+        self._expires_at = 0.0
+        self._last_fetch_at: float | None = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "fetches": self.fetches, "keys": len(self._keys)}
+
+    async def get_key(self, kid: str) -> rsa.RSAPublicKey:
+        if kid in self._keys and time.monotonic() < self._expires_at:
+            self.hits += 1
+            return _usable_key(self._keys[kid])
+
+        self.misses += 1
+        async with self._lock:
+            now = time.monotonic()
+            fresh = now < self._expires_at
+            if kid in self._keys and fresh:
+                return _usable_key(self._keys[kid])
+
+            recently_fetched = (
+                self._last_fetch_at is not None and now - self._last_fetch_at < self.min_refetch_interval_seconds
+            )
+            if not recently_fetched:
+                try:
+                    await self._refresh()
+                except Exception:
+                    if kid not in self._keys:
+                        raise
+                    logger.warning("JWKS refresh failed; using previously cached key", exc_info=True)
+
+        if kid not in self._keys:
+            raise AuthError("Unable to find signing key for token")
+        return _usable_key(self._keys[kid])
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=5.0)
+
+        self._last_fetch_at = time.monotonic()
+        self.fetches += 1
+        response = await self._client.get(self.jwks_url)
+        response.raise_for_status()
+
+        keys: dict[str, rsa.RSAPublicKey | None] = {}
+        for jwk in response.json().get("keys", []):
+            kid = jwk.get("kid")
+            if not kid:
+                continue
+            keys[kid] = _jwk_to_rsa_public_key(jwk) if jwk.get("kty") == "RSA" else None
+
+        self._keys = keys
+        self._expires_at = time.monotonic() + _cache_ttl(response.headers.get("cache-control"), self.ttl_seconds)
+
+
+def _cache_ttl(cache_control: str | None, default_ttl: float) -> float:
+    if not cache_control:
+        return default_ttl
+    directives = cache_control.lower()
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    match = MAX_AGE_RE.search(directives)
+    return float(match.group(1)) if match else default_ttl
+
+
+def _validate_time_claims(payload: dict[str, Any]) -> None:
+    now = int(time.time())
+
+    exp = payload.get("exp")
+    iat = payload.get("iat")
+
+    if not isinstance(exp, (int, float)) or now >= int(exp):
+        raise AuthError("Token is invalid or expired")
+    if not isinstance(iat, (int, float)) or int(iat) > now + 60:
+        raise AuthError("Token has invalid issue timestamp")
+
+
+def _usable_key(key: rsa.RSAPublicKey | None) -> rsa.RSAPublicKey:
+    if key is None:
+        raise AuthError("Only RSA JWK keys are supported")
+    return key
+
+
 def _split_jwt(token: str) -> tuple[dict[str, Any], dict[str, Any], bytes, bytes]:
     parts = token.split(".")
     if len(parts) != 3:
@@ -136,17 +268,11 @@ def _split_jwt(token: str) -> tuple[dict[str, Any], dict[str, Any], bytes, bytes
 
 
 def _validate_registered_claims(payload: dict[str, Any], issuer: str, audience: str) -> None:
-    now = int(time.time())
+    _validate_time_claims(payload)
 
-    exp = payload.get("exp")
-    iat = payload.get("iat")
     iss = payload.get("iss")
     aud = payload.get("aud")
 
-    if not isinstance(exp, (int, float)) or now >= int(exp):
-        raise AuthError("Token is invalid or expired")
-    if not isinstance(iat, (int, float)) or int(iat) > now + 60:
-        raise AuthError("Token has invalid issue timestamp")
     if iss != issuer:
         raise AuthError("Token issuer mismatch")
 
@@ -161,13 +287,6 @@ def _validate_registered_claims(payload: dict[str, Any], issuer: str, audience:
         raise AuthError("Token audience mismatch")
 
 
-def _fetch_jwks(jwks_url: str) -> dict[str, Any]:
-    with httpx.Client(timeout=5.0) as client:
-        response = client.get(jwks_url)
-        response.raise_for_status()
-        return response.json()
-
-
 def _jwk_to_rsa_public_key(jwk: dict[str, Any]) -> rsa.RSAPublicKey:
     if jwk.get("kty") != "RSA":
         raise AuthError("Only RSA JWK keys are supported")
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, TextIO
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without the optional "parquet" extra
+    pa = pq = None
+
+from vic_rego_estimator.models.schemas import FeeSnapshot
+from vic_rego_estimator.tools.bulk import (
+    CSV_RESULT_COLUMNS,
+    PayloadReader,
+    csv_line,
+    csv_result_values,
+    csv_row_payload,
+    ndjson_result,
+    price_row,
+)
+from vic_rego_estimator.tools.fee_schedule import compile_fee_schedule
+
+FORMATS_BY_SUFFIX = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+    ".parquet": "parquet",
+}
+
+Chunk = tuple[int, list[Any]]
+
+# Offline pricer for cron jobs: the same row pipeline as /estimate/stream, priced
+# against a pinned snapshot file in a process pool. Chunks are submitted through a
+# bounded window and collected first-in-first-out, so output order matches input order
+# and memory stays proportional to workers * chunk size, not to the input file.
+
+_worker_snapshot: FeeSnapshot | None = None
+
+
+def _init_worker(snapshot_json: bytes) -> None:
+    # Runs once per worker process; the schedule is compiled here and then reused for
+    # every chunk, so chunks carry only rows.
+    global _worker_snapshot
+    _worker_snapshot = FeeSnapshot.model_validate_json(snapshot_json)
+    compile_fee_schedule(_worker_snapshot)
+
+
+def _price_chunk(chunk: Chunk, output_format: str) -> tuple[Any, int]:
+    start, payloads = chunk
+    rows = [price_row(start + offset, payload, _worker_snapshot) for offset, payload in enumerate(payloads)]
+    errors = sum("error" in row for row in rows)
+    if output_format == "ndjson":
+        return b"".join(ndjson_result(row) for row in rows), errors
+    if output_format == "csv":
+        return "".join(csv_line(csv_result_values(row)) for row in rows), errors
+    return [_result_record(row) for row in rows], errors
+
+
+def _result_record(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        column: None if value == "" else value
+        for column, value in zip(CSV_RESULT_COLUMNS, csv_result_values(row))
+    }
+
+
+def detect_format(path: Path) -> str:
+    try:
+        return FORMATS_BY_SUFFIX[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Cannot infer format from {path.name}; use --format") from None
+
+
+def read_payloads(path: Path, input_format: str) -> Iterator[dict[str, Any] | Exception]:
+    if input_format == "parquet":
+        _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches():
+            for record in batch.to_pylist():
+                yield {key: value for key, value in record.items() if value is not None}
+        return
+    with path.open(newline="", encoding="utf-8") as handle:
+        if input_format == "csv":
+            # A real csv.reader over the file, so quoted cells may span lines here.
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return
+            for values in reader:
+                if values:
+                    yield csv_row_payload(header, values)
+        else:
+            yield from PayloadReader("ndjson").feed(line.rstrip("\r\n") for line in handle)
+
+
+def chunked(payloads: Iterable[Any], chunk_size: int) -> Iterator[Chunk]:
+    iterator = iter(payloads)
+    start = 0
+    while chunk := list(islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+class ResultWriter:
+    def __init__(self, path: Path, output_format: str) -> None:
+        self.output_format = output_format
+        self._parquet_writer = None
+        if output_format == "parquet":
+            _require_pyarrow()
+            self._path = path
+            self._handle = None
+        else:
+            self._handle = path.open("wb")
+            if output_format == "csv":
+                self._handle.write(csv_line(CSV_RESULT_COLUMNS).encode())
+
+    def write(self, encoded: Any) -> None:
+        if self.output_format == "ndjson":
+            self._handle.write(encoded)
+        elif self.output_format == "csv":
+            self._handle.write(encoded.encode())
+        elif encoded:
+            table = pa.Table.from_pylist(encoded, schema=_parquet_schema())
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self._path, table.schema)
+            self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+        elif self._parquet_writer is None:
+            pq.write_table(pa.Table.from_pylist([], schema=_parquet_schema()), self._path)
+        else:
+            self._parquet_writer.close()
+
+
+def _parquet_schema():
+    return pa.schema(
+        [
+            ("index", pa.int64()),
+            ("transaction_type", pa.string()),
+            ("vehicle_category", pa.string()),
+            ("total_min", pa.float64()),
+            ("total_max", pa.float64()),
+            ("confidence", pa.string()),
+            ("error", pa.string()),
+        ]
+    )
+
+
+def _require_pyarrow() -> None:
+    if pq is None:
+        raise SystemExit("Parquet support requires pyarrow: pip install 'vic-rego-estimator-server[parquet]'")
+
+
+class Progress:
+    def __init__(self, stream: TextIO | None, interval_seconds: float = 2.0) -> None:
+        self._stream = stream
+        self._interval = interval_seconds
+        self.started_at = time.perf_counter()
+        self._last_report = self.started_at
+        self.rows = 0
+        self.errors = 0
+
+    def update(self, rows: int, errors: int) -> None:
+        self.rows += rows
+        self.errors += errors
+        now = time.perf_counter()
+        if self._stream is not None and now - self._last_report >= self._interval:
+            self._last_report = now
+            self._report("progress", now)
+
+    def finish(self) -> dict[str, float]:
+        now = time.perf_counter()
+        if self._stream is not None:
+            self._report("done", now)
+        elapsed = now - self.started_at
+        return {
+            "rows": self.rows,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def _report(self, label: str, now: float) -> None:
+        elapsed = now - self.started_at
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        print(
+            f"{label}: {self.rows} rows ({self.errors} errors) in {elapsed:.1f}s, {rate:,.0f} rows/s",
+            file=self._stream,
+            flush=True,
+        )
+
+
+def price_file(
+    input_path: Path,
+    output_path: Path,
+    snapshot_path: Path,
+    *,
+    input_format: str | None = None,
+    workers: int | None = None,
+    chunk_size: int = 2000,
+    progress_stream: TextIO | None = None,
+) -> dict[str, float]:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    input_format = input_format or detect_format(input_path)
+    snapshot_json = snapshot_path.read_bytes()
+    # Validate up front so a bad snapshot fails before any worker starts.
+    FeeSnapshot.model_validate_json(snapshot_json)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(read_payloads(input_path, input_format), chunk_size)
+    writer = ResultWriter(output_path, input_format)
+    progress = Progress(progress_stream)
+    try:
+        if workers == 1:
+            _init_worker(snapshot_json)
+            for chunk in chunks:
+                encoded, errors = _price_chunk(chunk, input_format)
+                writer.write(encoded)
+                progress.update(len(chunk[1]), errors)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(snapshot_json,),
+            ) as executor:
+                pending: deque[tuple[int, Future]] = deque()
+                for chunk in chunks:
+                    pending.append((len(chunk[1]), executor.submit(_price_chunk, chunk, input_format)))
+                    if len(pending) >= workers * 2:
+                        _drain_one(pending, writer, progress)
+                while pending:
+                    _drain_one(pending, writer, progress)
+    finally:
+        writer.close()
+    return progress.finish()
+
+
+def _drain_one(pending: deque[tuple[int, Future]], writer: ResultWriter, progress: Progress) -> None:
+    rows, future = pending.popleft()
+    encoded, errors = future.result()
+    writer.write(encoded)
+    progress.update(rows, errors)
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="vic-rego-price",
+        description="Price a file of vehicle requests against a pinned fee snapshot.",
+    )
+    parser.add_argument("input", type=Path, help="Parquet, CSV or NDJSON file of VehicleRequest rows")
+    parser.add_argument("output", type=Path, help="Where to write results (same format as the input)")
+    parser.add_argument("--snapshot", type=Path, required=True, help="FeeSnapshot JSON file to price against")
+    parser.add_argument("--format", choices=sorted(set(FORMATS_BY_SUFFIX.values())), help="Override the input format")
+    parser.add_argument("--workers", type=_positive_int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=_positive_int, default=2000, help="Rows per worker task")
+    parser.add_argument("--quiet", action="store_true", help="Suppress progress output on stderr")
+    args = parser.parse_args(argv)
+
+    try:
+        price_file(
+            args.input,
+            args.output,
+            args.snapshot,
+            input_format=args.format,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            progress_stream=None if args.quiet else sys.stderr,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
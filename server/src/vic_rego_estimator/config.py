@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,7 +10,22 @@ class Settings(BaseSettings):
     fee_snapshot_blob_container: str = "fee-snapshots"
     fee_snapshot_blob_name: str = "vic/latest.json"
     azure_blob_connection_string: str | None = None
+    fee_snapshot_local_path: str | None = None
     refresh_frequency_days: int = 30
+    refresh_enabled: bool = True
+    refresh_jitter_ratio: float = 0.1
+    refresh_retry_base_seconds: float = 30.0
+    refresh_retry_max_seconds: float = 3600.0
+    scrape_concurrency: int = 4
+    scrape_timeout_seconds: float = 20.0
+    scrape_retries: int = 2
+    scrape_retry_backoff_seconds: float = 0.5
+    scrape_parse_workers: int = 2
+    snapshot_cache_ttl_seconds: int | None = None
+    snapshot_refresh_lease_seconds: int = 60
+    estimate_cache_size: int = 4096
+    normalize_cache_size: int = 1024
+    normalize_cache_ttl_seconds: float = 300.0
     auth_enabled: bool = False
     oidc_issuer: str | None = None
     oidc_audience: str | None = None
@@ -17,8 +34,22 @@ class Settings(BaseSettings):
     oidc_authorization_url: str | None = None
     oidc_required_scope: str | None = None
     oidc_algorithms: list[str] = ["RS256"]
+    oidc_jwks_cache_ttl_seconds: int = 3600
+    oidc_jwks_min_refetch_seconds: int = 30
+    oidc_token_cache_size: int = 1024
     mcp_rate_limit_requests: int = 60
     mcp_rate_limit_window_seconds: int = 60
+    rate_limit_backend: Literal["memory", "gcra", "redis"] = "memory"
+    redis_url: str | None = None
+    trusted_proxy_hops: int = 0
+    mcp_max_batch_size: int = 20
+    mcp_max_batch_vehicles: int = 500
+    audit_sample_rate: float = 1.0
+    audit_queue_size: int = 10000
+    metrics_multiproc_dir: str | None = None
+    metrics_flush_interval_seconds: float = 5.0
+    mcp_batch_rate_limit_weight: float = 1.0
+    bulk_max_line_bytes: int = 65536
 
 
 settings = Settings()
@@ -1,71 +1,115 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
+import math
 import time
-from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import MutableHeaders
+from starlette.requests import ClientDisconnect
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from vic_rego_estimator.audit import AuditLog
 from vic_rego_estimator.auth import AuthError, OIDCAuthenticator
 from vic_rego_estimator.config import settings
-from vic_rego_estimator.tools.registry import TOOLS
+from vic_rego_estimator.metrics import (
+    BULK_ROWS,
+    MCP_REQUEST_DURATION,
+    MCP_REQUESTS,
+    RATE_LIMIT_REJECTIONS,
+    MetricFamily,
+)
+from vic_rego_estimator.metrics import (
+    registry as metrics_registry,
+)
+from vic_rego_estimator.models.schemas import FeeSnapshot
+from vic_rego_estimator.rate_limit import RateLimitDecision, rate_limiter_from_settings
+from vic_rego_estimator.scraping.parser import shutdown_parse_executor
+from vic_rego_estimator.serialization import json_bytes, jsonrpc_result
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+from vic_rego_estimator.tools.bulk import (
+    CSV_RESULT_COLUMNS,
+    PayloadReader,
+    csv_line,
+    csv_result_values,
+    iter_lines,
+    ndjson_result,
+    price_row,
+)
+from vic_rego_estimator.tools.registry import (
+    TOOLS,
+    InvalidToolArguments,
+    estimate_cache,
+    normalize_cache,
+    refresher,
+    store,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("vic_rego_estimator")
 
-app = FastAPI(title="Vic Rego Estimator MCP")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    audit_log.start()
+    await store.open()
+    if settings.refresh_enabled:
+        refresher.start()
+    metrics_flusher = None
+    if settings.metrics_multiproc_dir:
+        metrics_flusher = asyncio.create_task(_flush_metrics_periodically(settings.metrics_multiproc_dir))
+    try:
+        yield
+    finally:
+        if metrics_flusher is not None:
+            metrics_flusher.cancel()
+            metrics_registry.flush(settings.metrics_multiproc_dir)
+        await refresher.stop()
+        await store.close()
+        await rate_limiter.aclose()
+        shutdown_parse_executor()
+        if authenticator is not None:
+            await authenticator.aclose()
+        audit_log.stop()
+
+
+app = FastAPI(title="Vic Rego Estimator MCP", lifespan=lifespan)
 authenticator = OIDCAuthenticator.from_settings()
 
 WIDGET_DIR = Path(__file__).parent / "static" / "widget"
 app.mount("/widget", StaticFiles(directory=WIDGET_DIR, html=True), name="widget")
 
 
-@dataclass(frozen=True)
-class RateLimitDecision:
-    allowed: bool
-    retry_after_seconds: int | None = None
-
-
-class SlidingWindowRateLimiter:
-    def __init__(self, max_requests: int, window_seconds: int) -> None:
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self._requests: dict[str, deque[float]] = defaultdict(deque)
-
-    def check(self, key: str, now: float | None = None) -> RateLimitDecision:
-        current_time = now if now is not None else time.time()
-        window_start = current_time - self.window_seconds
-        bucket = self._requests[key]
-
-        while bucket and bucket[0] <= window_start:
-            bucket.popleft()
-
-        if len(bucket) >= self.max_requests:
-            retry_after = max(1, int(bucket[0] + self.window_seconds - current_time))
-            return RateLimitDecision(allowed=False, retry_after_seconds=retry_after)
-
-        bucket.append(current_time)
-        return RateLimitDecision(allowed=True)
-
-
-rate_limiter = SlidingWindowRateLimiter(
-    max_requests=settings.mcp_rate_limit_requests,
-    window_seconds=settings.mcp_rate_limit_window_seconds,
-)
+rate_limiter = rate_limiter_from_settings()
+audit_log = AuditLog.from_settings()
 
 
 def _client_ip(request: Request) -> str:
-    forwarded_for = request.headers.get("x-forwarded-for")
-    if forwarded_for:
-        return forwarded_for.split(",", maxsplit=1)[0].strip()
+    # Callers can send any X-Forwarded-For; only the entries appended by our own
+    # TRUSTED_PROXY_HOPS proxies are believed, counting from the right.
+    hops = settings.trusted_proxy_hops
+    if hops > 0:
+        forwarded_for = [
+            part.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for part in header.split(",")
+            if part.strip()
+        ]
+        if len(forwarded_for) >= hops:
+            return forwarded_for[-hops]
     if request.client:
         return request.client.host
     return "unknown"
@@ -78,82 +122,112 @@ def _request_identity(request: Request) -> str:
     return f"ip:{_client_ip(request)}"
 
 
-@app.middleware("http")
-async def request_audit_log(request: Request, call_next):
-    request_id = request.headers.get("x-request-id") or str(uuid4())
-    request.state.request_id = request_id
-    started_at = time.perf_counter()
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    latency_ms = round((time.perf_counter() - started_at) * 1000, 2)
-
-    log_payload = {
-        "event": "http_request",
-        "request_id": request_id,
-        "method": request.method,
-        "path": request.url.path,
-        "status_code": response.status_code,
-        "latency_ms": latency_ms,
-        "client_ip": _client_ip(request),
-        "user_agent": request.headers.get("user-agent", "unknown"),
-        "authenticated_sub": (
-            getattr(request.state, "token_claims", {}).get("sub")
-            if isinstance(getattr(request.state, "token_claims", None), dict)
-            else None
-        ),
-    }
-
-    logger.info(json.dumps(log_payload, sort_keys=True))
-    return response
-
-
-@app.middleware("http")
-async def enforce_mcp_auth(request: Request, call_next):
-    if request.url.path != "/mcp" or authenticator is None:
-        return await call_next(request)
-
-    try:
-        claims = authenticator.validate_authorization_header(request.headers.get("authorization"))
-        request.state.token_claims = claims
-    except AuthError as exc:
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
-                "detail": exc.message,
-                "recovery_steps": _mcp_recovery_steps(exc.status_code),
-                "request_id": getattr(request.state, "request_id", None),
-            },
-            headers={
-                "WWW-Authenticate": authenticator.challenge_header(
-                    error=exc.error,
-                    description=exc.message,
-                )
-            },
-        )
+# Paths that require a bearer token (when OIDC is configured) and are rate limited.
+GUARDED_PATHS = frozenset({"/mcp", "/estimate/stream"})
+
+
+class MCPGatewayMiddleware:
+    # Audit logging, OIDC auth and rate limiting for /mcp in one pure-ASGI layer, so
+    # requests are not re-wrapped and responses are streamed straight through.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        request_id = request.headers.get("x-request-id") or str(uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            rejection = await self._guard_mcp(request) if scope["path"] in GUARDED_PATHS else None
+            if rejection is not None:
+                await rejection(scope, receive, send_with_request_id)
+            else:
+                await self.app(scope, receive, send_with_request_id)
+        finally:
+            self._audit(request, request_id, status_code, started_at)
+
+    async def _guard_mcp(self, request: Request) -> Response | None:
+        # The client IP is limited before the token is validated, so a stream of bad
+        # tokens is throttled instead of costing a validation each; authenticated
+        # callers are then also limited per subject.
+        decision = await rate_limiter.check(f"ip:{_client_ip(request)}")
+        if not decision.allowed:
+            return _rate_limited_response(request, decision)
+        if authenticator is None:
+            return None
+
+        try:
+            request.state.token_claims = await authenticator.validate_authorization_header(
+                request.headers.get("authorization")
+            )
+        except AuthError as exc:
+            return JSONResponse(
+                status_code=exc.status_code,
+                content={
+                    "detail": exc.message,
+                    "recovery_steps": _mcp_recovery_steps(exc.status_code),
+                    "request_id": request.state.request_id,
+                },
+                headers={
+                    "WWW-Authenticate": authenticator.challenge_header(
+                        error=exc.error,
+                        description=exc.message,
+                    )
+                },
+            )
+
+        identity = _request_identity(request)
+        if identity.startswith("sub:"):
+            decision = await rate_limiter.check(identity)
+            if not decision.allowed:
+                return _rate_limited_response(request, decision)
+        return None
+
+    @staticmethod
+    def _audit(request: Request, request_id: str, status_code: int, started_at: float) -> None:
+        token_claims = getattr(request.state, "token_claims", None)
+        event = {
+            "event": "http_request",
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": status_code,
+            "latency_ms": round((time.perf_counter() - started_at) * 1000, 2),
+            "client_ip": _client_ip(request),
+            "user_agent": request.headers.get("user-agent", "unknown"),
+            "authenticated_sub": token_claims.get("sub") if isinstance(token_claims, dict) else None,
+        }
+        audit_log.record(event)
 
-    return await call_next(request)
 
+app.add_middleware(MCPGatewayMiddleware)
 
-@app.middleware("http")
-async def enforce_mcp_rate_limit(request: Request, call_next):
-    if request.url.path != "/mcp":
-        return await call_next(request)
-
-    identity = _request_identity(request)
-    decision = rate_limiter.check(identity)
-    if not decision.allowed:
-        return JSONResponse(
-            status_code=429,
-            content={
-                "detail": "Rate limit exceeded for /mcp",
-                "retry_after_seconds": decision.retry_after_seconds,
-                "recovery_steps": _mcp_recovery_steps(429),
-                "request_id": getattr(request.state, "request_id", None),
-            },
-            headers={"Retry-After": str(decision.retry_after_seconds)},
-        )
 
-    return await call_next(request)
+def _rate_limited_response(request: Request, decision: RateLimitDecision) -> JSONResponse:
+    RATE_LIMIT_REJECTIONS.inc()
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": f"Rate limit exceeded for {request.url.path}",
+            "retry_after_seconds": decision.retry_after_seconds,
+            "recovery_steps": _mcp_recovery_steps(429),
+            "request_id": getattr(request.state, "request_id", None),
+        },
+        headers={"Retry-After": str(decision.retry_after_seconds)},
+    )
 
 
 def _mcp_recovery_steps(status_code: int) -> list[str]:
@@ -165,6 +239,8 @@ def _mcp_recovery_steps(status_code: int) -> list[str]:
         return ["Re-authorize with a token that includes the required scope and retry."]
     if status_code == 404:
         return ["Retry using a tool name returned by tools/list."]
+    if status_code == 422:
+        return ["Fix the tool arguments to match the tool's inputSchema and retry."]
     if status_code == 429:
         return ["Wait for Retry-After seconds, then retry the request."]
     return ["Retry the request. If the issue persists, contact support with X-Request-ID."]
@@ -221,49 +297,252 @@ async def mcp_unexpected_exception_handler(request: Request, exc: Exception):
 
 
 @app.get("/")
-async def health() -> dict[str, str]:
-    return {"status": "ok", "service": "vic-rego-estimator"}
+async def health() -> dict[str, Any]:
+    snapshot = store.current
+    return {
+        "status": "ok",
+        "service": "vic-rego-estimator",
+        "snapshot": {
+            "version": store.version,
+            "refreshed_at": snapshot.refreshed_at.isoformat() if snapshot is not None else None,
+            "refresher_running": refresher.running,
+            **refresher.status.as_dict(),
+        },
+    }
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    return Response(
+        content=metrics_registry.render(settings.metrics_multiproc_dir),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+async def _flush_metrics_periodically(directory: str) -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_flush_interval_seconds)
+        try:
+            metrics_registry.flush(directory)
+        except OSError:
+            logger.warning("Could not flush metrics to %s", directory, exc_info=True)
+
+
+def _runtime_metric_families() -> list[MetricFamily]:
+    families = [
+        MetricFamily(
+            "vic_rego_snapshot_cache_lookups_total",
+            "counter",
+            "Fee snapshot loads served from memory (hit) or needing a backend read (miss).",
+            [({"result": "hit"}, store.hits), ({"result": "miss"}, store.misses)],
+        ),
+        MetricFamily(
+            "vic_rego_estimate_cache_lookups_total",
+            "counter",
+            "Rendered estimate cache lookups.",
+            [({"result": "hit"}, estimate_cache.hits), ({"result": "miss"}, estimate_cache.misses)],
+        ),
+        MetricFamily(
+            "vic_rego_estimate_cache_entries",
+            "gauge",
+            "Rendered estimates held in this worker's cache.",
+            [({}, len(estimate_cache))],
+        ),
+        MetricFamily(
+            "vic_rego_normalize_cache_lookups_total",
+            "counter",
+            "Normalized request cache lookups shared by the single-vehicle tools.",
+            [({"result": "hit"}, normalize_cache.hits), ({"result": "miss"}, normalize_cache.misses)],
+        ),
+        MetricFamily(
+            "vic_rego_audit_events_dropped_total",
+            "counter",
+            "Audit events dropped because the writer queue was full.",
+            [({}, audit_log.dropped)],
+        ),
+        MetricFamily(
+            "vic_rego_snapshot_refresh_consecutive_failures",
+            "gauge",
+            "Consecutive failed background snapshot refreshes.",
+            [({}, refresher.status.consecutive_failures)],
+        ),
+    ]
+    if authenticator is not None and authenticator.jwks_cache is not None:
+        jwks = authenticator.jwks_cache.stats()
+        families.append(
+            MetricFamily(
+                "vic_rego_jwks_fetches_total",
+                "counter",
+                "JWKS documents fetched from the identity provider.",
+                [({}, jwks["fetches"])],
+            )
+        )
+        families.append(
+            MetricFamily(
+                "vic_rego_jwks_key_lookups_total",
+                "counter",
+                "JWKS signing-key lookups.",
+                [({"result": "hit"}, jwks["hits"]), ({"result": "miss"}, jwks["misses"])],
+            )
+        )
+    if refresher.status.last_duration_seconds is not None:
+        families.append(
+            MetricFamily(
+                "vic_rego_snapshot_refresh_duration_seconds",
+                "gauge",
+                "Duration of the last background snapshot refresh.",
+                [({}, refresher.status.last_duration_seconds)],
+            )
+        )
+
+    snapshot = store.current
+    if snapshot is not None:
+        age = (datetime.now(timezone.utc) - snapshot.refreshed_at).total_seconds()
+        families.append(
+            MetricFamily("vic_rego_fee_snapshot_age_seconds", "gauge", "Age of the served fee snapshot.", [({}, age)])
+        )
+        families.append(
+            MetricFamily(
+                "vic_rego_scrape_source_duration_seconds",
+                "gauge",
+                "Fetch and parse time per fee source in the last scrape.",
+                [
+                    ({"source": source, "phase": phase}, timing[f"{phase}_ms"] / 1000)
+                    for source, timing in snapshot.source_timings.items()
+                    for phase in ("fetch", "parse")
+                    if f"{phase}_ms" in timing
+                ],
+            )
+        )
+    return families
+
+
+metrics_registry.register_collector(_runtime_metric_families)
+
+
+JSONRPC_ERROR_CODES = {400: -32601, 404: -32602, 422: -32602, 500: -32603}
+JSONRPC_INVALID_REQUEST = -32600
 
 
 @app.post("/mcp")
-async def mcp_endpoint(payload: dict[str, Any], request: Request):
-    method = payload.get("method")
-    req_id = payload.get("id")
+async def mcp_endpoint(payload: dict[str, Any] | list[Any], request: Request):
+    if isinstance(payload, list):
+        return await _handle_batch(payload, request)
+
+    static = _static_result(payload.get("method"))
+    # initialize and tools/list only vary by JSON-RPC id; the ETag lets a polling client
+    # tell the catalogue is unchanged without diffing it. POST is not a conditional
+    # request, so the body is always sent.
+    headers = {"ETag": static.etag} if static is not None else None
+    return Response(content=await _dispatch(payload, request), media_type="application/json", headers=headers)
+
+
+async def _handle_batch(batch: list[Any], request: Request) -> Response:
+    if not batch:
+        raise HTTPException(status_code=400, detail="Empty JSON-RPC batch")
+    if len(batch) > settings.mcp_max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"JSON-RPC batch exceeds {settings.mcp_max_batch_size} requests",
+        )
 
-    if method == "initialize":
-        return JSONResponse(
-            {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "serverInfo": {
-                        "name": "vic-rego-estimator",
-                        "title": "Vic Rego Estimator MCP",
-                        "version": "0.1.0",
-                    },
-                    "capabilities": {
-                        "tools": {
-                            "listChanged": False,
-                        }
-                    },
-                    "securitySchemes": _server_security_schemes(),
-                },
-            }
+    # The middleware already charged one request to the client IP (and the token
+    # subject); charge the rest of the batch weight to the same buckets.
+    extra_cost = max(1, math.ceil(len(batch) * settings.mcp_batch_rate_limit_weight)) - 1
+    if extra_cost > 0:
+        for key in dict.fromkeys([f"ip:{_client_ip(request)}", _request_identity(request)]):
+            decision = await rate_limiter.check(key, cost=extra_cost)
+            if not decision.allowed:
+                return _rate_limited_response(request, decision)
+
+    responses = await asyncio.gather(*(_dispatch_batch_item(item, request) for item in batch))
+    responses = [response for response in responses if response is not None]
+    if not responses:
+        return Response(status_code=202)
+    return Response(content=b"[" + b",".join(responses) + b"]", media_type="application/json")
+
+
+async def _dispatch_batch_item(item: Any, request: Request) -> bytes | None:
+    if not isinstance(item, dict):
+        return json_bytes(
+            _jsonrpc_error(request, None, 400, "Invalid JSON-RPC request", code=JSONRPC_INVALID_REQUEST)
         )
 
-    if method == "tools/list":
-        tools = [
-            {
-                "name": tool.name,
-                "description": tool.description,
-                "inputSchema": tool.input_schema,
-                "annotations": tool.annotations,
-                "securitySchemes": tool.security_schemes,
-            }
-            for tool in TOOLS.values()
-        ]
-        return JSONResponse({"jsonrpc": "2.0", "id": req_id, "result": {"tools": tools}})
+    try:
+        response = await _dispatch(item, request)
+    except HTTPException as exc:
+        response = json_bytes(_jsonrpc_error(request, item.get("id"), exc.status_code, exc.detail))
+    except Exception:
+        logger.exception(
+            "Unhandled MCP exception",
+            extra={"request_id": getattr(request.state, "request_id", None)},
+        )
+        response = json_bytes(
+            _jsonrpc_error(request, item.get("id"), 500, "Internal error while handling MCP request")
+        )
+
+    # JSON-RPC notifications (no id) do not get a response entry.
+    return response if "id" in item else None
+
+
+def _jsonrpc_error(
+    request: Request, req_id: Any, status_code: int, message: str, code: int | None = None
+) -> dict[str, Any]:
+    if code is None:
+        code = JSONRPC_ERROR_CODES.get(status_code, -32603)
+    if code == JSONRPC_INVALID_REQUEST:
+        recovery_steps = ["Send each batch entry as a JSON-RPC request object."]
+    else:
+        recovery_steps = _mcp_recovery_steps(status_code)
+    return {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "error": {
+            "code": code,
+            "message": message,
+            "data": {
+                "status_code": status_code,
+                "recovery_steps": recovery_steps,
+                "request_id": getattr(request.state, "request_id", None),
+            },
+        },
+    }
+
+
+MCP_METHODS = frozenset({"initialize", "tools/list", "tools/call"})
+
+
+async def _dispatch(payload: dict[str, Any], request: Request) -> bytes:
+    # Label values are bounded to known methods and tools so clients cannot blow up
+    # metric cardinality.
+    method = payload.get("method")
+    method_label = method if method in MCP_METHODS else "unsupported"
+    tool_label = ""
+    if method == "tools/call":
+        params = payload.get("params")
+        tool_name = params.get("name") if isinstance(params, dict) else None
+        tool_label = tool_name if tool_name in TOOLS else "unknown"
+
+    started_at = time.perf_counter()
+    status = "error"
+    try:
+        response = await _dispatch_method(payload, request)
+        status = "ok"
+        return response
+    except HTTPException as exc:
+        status = str(exc.status_code)
+        raise
+    finally:
+        MCP_REQUESTS.inc(method_label, tool_label, status)
+        MCP_REQUEST_DURATION.observe(method_label, tool_label, value=time.perf_counter() - started_at)
+
+
+async def _dispatch_method(payload: dict[str, Any], request: Request) -> bytes:
+    method = payload.get("method")
+    req_id = payload.get("id")
+
+    if method in ("initialize", "tools/list"):
+        return jsonrpc_result(req_id, _static_result(method).body)
 
     if method == "tools/call":
         params = payload.get("params", {})
@@ -271,18 +550,10 @@ async def mcp_endpoint(payload: dict[str, Any], request: Request):
         arguments = params.get("arguments", {})
         if tool_name not in TOOLS:
             raise HTTPException(status_code=404, detail=f"Unknown tool {tool_name}")
-        envelope = await TOOLS[tool_name].handler(arguments)
-        return JSONResponse(
-            {
-                "jsonrpc": "2.0",
-                "id": req_id,
-                "result": {
-                    "content": [{"type": "text", "text": envelope.content}],
-                    "structuredContent": envelope.structuredContent,
-                    "meta": envelope.meta,
-                },
-            }
-        )
+        try:
+            return jsonrpc_result(req_id, await TOOLS[tool_name].handler(arguments))
+        except InvalidToolArguments as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
 
     logger.warning(
         json.dumps(
@@ -298,8 +569,8 @@ async def mcp_endpoint(payload: dict[str, Any], request: Request):
     raise HTTPException(status_code=400, detail=f"Unsupported MCP method: {method}")
 
 
-def _server_security_schemes() -> list[dict[str, Any]]:
-    if authenticator is None:
+def _security_schemes(auth_enabled: bool) -> list[dict[str, Any]]:
+    if not auth_enabled:
         return [{"type": "noauth"}]
     return [
         {
@@ -309,6 +580,125 @@ def _server_security_schemes() -> list[dict[str, Any]]:
     ]
 
 
+@dataclass(frozen=True, slots=True)
+class StaticResult:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def render(cls, content: Any) -> StaticResult:
+        body = json_bytes(content)
+        # Weak: the response body differs by JSON-RPC id, the result does not.
+        return cls(body=body, etag=f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def _initialize_result(auth_enabled: bool) -> dict[str, Any]:
+    return {
+        "protocolVersion": "2024-11-05",
+        "serverInfo": {
+            "name": "vic-rego-estimator",
+            "title": "Vic Rego Estimator MCP",
+            "version": "0.1.0",
+        },
+        "capabilities": {
+            "tools": {
+                "listChanged": False,
+            }
+        },
+        "securitySchemes": _security_schemes(auth_enabled),
+    }
+
+
+def _tools_list_result() -> dict[str, Any]:
+    return {
+        "tools": [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": tool.input_schema,
+                "annotations": tool.annotations,
+                "securitySchemes": tool.security_schemes,
+            }
+            for tool in TOOLS.values()
+        ]
+    }
+
+
+def _static_result(method: Any) -> StaticResult | None:
+    if method == "initialize":
+        return STATIC_INITIALIZE[authenticator is not None]
+    if method == "tools/list":
+        return STATIC_TOOLS_LIST
+    return None
+
+
+BULK_MEDIA_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+class RequestBodyStreamingResponse(StreamingResponse):
+    # The body iterator reads the request body itself, so the disconnect listener
+    # StreamingResponse runs on older ASGI servers must not race it for receive();
+    # a disconnect surfaces as ClientDisconnect from request.stream() instead. The rest
+    # matches StreamingResponse on ASGI 2.4+.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/estimate/stream")
+async def estimate_stream(request: Request):
+    content_type = request.headers.get("content-type", "").split(";", maxsplit=1)[0].strip().lower()
+    input_format = BULK_MEDIA_TYPES.get(content_type)
+    if input_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send application/x-ndjson or text/csv; results are returned in the same format",
+        )
+
+    # Every row in one stream is priced against the same snapshot.
+    snapshot = await store.load()
+    if snapshot is None:
+        refresher.trigger()
+        snapshot = fallback_snapshot()
+    return RequestBodyStreamingResponse(
+        _stream_estimates(request, input_format, snapshot),
+        media_type=content_type,
+        headers={"X-Snapshot-Refreshed-At": snapshot.refreshed_at.isoformat()},
+    )
+
+
+async def _stream_estimates(request: Request, input_format: str, snapshot: FeeSnapshot) -> AsyncIterator[bytes]:
+    # One output chunk per request-body chunk: the next chunk is not read until the
+    # previous results have been sent, so memory stays flat however long the input is.
+    reader = PayloadReader(input_format)
+    index = 0
+    if input_format == "csv":
+        yield csv_line(CSV_RESULT_COLUMNS).encode()
+    try:
+        async for lines in iter_lines(request.stream(), settings.bulk_max_line_bytes):
+            output: list[bytes] = []
+            for payload in reader.feed(lines):
+                row = price_row(index, payload, snapshot)
+                index += 1
+                BULK_ROWS.inc(input_format, "error" if "error" in row else "ok")
+                if input_format == "csv":
+                    output.append(csv_line(csv_result_values(row)).encode())
+                else:
+                    output.append(ndjson_result(row))
+            if output:
+                yield b"".join(output)
+    except ClientDisconnect:
+        logger.info("Bulk estimate client disconnected after %d rows", index)
+
+
 @app.get("/widget-index")
 async def widget_index():
     index_file = WIDGET_DIR / "index.html"
@@ -317,6 +707,13 @@ async def widget_index():
     return FileResponse(index_file)
 
 
+# Rendered once at import; the tool catalogue and server info are fixed per process.
+STATIC_INITIALIZE = {
+    auth_enabled: StaticResult.render(_initialize_result(auth_enabled)) for auth_enabled in (False, True)
+}
+STATIC_TOOLS_LIST = StaticResult.render(_tools_list_result())
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+
+# Metrics are plain per-worker dicts updated from the event loop, so recording is a
+# dict lookup and an add with no locking. With several uvicorn workers each one
+# flushes its counters and histograms to <multiprocess_dir>/metrics_<pid>.json and a
+# scrape of any worker sums every file; gauges always describe the scraped worker.
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values: dict[Labels, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: one count per bucket plus +Inf (not cumulative), then sum, then count.
+        self.values: dict[Labels, list[float]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0.0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type: str
+    help: str
+    samples: list[tuple[dict[str, str], float]] = field(default_factory=list)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Labels = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Labels = (), **kwargs) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, **kwargs))
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self, multiprocess_dir: str | Path | None = None) -> str:
+        families = [family for collector in self._collectors for family in collector()]
+        if multiprocess_dir is None:
+            counters = {name: _dump_metric(metric) for name, metric in self._metrics.items()}
+            counters.update(_dump_families(family for family in families if family.type == "counter"))
+        else:
+            self.flush(multiprocess_dir, families)
+            counters = _merge_files(Path(multiprocess_dir))
+
+        lines: list[str] = []
+        for name, dumped in counters.items():
+            lines.extend(_render_dumped(name, dumped))
+        for family in families:
+            if family.type != "counter":
+                lines.extend(_render_family(family))
+        return "\n".join(lines) + "\n"
+
+    def flush(self, multiprocess_dir: str | Path, families: list[MetricFamily] | None = None) -> None:
+        if families is None:
+            families = [family for collector in self._collectors for family in collector()]
+        dumped = {name: _dump_metric(metric) for name, metric in self._metrics.items()}
+        dumped.update(_dump_families(family for family in families if family.type == "counter"))
+        directory = Path(multiprocess_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"metrics_{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(dumped), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def _dump_metric(metric: Counter | Histogram) -> dict:
+    dumped = {"type": metric.type, "help": metric.help, "labelnames": list(metric.labelnames)}
+    dumped["samples"] = [[list(labels), value] for labels, value in metric.values.items()]
+    if isinstance(metric, Histogram):
+        dumped["buckets"] = list(metric.buckets)
+    return dumped
+
+
+def _dump_families(families: Iterable[MetricFamily]) -> dict[str, dict]:
+    dumped: dict[str, dict] = {}
+    for family in families:
+        labelnames = sorted({name for labels, _ in family.samples for name in labels})
+        dumped[family.name] = {
+            "type": family.type,
+            "help": family.help,
+            "labelnames": labelnames,
+            "samples": [[[labels.get(name, "") for name in labelnames], value] for labels, value in family.samples],
+        }
+    return dumped
+
+
+def _merge_files(directory: Path) -> dict[str, dict]:
+    merged: dict[str, dict] = {}
+    for path in sorted(directory.glob("metrics_*.json")):
+        try:
+            dumped = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        for name, metric in dumped.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if key not in target["samples"]:
+                    target["samples"][key] = value
+                elif metric["type"] == "histogram":
+                    target["samples"][key] = [a + b for a, b in zip(target["samples"][key], value)]
+                else:
+                    target["samples"][key] += value
+    for metric in merged.values():
+        metric["samples"] = [[list(labels), value] for labels, value in metric["samples"].items()]
+    return merged
+
+
+def _render_dumped(name: str, dumped: dict) -> list[str]:
+    lines = [f"# HELP {name} {dumped['help']}", f"# TYPE {name} {dumped['type']}"]
+    labelnames = dumped["labelnames"]
+    for labels, value in dumped["samples"]:
+        pairs = list(zip(labelnames, labels))
+        if dumped["type"] != "histogram":
+            lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+            continue
+        cumulative = 0.0
+        for bound, count in zip([*dumped["buckets"], math.inf], value):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else _format_value(bound)
+            lines.append(f"{name}_bucket{_format_labels([*pairs, ('le', le)])} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(value[-2])}")
+        lines.append(f"{name}_count{_format_labels(pairs)} {_format_value(value[-1])}")
+    return lines
+
+
+def _render_family(family: MetricFamily) -> list[str]:
+    lines = [f"# HELP {family.name} {family.help}", f"# TYPE {family.name} {family.type}"]
+    for labels, value in family.samples:
+        lines.append(f"{family.name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+    return lines
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+MCP_REQUESTS = registry.counter(
+    "vic_rego_mcp_requests_total",
+    "MCP JSON-RPC requests by method, tool and outcome.",
+    ("method", "tool", "status"),
+)
+MCP_REQUEST_DURATION = registry.histogram(
+    "vic_rego_mcp_request_duration_seconds",
+    "MCP JSON-RPC handling latency by method and tool.",
+    ("method", "tool"),
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "vic_rego_rate_limit_rejections_total",
+    "Requests rejected with 429 by the /mcp rate limiter.",
+)
+BULK_ROWS = registry.counter(
+    "vic_rego_bulk_rows_total",
+    "Rows priced by /estimate/stream by input format and outcome.",
+    ("format", "status"),
+)
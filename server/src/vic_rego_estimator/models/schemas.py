@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 TransactionType = Literal["new_registration", "renewal", "transfer"]
@@ -19,6 +19,9 @@ VehicleCategory = Literal[
 
 
 class VehicleRequest(BaseModel):
+    # Request values are echoed into JSON responses, which cannot carry NaN or Infinity.
+    model_config = ConfigDict(allow_inf_nan=False)
+
     transaction_type: TransactionType
     vehicle_category: VehicleCategory
     make: str | None = None
@@ -54,6 +57,13 @@ class FeeLineItem(BaseModel):
     notes: str | None = None
 
 
+class SourceState(BaseModel):
+    etag: str | None = None
+    last_modified: str | None = None
+    content_sha256: str | None = None
+    parsed: dict[str, float] = Field(default_factory=dict)
+
+
 class FeeSnapshot(BaseModel):
     jurisdiction: str = "VIC"
     refreshed_at: datetime
@@ -65,6 +75,8 @@ class FeeSnapshot(BaseModel):
     heavy_vehicle_base_fee: dict[str, float]
     duty_rates: list[dict[str, float]]
     concession_rules: dict[str, float]
+    source_timings: dict[str, dict[str, float]] = Field(default_factory=dict)
+    source_state: dict[str, SourceState] = Field(default_factory=dict)
 
 
 class EstimateResult(BaseModel):
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from vic_rego_estimator.config import settings
+
+logger = logging.getLogger("vic_rego_estimator")
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after_seconds: int | None = None
+
+
+class RateLimiter(Protocol):
+    max_requests: int
+    window_seconds: int
+
+    async def check(self, key: str, now: float | None = None, cost: int = 1) -> RateLimitDecision: ...
+
+    async def aclose(self) -> None: ...
+
+
+class SlidingWindowRateLimiter:
+    # Per-process default: limits are per worker and state lives in worker memory.
+    def __init__(self, max_requests: int, window_seconds: int) -> None:
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._requests: dict[str, deque[float]] = defaultdict(deque)
+
+    async def check(self, key: str, now: float | None = None, cost: int = 1) -> RateLimitDecision:
+        current_time = now if now is not None else time.time()
+        window_start = current_time - self.window_seconds
+        bucket = self._requests[key]
+
+        while bucket and bucket[0] <= window_start:
+            bucket.popleft()
+
+        overflow = len(bucket) + cost - self.max_requests
+        if overflow > 0:
+            if overflow > len(bucket):
+                return RateLimitDecision(allowed=False, retry_after_seconds=self.window_seconds)
+            retry_after = max(1, int(bucket[overflow - 1] + self.window_seconds - current_time))
+            return RateLimitDecision(allowed=False, retry_after_seconds=retry_after)
+
+        bucket.extend([current_time] * cost)
+        return RateLimitDecision(allowed=True)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class GCRARateLimiter:
+    # Per-process GCRA: one float (the theoretical arrival time) per identity instead
+    # of one timestamp per request. Keys are kept in last-touch order; a key whose TAT
+    # has passed is indistinguishable from a new one, so each check evicts a couple of
+    # such keys from the cold end. The table only holds identities seen in the last window.
+    EVICTIONS_PER_CHECK = 2
+
+    def __init__(self, max_requests: int, window_seconds: int) -> None:
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._tat: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def check(self, key: str, now: float | None = None, cost: int = 1) -> RateLimitDecision:
+        current_time = now if now is not None else time.time()
+        tat = self._tat.get(key, current_time)
+        new_tat = max(tat, current_time) + cost * self.window_seconds / self.max_requests
+        allow_at = new_tat - self.window_seconds
+        if current_time < allow_at:
+            self._evict(current_time, self.EVICTIONS_PER_CHECK)
+            return RateLimitDecision(allowed=False, retry_after_seconds=max(1, math.ceil(allow_at - current_time)))
+
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        self._evict(current_time, self.EVICTIONS_PER_CHECK)
+        return RateLimitDecision(allowed=True)
+
+    def sweep(self, now: float | None = None) -> int:
+        return self._evict(now if now is not None else time.time(), None)
+
+    def _evict(self, now: float, limit: int | None) -> int:
+        evicted = 0
+        while self._tat and (limit is None or evicted < limit):
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                break
+            del self._tat[key]
+            evicted += 1
+        return evicted
+
+    async def aclose(self) -> None:
+        return None
+
+
+# GCRA in one round trip. The key holds the theoretical arrival time (TAT) in
+# milliseconds; a request is admitted while the new TAT stays within one window of
+# now, which allows max_requests back to back and then one per emission interval.
+# Time comes from the Redis server so replicas with skewed clocks agree, unless the
+# caller pins it via ARGV[4].
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+if not now then
+  local t = redis.call('TIME')
+  now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+end
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+  tat = now
+end
+local new_tat = tat + cost * interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+  return {0, math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil(new_tat - now)))
+return {1, 0}
+"""
+
+
+class RedisRateLimiter:
+    # Shared across workers and replicas. `client` is any redis.asyncio-compatible
+    # client exposing `eval`; Redis errors fail open so an outage does not take /mcp down.
+    def __init__(
+        self,
+        client: Any,
+        max_requests: int,
+        window_seconds: int,
+        key_prefix: str = "vic-rego:ratelimit:",
+    ) -> None:
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._client = client
+        self._key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: str, max_requests: int, window_seconds: int) -> RedisRateLimiter:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:  # pragma: no cover - depends on the optional "redis" extra
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' extra to be installed") from exc
+        return cls(Redis.from_url(url), max_requests=max_requests, window_seconds=window_seconds)
+
+    async def check(self, key: str, now: float | None = None, cost: int = 1) -> RateLimitDecision:
+        window_ms = self.window_seconds * 1000
+        interval_ms = window_ms / self.max_requests
+        try:
+            allowed, retry_after_ms = await self._client.eval(
+                GCRA_SCRIPT,
+                1,
+                self._key_prefix + key,
+                repr(interval_ms),
+                str(window_ms),
+                str(cost),
+                "" if now is None else str(int(now * 1000)),
+            )
+        except Exception:
+            logger.warning("Rate limit store unavailable; allowing request", exc_info=True)
+            return RateLimitDecision(allowed=True)
+
+        if int(allowed):
+            return RateLimitDecision(allowed=True)
+        return RateLimitDecision(allowed=False, retry_after_seconds=max(1, math.ceil(int(retry_after_ms) / 1000)))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def rate_limiter_from_settings() -> RateLimiter:
+    if settings.rate_limit_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires REDIS_URL")
+        return RedisRateLimiter.from_url(
+            settings.redis_url,
+            max_requests=settings.mcp_rate_limit_requests,
+            window_seconds=settings.mcp_rate_limit_window_seconds,
+        )
+    if settings.rate_limit_backend == "gcra":
+        return GCRARateLimiter(
+            max_requests=settings.mcp_rate_limit_requests,
+            window_seconds=settings.mcp_rate_limit_window_seconds,
+        )
+    return SlidingWindowRateLimiter(
+        max_requests=settings.mcp_rate_limit_requests,
+        window_seconds=settings.mcp_rate_limit_window_seconds,
+    )
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
+import logging
+import multiprocessing
 import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 
@@ -9,10 +15,16 @@ import httpx
 import pdfplumber
 from bs4 import BeautifulSoup
 
-from vic_rego_estimator.models.schemas import FeeSnapshot
-from vic_rego_estimator.scraping.sources import VIC_SOURCES
+from vic_rego_estimator.config import settings
+from vic_rego_estimator.models.schemas import FeeSnapshot, SourceState
+from vic_rego_estimator.scraping.sources import VIC_SOURCES, SourceConfig
+
+logger = logging.getLogger("vic_rego_estimator")
 
 CURRENCY_RE = re.compile(r"\$\s*([0-9][0-9,]*(?:\.[0-9]{1,2})?)")
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_parse_executor: ProcessPoolExecutor | None = None
 
 
 def _extract_first_currency(text: str, fallback: float) -> float:
@@ -42,17 +54,132 @@ def _parse_pdf_table(pdf_bytes: bytes) -> dict[str, float]:
     }
 
 
-async def scrape_fee_snapshot() -> FeeSnapshot:
+def _parse_source(url: str, content: bytes, encoding: str | None) -> dict[str, float]:
+    # Module-level so it can be pickled into the parse process pool.
+    if ".pdf" in url:
+        return _parse_pdf_table(content)
+    return _parse_html_tables(content.decode(encoding or "utf-8", errors="replace"))
+
+
+def parse_executor() -> Executor:
+    # BeautifulSoup and pdfplumber are CPU-bound; parsing in worker processes keeps a
+    # refresh from stalling the event loop. Spawned workers avoid forking a live loop.
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=settings.scrape_parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
+
+
+async def _fetch_source(
+    client: httpx.AsyncClient,
+    source: SourceConfig,
+    previous: SourceState | None,
+) -> tuple[httpx.Response, int]:
+    headers = {}
+    if previous is not None and previous.etag:
+        headers["If-None-Match"] = previous.etag
+    if previous is not None and previous.last_modified:
+        headers["If-Modified-Since"] = previous.last_modified
+
+    attempts = settings.scrape_retries + 1
+    attempt = 1
+    while True:
+        try:
+            response = await client.get(source.url, headers=headers, timeout=settings.scrape_timeout_seconds)
+            if response.status_code == 304 and previous is not None:
+                return response, attempt
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= attempts:
+                response.raise_for_status()
+                return response, attempt
+        except (httpx.TimeoutException, httpx.TransportError):
+            if attempt >= attempts:
+                raise
+        logger.warning("Retrying fee source %s (attempt %s of %s)", source.url, attempt, attempts)
+        await asyncio.sleep(settings.scrape_retry_backoff_seconds * (2 ** (attempt - 1)))
+        attempt += 1
+
+
+async def _scrape_source(
+    client: httpx.AsyncClient,
+    source: SourceConfig,
+    semaphore: asyncio.Semaphore,
+    executor: Executor,
+    previous: SourceState | None,
+) -> tuple[SourceState, dict[str, float]]:
+    async with semaphore:
+        started_at = time.perf_counter()
+        response, attempts = await _fetch_source(client, source, previous)
+        fetched_at = time.perf_counter()
+
+    # Unchanged sources (304, or identical bytes) reuse the previously parsed values.
+    reused = True
+    if response.status_code == 304:
+        state = previous.model_copy()
+    else:
+        content_sha256 = hashlib.sha256(response.content).hexdigest()
+        if previous is not None and previous.content_sha256 == content_sha256 and previous.parsed:
+            parsed = previous.parsed
+        else:
+            reused = False
+            loop = asyncio.get_running_loop()
+            parsed = await loop.run_in_executor(
+                executor, _parse_source, source.url, response.content, response.encoding
+            )
+        state = SourceState(
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            content_sha256=content_sha256,
+            parsed=parsed,
+        )
+
+    timing = {
+        "fetch_ms": round((fetched_at - started_at) * 1000, 2),
+        "parse_ms": round((time.perf_counter() - fetched_at) * 1000, 2),
+        "attempts": attempts,
+        "reused": 1 if reused else 0,
+    }
+    return state, timing
+
+
+async def scrape_fee_snapshot(
+    client: httpx.AsyncClient | None = None,
+    executor: Executor | None = None,
+    previous: FeeSnapshot | None = None,
+) -> FeeSnapshot:
     parsed: dict[str, Any] = {}
+    previous_state = previous.source_state if previous is not None else {}
     urls = [source.url for source in VIC_SOURCES]
-    async with httpx.AsyncClient(timeout=20) as client:
-        for source in VIC_SOURCES:
-            response = await client.get(source.url)
-            response.raise_for_status()
-            if ".pdf" in source.url:
-                parsed.update(_parse_pdf_table(response.content))
-            else:
-                parsed.update(_parse_html_tables(response.text))
+    semaphore = asyncio.Semaphore(settings.scrape_concurrency)
+    owns_client = client is None
+    if client is None:
+        client = httpx.AsyncClient(timeout=settings.scrape_timeout_seconds)
+    try:
+        results = await asyncio.gather(
+            *(
+                _scrape_source(client, source, semaphore, executor or parse_executor(), previous_state.get(source.url))
+                for source in VIC_SOURCES
+            )
+        )
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    source_timings: dict[str, dict[str, float]] = {}
+    source_state: dict[str, SourceState] = {}
+    for source, (state, timing) in zip(VIC_SOURCES, results):
+        parsed.update(state.parsed)
+        source_timings[source.url] = timing
+        source_state[source.url] = state
 
     reg12 = parsed.get("registration_fee_12", 930.0)
     tac12 = parsed.get("tac_12", 530.0)
@@ -76,4 +203,6 @@ async def scrape_fee_snapshot() -> FeeSnapshot:
             {"threshold": 100000, "rate": 0.052},
         ],
         concession_rules={"pensioner": 0.5, "veteran": 0.6, "primary_producer": 0.7},
+        source_timings=source_timings,
+        source_state=source_state,
     )
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Generic, TypeVar
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from typing_extensions import TypedDict
+
+StructuredT = TypeVar("StructuredT")
+
+
+class TextContent(TypedDict):
+    type: str
+    text: str
+
+
+class ToolResult(TypedDict, Generic[StructuredT]):
+    # The tools/call result envelope. Handlers whose structuredContent holds slotted
+    # records pass a TypeAdapter of ToolResult[<their content>] to render_tool_result,
+    # so the records serialize with a compiled schema instead of field-by-field inference.
+    content: list[TextContent]
+    structuredContent: StructuredT
+    meta: dict[str, Any]
+
+
+def json_bytes(content: Any) -> bytes:
+    # Same encoding as starlette's JSONResponse.render, so pre-rendered fragments are
+    # byte-for-byte identical to what the endpoint used to send.
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def render_tool_result(
+    text: str,
+    structured_content: Any,
+    meta: dict[str, Any],
+    adapter: TypeAdapter[Any] | None = None,
+) -> bytes:
+    # One pass from result models to bytes: pydantic-core serializes nested models with
+    # their own schemas, so there is no model_dump copy and no ToolEnvelope validation.
+    # Output matches json_bytes except for exponent style on floats below 1e-4
+    # ("0.00001" rather than "1e-05"), which only appear when echoing raw user input.
+    # Unlike json_bytes, to_json writes NaN/Infinity instead of raising, so callers must
+    # only pass finite floats (VehicleRequest rejects non-finite input, the estimators
+    # reject totals that overflow).
+    result = {
+        "content": [{"type": "text", "text": text}],
+        "structuredContent": structured_content,
+        "meta": meta,
+    }
+    if adapter is None:
+        return to_json(result)
+    return adapter.dump_json(result)
+
+
+def jsonrpc_result(req_id: Any, result: bytes) -> bytes:
+    return b'{"jsonrpc":"2.0","id":' + json_bytes(req_id) + b',"result":' + result + b"}"
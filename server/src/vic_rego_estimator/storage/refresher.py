@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from vic_rego_estimator.config import settings
+from vic_rego_estimator.models.schemas import FeeSnapshot
+from vic_rego_estimator.storage.snapshot_store import SnapshotStore
+
+logger = logging.getLogger("vic_rego_estimator")
+
+SnapshotProducer = Callable[[FeeSnapshot | None], Awaitable[FeeSnapshot]]
+
+
+@dataclass(slots=True)
+class RefreshStatus:
+    last_attempt_at: datetime | None = None
+    last_success_at: datetime | None = None
+    last_duration_seconds: float | None = None
+    last_error: str | None = None
+    consecutive_failures: int = 0
+    next_refresh_at: datetime | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "last_attempt_at": _isoformat(self.last_attempt_at),
+            "last_success_at": _isoformat(self.last_success_at),
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "next_refresh_at": _isoformat(self.next_refresh_at),
+        }
+
+
+class SnapshotRefresher:
+    # Owns scraping: a single background task refreshes the store every
+    # refresh_frequency_days (jittered so replicas spread out) and backs off
+    # exponentially on failure. Request handlers only ever call trigger().
+    def __init__(
+        self,
+        store: SnapshotStore,
+        producer: SnapshotProducer,
+        *,
+        interval_seconds: float | None = None,
+        jitter_ratio: float | None = None,
+        retry_base_seconds: float | None = None,
+        retry_max_seconds: float | None = None,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self._store = store
+        self._producer = producer
+        self._interval_seconds = (
+            interval_seconds if interval_seconds is not None else settings.refresh_frequency_days * 86400
+        )
+        self._jitter_ratio = jitter_ratio if jitter_ratio is not None else settings.refresh_jitter_ratio
+        self._retry_base_seconds = (
+            retry_base_seconds if retry_base_seconds is not None else settings.refresh_retry_base_seconds
+        )
+        self._retry_max_seconds = (
+            retry_max_seconds if retry_max_seconds is not None else settings.refresh_retry_max_seconds
+        )
+        self._rng = rng
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self.status = RefreshStatus()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def trigger(self) -> None:
+        # Wake the loop early (e.g. the store is empty). While backing off after a
+        # failure the schedule is left alone so callers cannot hammer the sources.
+        if self._wake is not None and self.status.consecutive_failures == 0:
+            self._wake.set()
+
+    async def run_once(self) -> bool:
+        started_at = time.perf_counter()
+        self.status.last_attempt_at = datetime.now(timezone.utc)
+        try:
+            snapshot = await self._store.refresh(lambda: self._producer(self._store.current))
+            if snapshot is None:
+                raise RuntimeError("No fee snapshot available after refresh")
+        except Exception as exc:
+            self.status.consecutive_failures += 1
+            self.status.last_error = f"{type(exc).__name__}: {exc}"
+            logger.warning(
+                "Fee snapshot refresh failed (%s consecutive)", self.status.consecutive_failures, exc_info=True
+            )
+            return False
+        finally:
+            self.status.last_duration_seconds = round(time.perf_counter() - started_at, 3)
+
+        self.status.consecutive_failures = 0
+        self.status.last_error = None
+        self.status.last_success_at = datetime.now(timezone.utc)
+        return True
+
+    def next_delay(self) -> float:
+        if self.status.consecutive_failures:
+            base = self._retry_base_seconds * 2 ** (self.status.consecutive_failures - 1)
+            return self._jitter(min(base, self._retry_max_seconds))
+        return self._jitter(self._interval_seconds)
+
+    async def initial_delay(self) -> float:
+        # Resume the cadence from the stored snapshot's age rather than scraping on
+        # every restart.
+        snapshot = await self._store.load()
+        if snapshot is None:
+            return 0.0
+        age = (datetime.now(timezone.utc) - snapshot.refreshed_at).total_seconds()
+        remaining = self._interval_seconds - age
+        return self._jitter(remaining) if remaining > 0 else 0.0
+
+    async def _run(self) -> None:
+        delay = await self.initial_delay()
+        while True:
+            self.status.next_refresh_at = datetime.fromtimestamp(time.time() + delay, timezone.utc)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            self.status.next_refresh_at = None
+            await self.run_once()
+            delay = self.next_delay()
+
+    def _jitter(self, seconds: float) -> float:
+        spread = seconds * self._jitter_ratio
+        return max(0.0, seconds - spread + 2 * spread * self._rng())
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
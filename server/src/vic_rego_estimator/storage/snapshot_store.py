@@ -1,46 +1,371 @@
 from __future__ import annotations
 
+import asyncio
+import fcntl
 import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Protocol
 
-from azure.storage.blob import BlobServiceClient
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceExistsError,
+    ResourceNotFoundError,
+    ResourceNotModifiedError,
+)
 
 from vic_rego_estimator.config import settings
 from vic_rego_estimator.models.schemas import FeeSnapshot
 
+logger = logging.getLogger("vic_rego_estimator")
 
-class SnapshotStore:
-    def __init__(self) -> None:
-        self._conn = settings.azure_blob_connection_string
+# Blob leases last at most 60 seconds; refresh leases are renewed well within that.
+MAX_LEASE_SECONDS = 60
+
+
+class SnapshotNotModified(Exception):
+    pass
+
+
+class SnapshotBackend(Protocol):
+    async def open(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+    # Returns (bytes, etag), None when the blob is missing, or raises SnapshotNotModified
+    # when ``etag`` still matches.
+    async def read(self, etag: str | None = None) -> tuple[bytes, str | None] | None: ...
+
+    async def write(self, payload: bytes) -> str | None: ...
+
+    # Cross-process refresh lock; returns None when another process holds it. The
+    # holder renews it while the refresh runs, so it only expires if the holder dies.
+    async def acquire_lease(self, ttl_seconds: float) -> Any | None: ...
+
+    async def renew_lease(self, lease: Any) -> None: ...
+
+    async def release_lease(self, lease: Any) -> None: ...
 
-    def _blob_client(self):
-        if not self._conn:
+
+class AzureBlobSnapshotBackend:
+    # One long-lived aio client per process so connections are pooled across requests.
+    def __init__(self, connection_string: str, container: str, blob_name: str) -> None:
+        self._connection_string = connection_string
+        self._container = container
+        self._blob_name = blob_name
+        self._service = None
+        self._client = None
+
+    async def open(self) -> None:
+        if self._service is not None:
+            return
+        from azure.storage.blob.aio import BlobServiceClient
+
+        self._service = BlobServiceClient.from_connection_string(self._connection_string)
+        self._client = self._service.get_blob_client(container=self._container, blob=self._blob_name)
+
+    async def close(self) -> None:
+        if self._service is None:
+            return
+        await self._service.close()
+        self._service = None
+        self._client = None
+
+    async def read(self, etag: str | None = None) -> tuple[bytes, str | None] | None:
+        await self.open()
+        kwargs = {}
+        if etag:
+            kwargs = {"etag": etag, "match_condition": MatchConditions.IfModified}
+        try:
+            downloader = await self._client.download_blob(**kwargs)
+            data = await downloader.readall()
+        except ResourceNotModifiedError as exc:
+            raise SnapshotNotModified() from exc
+        except ResourceNotFoundError:
             return None
-        svc = BlobServiceClient.from_connection_string(self._conn)
-        return svc.get_blob_client(
-            container=settings.fee_snapshot_blob_container,
-            blob=settings.fee_snapshot_blob_name,
-        )
+        return data, downloader.properties.etag
 
-    def load(self) -> FeeSnapshot | None:
-        client = self._blob_client()
-        if client is None:
+    async def write(self, payload: bytes) -> str | None:
+        await self.open()
+        response = await self._client.upload_blob(payload, overwrite=True)
+        return (response or {}).get("etag")
+
+    async def acquire_lease(self, ttl_seconds: float) -> Any | None:
+        await self.open()
+        from azure.storage.blob.aio import BlobLeaseClient
+
+        # Lease a sibling lock blob so the snapshot blob itself stays writable.
+        lock_client = self._service.get_blob_client(container=self._container, blob=f"{self._blob_name}.lock")
+        try:
+            await lock_client.upload_blob(b"", overwrite=False)
+        except ResourceExistsError:
+            pass
+
+        lease = BlobLeaseClient(lock_client)
+        try:
+            # Blob leases must be between 15 and 60 seconds.
+            await lease.acquire(lease_duration=int(min(max(ttl_seconds, 15), MAX_LEASE_SECONDS)))
+        except HttpResponseError as exc:
+            if exc.status_code == 409:
+                return None
+            raise
+        return lease
+
+    async def renew_lease(self, lease: Any) -> None:
+        try:
+            await lease.renew()
+        except HttpResponseError:
+            logger.warning("Failed to renew snapshot refresh lease", exc_info=True)
+
+    async def release_lease(self, lease: Any) -> None:
+        try:
+            await lease.release()
+        except HttpResponseError:
+            logger.warning("Failed to release snapshot refresh lease", exc_info=True)
+
+
+class LocalFileSnapshotBackend:
+    # Offline stand-in for Blob storage; the ETag is derived from mtime and size.
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+
+    async def open(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def read(self, etag: str | None = None) -> tuple[bytes, str | None] | None:
+        return await asyncio.to_thread(self._read, etag)
+
+    async def write(self, payload: bytes) -> str | None:
+        return await asyncio.to_thread(self._write, payload)
+
+    async def acquire_lease(self, ttl_seconds: float) -> Any | None:
+        return await asyncio.to_thread(self._acquire_lock, ttl_seconds)
+
+    async def renew_lease(self, lease: Any) -> None:
+        # flock does not expire, so there is nothing to renew.
+        return None
+
+    async def release_lease(self, lease: Any) -> None:
+        await asyncio.to_thread(self._release_lock, lease)
+
+    def _read(self, etag: str | None) -> tuple[bytes, str | None] | None:
+        try:
+            current = _file_etag(self._path.stat())
+            if etag and etag == current:
+                raise SnapshotNotModified()
+            return self._path.read_bytes(), current
+        except FileNotFoundError:
             return None
+
+    def _write(self, payload: bytes) -> str | None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self._path)
+        return _file_etag(self._path.stat())
+
+    def _acquire_lock(self, ttl_seconds: float) -> LocalLease | None:
+        # flock is held by the open file and dropped by the kernel when the holder exits,
+        # so there is no stale lock to detect and ttl_seconds is not needed. The lock
+        # file itself is never unlinked: a process could otherwise lock an inode that
+        # has already been replaced.
+        lock_path = self._path.with_name(f"{self._path.name}.lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
         try:
-            data = client.download_blob().readall()
-            return FeeSnapshot.model_validate_json(data)
-        except Exception:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
             return None
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        return LocalLease(lock_path, fd)
+
+    def _release_lock(self, lease: LocalLease) -> None:
+        fcntl.flock(lease.fd, fcntl.LOCK_UN)
+        os.close(lease.fd)
+
+
+@dataclass(frozen=True, slots=True)
+class LocalLease:
+    path: Path
+    fd: int
+
+
+def _file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def backend_from_settings() -> SnapshotBackend | None:
+    if settings.azure_blob_connection_string:
+        return AzureBlobSnapshotBackend(
+            settings.azure_blob_connection_string,
+            container=settings.fee_snapshot_blob_container,
+            blob_name=settings.fee_snapshot_blob_name,
+        )
+    if settings.fee_snapshot_local_path:
+        return LocalFileSnapshotBackend(settings.fee_snapshot_local_path)
+    return None
+
+
+class SnapshotStore:
+    # Serves the last loaded snapshot from memory; once the TTL lapses the backend is
+    # revalidated with a conditional (ETag) read in a background task.
+    def __init__(self, backend: SnapshotBackend | None = None, ttl_seconds: float | None = None) -> None:
+        self._backend = backend if backend is not None else backend_from_settings()
+        self._ttl_seconds = ttl_seconds if ttl_seconds is not None else _default_ttl_seconds()
+        self._snapshot: FeeSnapshot | None = None
+        self._etag: str | None = None
+        self._version = 0
+        self._checked_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+        self._inflight_refresh: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def current(self) -> FeeSnapshot | None:
+        # The in-memory snapshot, without touching the backend.
+        return self._snapshot
+
+    async def open(self) -> None:
+        if self._backend is not None:
+            await self._backend.open()
+
+    async def close(self) -> None:
+        # The in-flight refresh is shielded from its callers, so it has to be cancelled
+        # here and awaited: it releases its lease in finally and must not write to or
+        # release through a closed backend.
+        tasks = [
+            task for task in (self._refresh_task, self._inflight_refresh) if task is not None and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._backend is not None:
+            await self._backend.close()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations, "version": self._version}
+
+    async def load(self) -> FeeSnapshot | None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.misses += 1
+            # Concurrent cold loads share one backend read rather than each issuing
+            # their own; shielded so a cancelled caller does not cancel the others.
+            self._schedule_revalidation()
+            return await asyncio.shield(self._refresh_task)
+        self.hits += 1
+        if time.monotonic() - self._checked_at >= self._ttl_seconds:
+            self._schedule_revalidation()
+        return snapshot
 
-    def save(self, snapshot: FeeSnapshot) -> None:
-        client = self._blob_client()
-        if client is None:
+    async def save(self, snapshot: FeeSnapshot) -> None:
+        if self._backend is None:
+            self._swap(snapshot, None)
             return
         payload = json.dumps(snapshot.model_dump(mode="json")).encode("utf-8")
-        client.upload_blob(payload, overwrite=True)
+        etag = await self._backend.write(payload)
+        self._swap(snapshot, etag)
 
+    async def refresh(self, producer: Callable[[], Awaitable[FeeSnapshot]]) -> FeeSnapshot | None:
+        # Single flight: concurrent callers in this process share one refresh task.
+        task = self._inflight_refresh
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._refresh_under_lease(producer))
+            self._inflight_refresh = task
+        return await asyncio.shield(task)
 
-def fallback_snapshot() -> FeeSnapshot:
+    async def _refresh_under_lease(self, producer: Callable[[], Awaitable[FeeSnapshot]]) -> FeeSnapshot | None:
+        lease = None
+        renewal = None
+        if self._backend is not None:
+            lease = await self._backend.acquire_lease(settings.snapshot_refresh_lease_seconds)
+            if lease is None:
+                # Another process or replica is refreshing; use whatever is stored now.
+                logger.info("Fee snapshot refresh already running elsewhere; skipping local scrape")
+                return await self._revalidate()
+            # A scrape with timeouts and retries can outlast the lease, so keep it alive.
+            renewal = asyncio.get_running_loop().create_task(self._renew_lease(lease))
+        try:
+            snapshot = await producer()
+            await self.save(snapshot)
+            return snapshot
+        finally:
+            if renewal is not None:
+                renewal.cancel()
+            if lease is not None:
+                await self._backend.release_lease(lease)
+
+    async def _renew_lease(self, lease: Any) -> None:
+        interval = min(settings.snapshot_refresh_lease_seconds, MAX_LEASE_SECONDS) / 3
+        while True:
+            await asyncio.sleep(interval)
+            await self._backend.renew_lease(lease)
+
+    def _schedule_revalidation(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(self._revalidate())
+
+    async def _revalidate(self) -> FeeSnapshot | None:
+        if self._backend is None:
+            # Nothing to revalidate against; stamp the check so warm loads do not
+            # schedule a no-op task on every call once the TTL lapses.
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+        self.revalidations += 1
+        etag = self._etag if self._snapshot is not None else None
+        try:
+            blob = await self._backend.read(etag)
+            if blob is None:
+                return self._snapshot
+            data, etag = blob
+            snapshot = FeeSnapshot.model_validate_json(data)
+        except SnapshotNotModified:
+            self._checked_at = time.monotonic()
+            return self._snapshot
+        except Exception:
+            logger.warning("Fee snapshot revalidation failed; serving last good snapshot", exc_info=True)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+        self._swap(snapshot, etag)
+        return snapshot
+
+    def _swap(self, snapshot: FeeSnapshot, etag: str | None) -> None:
+        if self._snapshot is None or etag is None or etag != self._etag:
+            self._version += 1
+        self._snapshot = snapshot
+        self._etag = etag
+        self._checked_at = time.monotonic()
+
+
+def _default_ttl_seconds() -> float:
+    if settings.snapshot_cache_ttl_seconds is not None:
+        return settings.snapshot_cache_ttl_seconds
+    # Snapshots only change every refresh_frequency_days, so revalidate a couple of
+    # minutes per cadence day (hourly at the default monthly cadence).
+    return max(60, settings.refresh_frequency_days * 120)
+
+
+def _build_fallback_snapshot() -> FeeSnapshot:
     return FeeSnapshot(
         refreshed_at=datetime.now(timezone.utc),
         sources=["https://www.vicroads.vic.gov.au/", "https://www.sro.vic.gov.au/motor-vehicle-duty"],
@@ -56,3 +381,12 @@ def fallback_snapshot() -> FeeSnapshot:
         ],
         concession_rules={"pensioner": 0.5, "veteran": 0.6, "primary_producer": 0.7},
     )
+
+
+# Built once per process, so every fallback estimate shares one compiled fee schedule
+# (refreshed_at is the process start). Shared across callers: treat it as read-only.
+_FALLBACK_SNAPSHOT = _build_fallback_snapshot()
+
+
+def fallback_snapshot() -> FeeSnapshot:
+    return _FALLBACK_SNAPSHOT
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+from vic_rego_estimator.models.schemas import FeeSnapshot
+from vic_rego_estimator.tools.estimator import EstimateRecord, estimate_record
+from vic_rego_estimator.tools.normalize import normalize_vehicle_request
+
+# Row-at-a-time helpers shared by the fleet batch tool, the streaming /estimate/stream
+# endpoint and the offline pricer CLI. A row result is {"index", "estimate"} or
+# {"index", "error"}; invalid rows never abort the surrounding batch or stream.
+
+NESTED_CSV_FIELDS = ("concession_flags", "manual_overrides")
+# CSV cells are strings; Literal[3, 6, 12] fields do not coerce from str, so convert them.
+INTEGER_CSV_FIELDS = ("term_months",)
+CSV_RESULT_COLUMNS = (
+    "index",
+    "transaction_type",
+    "vehicle_category",
+    "total_min",
+    "total_max",
+    "confidence",
+    "error",
+)
+
+
+class RowResult(TypedDict):
+    index: int
+    estimate: NotRequired[EstimateRecord]
+    error: NotRequired[dict[str, Any]]
+
+
+ROW_RESULT_ADAPTER = TypeAdapter(RowResult)
+
+
+def price_row(index: int, payload: Any, snapshot: FeeSnapshot) -> RowResult:
+    if isinstance(payload, Exception):
+        return {"index": index, "error": {"message": str(payload), "fields": []}}
+    try:
+        normalized = normalize_vehicle_request(payload)
+        return {"index": index, "estimate": estimate_record(normalized, snapshot)}
+    except ValidationError as exc:
+        return {"index": index, "error": row_error(exc)}
+    except ValueError as exc:
+        return {"index": index, "error": {"message": str(exc), "fields": []}}
+
+
+def row_error(exc: ValidationError) -> dict[str, Any]:
+    return {
+        "message": "Invalid vehicle request",
+        "fields": [
+            {"loc": [str(part) for part in error["loc"]], "msg": error["msg"]}
+            for error in exc.errors(include_url=False)
+        ],
+    }
+
+
+def parse_ndjson_line(line: str) -> dict[str, Any] | Exception:
+    try:
+        payload = json.loads(line)
+    except ValueError as exc:
+        return ValueError(f"Invalid JSON: {exc}")
+    if not isinstance(payload, dict):
+        return ValueError("Each NDJSON line must be a JSON object")
+    return payload
+
+
+def csv_row_payload(header: list[str], values: list[str]) -> dict[str, Any] | Exception:
+    if len(values) != len(header):
+        return ValueError(f"Expected {len(header)} CSV columns, got {len(values)}")
+    payload: dict[str, Any] = {}
+    for column, value in zip(header, values):
+        if value == "":
+            continue
+        parent, _, key = column.partition(".")
+        if key and parent in NESTED_CSV_FIELDS:
+            payload.setdefault(parent, {})[key] = value
+        elif column in INTEGER_CSV_FIELDS and value.strip().isdigit():
+            payload[column] = int(value)
+        else:
+            payload[column] = value
+    return payload
+
+
+def parse_csv_line(line: str) -> list[str]:
+    return next(csv.reader([line]), [])
+
+
+class PayloadReader:
+    # Turns input lines into request payloads (or per-row exceptions). Holds the CSV
+    # header between calls so a stream can be fed one chunk of lines at a time.
+    def __init__(self, input_format: str) -> None:
+        self.input_format = input_format
+        self.header: list[str] | None = None
+
+    def feed(self, lines: Iterable[str | Exception]) -> Iterator[dict[str, Any] | Exception]:
+        # Blank lines are skipped so they do not consume an index.
+        for line in lines:
+            if isinstance(line, Exception):
+                yield line
+            elif not line.strip():
+                continue
+            elif self.input_format != "csv":
+                yield parse_ndjson_line(line)
+            elif self.header is None:
+                self.header = parse_csv_line(line)
+            else:
+                yield csv_row_payload(self.header, parse_csv_line(line))
+
+
+def ndjson_result(row: RowResult) -> bytes:
+    return ROW_RESULT_ADAPTER.dump_json(row) + b"\n"
+
+
+def csv_result_values(row: RowResult) -> list[Any]:
+    estimate: EstimateRecord | None = row.get("estimate")
+    if estimate is None:
+        error = row["error"]
+        detail = "; ".join(f"{'.'.join(field['loc'])}: {field['msg']}" for field in error["fields"])
+        return [row["index"], "", "", "", "", "", f"{error['message']}: {detail}" if detail else error["message"]]
+    return [
+        row["index"],
+        estimate.transaction_type,
+        estimate.vehicle_category,
+        estimate.total_min,
+        estimate.total_max,
+        estimate.confidence,
+        "",
+    ]
+
+
+def csv_line(values: Iterable[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
+
+
+def _decode_line(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _line_too_long(max_line_bytes: int) -> ValueError:
+    return ValueError(f"Line exceeds {max_line_bytes} bytes")
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[list[str | Exception]]:
+    # Re-frames a byte stream into complete lines, one list per received chunk, so the
+    # caller can price and send a chunk's worth of rows at a time. An over-long line is
+    # reported in place as an error and its remaining bytes are skipped rather than
+    # buffered without bound.
+    pending = b""
+    skipping = False
+    async for chunk in chunks:
+        lines: list[str | Exception] = []
+        *complete, tail = (pending + chunk).split(b"\n")
+        for line in complete:
+            if skipping:
+                skipping = False
+            elif len(line) > max_line_bytes:
+                lines.append(_line_too_long(max_line_bytes))
+            else:
+                lines.append(_decode_line(line))
+        pending = b"" if skipping else tail
+        if len(pending) > max_line_bytes:
+            lines.append(_line_too_long(max_line_bytes))
+            pending = b""
+            skipping = True
+        if lines:
+            yield lines
+    if pending and not skipping:
+        yield [_decode_line(pending)]
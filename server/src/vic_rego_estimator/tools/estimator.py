@@ -1,86 +1,121 @@
 from __future__ import annotations
 
-from vic_rego_estimator.models.schemas import EstimateResult, FeeLineItem, FeeSnapshot, NormalizedVehicleRequest
+import math
+from dataclasses import dataclass
+from datetime import datetime
 
+from pydantic import TypeAdapter
 
-def _duty_amount(value: float, rates: list[dict[str, float]]) -> float:
-    rate = rates[0]["rate"]
-    for band in rates:
-        if value >= band["threshold"]:
-            rate = band["rate"]
-    return round(value * rate, 2)
+from vic_rego_estimator.models.schemas import EstimateResult, FeeSnapshot, NormalizedVehicleRequest
+from vic_rego_estimator.tools.fee_schedule import BUSINESS_ADMIN_FEE, compile_fee_schedule
 
+# The pipeline works on slotted records and only builds Pydantic models at the API
+# boundary (estimate_registration_cost). The records declare the same fields in the
+# same order as FeeLineItem / EstimateResult, so a TypeAdapter renders a record to
+# exactly the bytes of the equivalent model and hot paths can skip the models.
 
-def _source_at(snapshot: FeeSnapshot, index: int) -> str:
-    if snapshot.sources and 0 <= index < len(snapshot.sources):
-        return snapshot.sources[index]
-    return snapshot.sources[0] if snapshot.sources else ""
+
+@dataclass(slots=True)
+class LineRecord:
+    key: str
+    label: str
+    amount_min: float
+    amount_max: float
+    source: str
+    mandatory: bool = True
+    notes: str | None = None
+
+
+@dataclass(slots=True)
+class EstimateRecord:
+    transaction_type: str
+    vehicle_category: str
+    total_min: float
+    total_max: float
+    confidence: str
+    confidence_score: float
+    line_items: list[LineRecord]
+    assumptions: list[str]
+    concessions_applied: list[str]
+    last_refresh: datetime
+    source_urls: list[str]
+
+    def to_model(self) -> EstimateResult:
+        # One validation pass over the record's attributes, line items included.
+        return EstimateResult.model_validate(self, from_attributes=True)
+
+
+# Plain to_json infers dataclasses field by field (about 2x slower than a model), so
+# records are serialized through adapters: this one, or one for an envelope that
+# declares its EstimateRecord fields (see bulk.RowResult and the registry).
+ESTIMATE_RECORD_ADAPTER = TypeAdapter(EstimateRecord)
 
 
 def estimate_registration_cost(normalized: NormalizedVehicleRequest, snapshot: FeeSnapshot) -> EstimateResult:
-    term_key = str(normalized.term_months)
-    lines: list[FeeLineItem] = []
-    assumptions = list(normalized.assumptions)
-    concessions_applied: list[str] = []
+    return estimate_record(normalized, snapshot).to_model()
 
-    if normalized.vehicle_category in {"heavy_vehicle_truck", "bus", "trailer", "caravan"}:
-        reg_fee = snapshot.heavy_vehicle_base_fee.get(normalized.vehicle_category, 930.0)
-        reg_fee *= normalized.term_months / 12
-    else:
-        reg_fee = snapshot.light_vehicle_fee[term_key]
 
-    tac = snapshot.tac_charge_by_term[term_key]
+def estimate_record(normalized: NormalizedVehicleRequest, snapshot: FeeSnapshot) -> EstimateRecord:
+    schedule = compile_fee_schedule(snapshot)
+    lines: dict[str, LineRecord] = {}
+    assumptions = list(normalized.assumptions)
 
-    reg_discount = 1.0
-    for flag, enabled in normalized.concession_flags.items():
-        if enabled and flag in snapshot.concession_rules:
-            reg_discount = min(reg_discount, snapshot.concession_rules[flag])
-            concessions_applied.append(flag)
+    reg_fee = schedule.registration_fee[(normalized.vehicle_category, normalized.term_months)]
+    tac = schedule.tac_charge[normalized.term_months]
 
-    reg_fee *= reg_discount
+    concessions_applied = [
+        flag
+        for flag, enabled in normalized.concession_flags.items()
+        if enabled and flag in schedule.concession_names
+    ]
+    reg_fee *= schedule.concession_discounts[frozenset(concessions_applied)]
 
-    lines.append(FeeLineItem(key="registration_fee", label="Registration fee", amount_min=round(reg_fee, 2), amount_max=round(reg_fee, 2), source=_source_at(snapshot, 0)))
-    lines.append(FeeLineItem(key="tac_charge", label="TAC charge", amount_min=round(tac, 2), amount_max=round(tac, 2), source=_source_at(snapshot, 0)))
+    reg_fee = round(reg_fee, 2)
+    tac = round(tac, 2)
+    lines["registration_fee"] = LineRecord("registration_fee", "Registration fee", reg_fee, reg_fee, schedule.source_at(0))
+    lines["tac_charge"] = LineRecord("tac_charge", "TAC charge", tac, tac, schedule.source_at(0))
 
     if normalized.transaction_type == "transfer":
-        lines.append(FeeLineItem(key="transfer_fee", label="Transfer fee", amount_min=snapshot.transfer_fee, amount_max=snapshot.transfer_fee, source=_source_at(snapshot, 2)))
+        lines["transfer_fee"] = LineRecord("transfer_fee", "Transfer fee", schedule.transfer_fee, schedule.transfer_fee, schedule.source_at(2))
         if normalized.market_value_aud is None:
-            duty_min = _duty_amount(10000, snapshot.duty_rates)
-            duty_max = _duty_amount(45000, snapshot.duty_rates)
+            duty_min, duty_max = schedule.unknown_value_duty
             assumptions.append("Used $10k-$45k market value range for duty.")
         else:
-            duty_min = duty_max = _duty_amount(normalized.market_value_aud, snapshot.duty_rates)
-        lines.append(FeeLineItem(key="motor_vehicle_duty", label="Motor vehicle duty (stamp duty)", amount_min=duty_min, amount_max=duty_max, source=_source_at(snapshot, 3)))
+            duty_min = duty_max = schedule.duty_amount(normalized.market_value_aud)
+        lines["motor_vehicle_duty"] = LineRecord("motor_vehicle_duty", "Motor vehicle duty (stamp duty)", duty_min, duty_max, schedule.source_at(3))
 
     if normalized.transaction_type == "new_registration":
-        lines.append(FeeLineItem(key="number_plate_fee", label="Number plate fee", amount_min=snapshot.number_plate_fee, amount_max=snapshot.number_plate_fee, source=_source_at(snapshot, 0)))
+        lines["number_plate_fee"] = LineRecord("number_plate_fee", "Number plate fee", schedule.number_plate_fee, schedule.number_plate_fee, schedule.source_at(0))
 
     if normalized.use_type == "business":
-        admin_fee = 18.4
-        lines.append(FeeLineItem(key="business_admin", label="Business processing surcharge", amount_min=admin_fee, amount_max=admin_fee, source=_source_at(snapshot, 0), notes="May vary by channel."))
+        lines["business_admin"] = LineRecord("business_admin", "Business processing surcharge", BUSINESS_ADMIN_FEE, BUSINESS_ADMIN_FEE, schedule.source_at(0), notes="May vary by channel.")
 
     for key, value in normalized.manual_overrides.items():
-        for line in lines:
-            if line.key == key:
-                line.amount_min = value
-                line.amount_max = value
-                line.notes = "Manually overridden in widget"
-
-    total_min = round(sum(item.amount_min for item in lines), 2)
-    total_max = round(sum(item.amount_max for item in lines), 2)
+        line = lines.get(key)
+        if line is not None:
+            line.amount_min = value
+            line.amount_max = value
+            line.notes = "Manually overridden in widget"
+
+    line_items = list(lines.values())
+    total_min = round(sum(item.amount_min for item in line_items), 2)
+    total_max = round(sum(item.amount_max for item in line_items), 2)
+    if not (math.isfinite(total_min) and math.isfinite(total_max)):
+        # Each amount is finite, but large manual overrides can still overflow the sum.
+        raise ValueError("Estimate total is too large to represent")
 
     uncertainty_points = len(normalized.unknown_fields) + (1 if total_min != total_max else 0)
     confidence = "high" if uncertainty_points == 0 else "medium" if uncertainty_points <= 2 else "low"
     score = max(0.3, round(1 - uncertainty_points * 0.15, 2))
 
-    return EstimateResult(
+    return EstimateRecord(
         transaction_type=normalized.transaction_type,
         vehicle_category=normalized.vehicle_category,
         total_min=total_min,
         total_max=total_max,
         confidence=confidence,
         confidence_score=score,
-        line_items=lines,
+        line_items=line_items,
         assumptions=assumptions,
         concessions_applied=concessions_applied,
         last_refresh=snapshot.refreshed_at,
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import combinations
+from typing import get_args
+
+from vic_rego_estimator.cache import LRUCache
+from vic_rego_estimator.models.schemas import FeeSnapshot, VehicleCategory
+
+CATEGORIES: tuple[str, ...] = get_args(VehicleCategory)
+TERMS: tuple[int, ...] = (3, 6, 12)
+HEAVY_VEHICLE_CATEGORIES = frozenset({"heavy_vehicle_truck", "bus", "trailer", "caravan"})
+DEFAULT_HEAVY_BASE_FEE = 930.0
+BUSINESS_ADMIN_FEE = 18.4
+UNKNOWN_VALUE_DUTY_RANGE = (10000, 45000)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledFeeSchedule:
+    # Request-independent facts derived once per snapshot so estimates are plain lookups.
+    registration_fee: dict[tuple[str, int], float]
+    tac_charge: dict[int, float]
+    duty_thresholds: tuple[float, ...]
+    duty_rates: tuple[float, ...]
+    unknown_value_duty: tuple[float, float]
+    concession_names: frozenset[str]
+    concession_discounts: dict[frozenset[str], float]
+    transfer_fee: float
+    number_plate_fee: float
+    sources: tuple[str, ...]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: FeeSnapshot) -> CompiledFeeSchedule:
+        registration_fee: dict[tuple[str, int], float] = {}
+        for category in CATEGORIES:
+            for term in TERMS:
+                if category in HEAVY_VEHICLE_CATEGORIES:
+                    base = snapshot.heavy_vehicle_base_fee.get(category, DEFAULT_HEAVY_BASE_FEE)
+                    registration_fee[(category, term)] = base * (term / 12)
+                elif str(term) in snapshot.light_vehicle_fee:
+                    registration_fee[(category, term)] = snapshot.light_vehicle_fee[str(term)]
+
+        bands = sorted(snapshot.duty_rates, key=lambda band: band["threshold"])
+        duty_thresholds = tuple(band["threshold"] for band in bands)
+        duty_rates = tuple(band["rate"] for band in bands)
+
+        # Every subset of concession rules maps to its registration discount.
+        rules = snapshot.concession_rules
+        concession_discounts = {
+            frozenset(flags): min([1.0, *(rules[flag] for flag in flags)])
+            for size in range(len(rules) + 1)
+            for flags in combinations(rules, size)
+        }
+
+        return cls(
+            registration_fee=registration_fee,
+            tac_charge={
+                term: snapshot.tac_charge_by_term[str(term)]
+                for term in TERMS
+                if str(term) in snapshot.tac_charge_by_term
+            },
+            duty_thresholds=duty_thresholds,
+            duty_rates=duty_rates,
+            unknown_value_duty=(
+                _duty_amount(UNKNOWN_VALUE_DUTY_RANGE[0], duty_thresholds, duty_rates),
+                _duty_amount(UNKNOWN_VALUE_DUTY_RANGE[1], duty_thresholds, duty_rates),
+            ),
+            concession_names=frozenset(rules),
+            concession_discounts=concession_discounts,
+            transfer_fee=snapshot.transfer_fee,
+            number_plate_fee=snapshot.number_plate_fee,
+            sources=tuple(snapshot.sources),
+        )
+
+    def duty_amount(self, value: float) -> float:
+        return _duty_amount(value, self.duty_thresholds, self.duty_rates)
+
+    def source_at(self, index: int) -> str:
+        if self.sources and 0 <= index < len(self.sources):
+            return self.sources[index]
+        return self.sources[0] if self.sources else ""
+
+
+def _duty_amount(value: float, thresholds: tuple[float, ...], rates: tuple[float, ...]) -> float:
+    index = max(bisect_right(thresholds, value) - 1, 0)
+    return round(value * rates[index], 2)
+
+
+# A few snapshots are live at once: the store's current one, the fallback, and older
+# versions pinned by in-flight streams. Entries hold the snapshot itself, so its id()
+# cannot be reused while it is cached.
+_compiled: LRUCache[int, tuple[FeeSnapshot, CompiledFeeSchedule]] = LRUCache(max_size=4)
+
+
+def compile_fee_schedule(snapshot: FeeSnapshot) -> CompiledFeeSchedule:
+    # The store hands out the same FeeSnapshot object until a new version is swapped
+    # in, so identity is enough to know when to rebuild.
+    cached = _compiled.get(id(snapshot))
+    if cached is not None and cached[0] is snapshot:
+        return cached[1]
+    schedule = CompiledFeeSchedule.from_snapshot(snapshot)
+    _compiled.set(id(snapshot), (snapshot, schedule))
+    return schedule
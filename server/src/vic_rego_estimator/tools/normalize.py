@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from pydantic import ValidationError
+
 from vic_rego_estimator.models.schemas import NormalizedVehicleRequest, VehicleRequest
 
 
@@ -21,40 +23,81 @@ CONCESSION_HINTS = {
 }
 
 
+# Per category: (field, validated default, raw default, assumption). The model gets the
+# value coerced to the field's type (tare_kg 1500 -> 1500.0) while inferred_fields and
+# the assumption text keep the raw default, as they did when the merged dict was
+# re-validated into NormalizedVehicleRequest.
+CategoryTemplate = tuple[tuple[str, object, object, str], ...]
+
+
+def _category_templates() -> dict[str, CategoryTemplate]:
+    templates: dict[str, CategoryTemplate] = {}
+    for category, defaults in CATEGORY_DEFAULTS.items():
+        validated = VehicleRequest.model_validate(
+            {"transaction_type": "renewal", "vehicle_category": category, **defaults}
+        )
+        templates[category] = tuple(
+            (
+                field_name,
+                getattr(validated, field_name),
+                default_value,
+                f"Defaulted {field_name} to {default_value} based on vehicle category.",
+            )
+            for field_name, default_value in defaults.items()
+        )
+    return templates
+
+
+CATEGORY_TEMPLATES = _category_templates()
+NORMALIZED_FIELDS = frozenset(NormalizedVehicleRequest.model_fields)
+DERIVED_FIELDS = NORMALIZED_FIELDS - VehicleRequest.model_fields.keys()
+
+
 def normalize_vehicle_request(payload: dict) -> NormalizedVehicleRequest:
-    req = VehicleRequest.model_validate(payload)
+    # One validation, straight into the result model: the derived fields are stripped
+    # from the input (VehicleRequest would have ignored them) and then filled in place,
+    # so there is no dump and no second validation of already-typed values.
+    if not isinstance(payload, dict):
+        payload = VehicleRequest.model_validate(payload).model_dump()
+    fields = payload
+    if not DERIVED_FIELDS.isdisjoint(payload):
+        fields = {key: value for key, value in payload.items() if key not in DERIVED_FIELDS}
+    try:
+        normalized = NormalizedVehicleRequest.model_validate(fields)
+    except ValidationError:
+        # Re-raise from the input model so errors name VehicleRequest and the raw payload.
+        VehicleRequest.model_validate(payload)
+        raise
+    data = normalized.__dict__
     inferred_fields: dict[str, object] = {}
     assumptions: list[str] = []
     unknown_fields: list[str] = []
 
-    defaults = CATEGORY_DEFAULTS[req.vehicle_category]
-    data = req.model_dump()
-
-    for field_name, default_value in defaults.items():
-        if data.get(field_name) is None:
-            data[field_name] = default_value
-            inferred_fields[field_name] = default_value
-            assumptions.append(f"Defaulted {field_name} to {default_value} based on vehicle category.")
+    for field_name, value, raw_value, assumption in CATEGORY_TEMPLATES[normalized.vehicle_category]:
+        if data[field_name] is None:
+            data[field_name] = value
+            inferred_fields[field_name] = raw_value
+            assumptions.append(assumption)
 
-    if not req.postcode and not req.suburb:
+    if not normalized.postcode and not normalized.suburb:
         unknown_fields.append("postcode_or_suburb")
         assumptions.append("Geographic rating zone unknown; used metro baseline and widened TAC range.")
 
-    if req.transaction_type == "transfer" and req.market_value_aud is None:
+    if normalized.transaction_type == "transfer" and normalized.market_value_aud is None:
         unknown_fields.append("market_value_aud")
         assumptions.append("Market value unknown; motor vehicle duty estimated as a range.")
 
-    for flag, enabled in req.concession_flags.items():
+    for flag, enabled in normalized.concession_flags.items():
         if enabled and flag in CONCESSION_HINTS:
             assumptions.append(CONCESSION_HINTS[flag])
 
     for required in ["make", "model", "year", "fuel_type"]:
-        if data.get(required) is None:
+        if data[required] is None:
             unknown_fields.append(required)
 
-    return NormalizedVehicleRequest(
-        **data,
-        inferred_fields=inferred_fields,
-        unknown_fields=sorted(set(unknown_fields)),
-        assumptions=assumptions,
-    )
+    data["inferred_fields"] = inferred_fields
+    data["unknown_fields"] = sorted(set(unknown_fields))
+    data["assumptions"] = assumptions
+    # Every field counts as set, matching a model built from the full merged dict.
+    normalized.__pydantic_fields_set__.update(NORMALIZED_FIELDS)
+    return normalized
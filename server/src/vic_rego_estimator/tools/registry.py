@@ -1,15 +1,47 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import math
+from collections.abc import Awaitable
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Callable
 
-from vic_rego_estimator.models.schemas import ToolEnvelope
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from vic_rego_estimator.cache import LRUCache
+from vic_rego_estimator.config import settings
+from vic_rego_estimator.models.schemas import FeeSnapshot, NormalizedVehicleRequest
 from vic_rego_estimator.scraping.parser import scrape_fee_snapshot
+from vic_rego_estimator.serialization import ToolResult, render_tool_result
+from vic_rego_estimator.storage.refresher import SnapshotRefresher
 from vic_rego_estimator.storage.snapshot_store import SnapshotStore, fallback_snapshot
-from vic_rego_estimator.tools.estimator import estimate_registration_cost
+from vic_rego_estimator.tools.bulk import RowResult, price_row
+from vic_rego_estimator.tools.estimator import EstimateRecord, estimate_record
 from vic_rego_estimator.tools.normalize import normalize_vehicle_request
 
+logger = logging.getLogger("vic_rego_estimator")
+
+
+class InvalidToolArguments(ValueError):
+    """Tool arguments that fail a check outside the request models (invalid params)."""
+
+
+class EstimateContent(TypedDict):
+    estimate: EstimateRecord
+
+
+class EstimateBatchContent(TypedDict):
+    results: list[RowResult]
+    fleetTotals: dict[str, Any]
+
+
+ESTIMATE_RESULT_ADAPTER = TypeAdapter(ToolResult[EstimateContent])
+ESTIMATE_BATCH_RESULT_ADAPTER = TypeAdapter(ToolResult[EstimateBatchContent])
+
 
 @dataclass
 class ToolDef:
@@ -18,63 +50,192 @@ class ToolDef:
     input_schema: dict[str, Any]
     annotations: dict[str, Any]
     security_schemes: list[dict[str, Any]]
-    handler: Callable[[dict[str, Any]], Any]
+    # Handlers return the rendered JSON-RPC result bytes (see render_tool_result).
+    handler: Callable[[dict[str, Any]], Awaitable[bytes]]
+
+
+async def _scrape(previous: FeeSnapshot | None) -> FeeSnapshot:
+    # The last snapshot carries per-source validators so unchanged pages are not re-parsed.
+    return await scrape_fee_snapshot(previous=previous)
 
 
 store = SnapshotStore()
+refresher = SnapshotRefresher(store, _scrape)
+estimate_cache: LRUCache[bytes, bytes] = LRUCache(max_size=settings.estimate_cache_size)
+# normalize_vehicle_request, explain_assumptions and estimate_registration_cost are
+# usually called back to back with the same arguments; the normalized request is
+# shared between them for a few minutes. Cached models are treated as read-only.
+normalize_cache: LRUCache[bytes, NormalizedVehicleRequest] = LRUCache(
+    max_size=settings.normalize_cache_size,
+    ttl_seconds=settings.normalize_cache_ttl_seconds,
+)
+_estimate_cache_version: int | None = None
+# Scraper bookkeeping (upstream validators, content hashes, timings) is persisted with
+# the snapshot but is not part of the get_fee_snapshot contract.
+SNAPSHOT_INTERNAL_FIELDS = frozenset({"source_state", "source_timings"})
 
 
-async def _get_snapshot(_: dict[str, Any]) -> ToolEnvelope:
-    snapshot = store.load()
+async def _get_snapshot(_: dict[str, Any]) -> bytes:
+    snapshot = await store.load()
     freshness = "cached"
     if snapshot is None:
-        try:
-            snapshot = await scrape_fee_snapshot()
-            store.save(snapshot)
-            freshness = "refreshed"
-        except Exception:
-            snapshot = fallback_snapshot()
-            freshness = "fallback"
-
-    return ToolEnvelope(
-        content=f"Loaded VIC fee snapshot ({freshness}) refreshed {snapshot.refreshed_at.date().isoformat()}.",
-        structuredContent={"snapshot": snapshot.model_dump(mode="json")},
-        meta=_meta(freshness, snapshot.refreshed_at),
+        # Requests never scrape; the background refresher is nudged and the
+        # fallback snapshot is served until it lands.
+        refresher.trigger()
+        snapshot, freshness = fallback_snapshot(), "fallback"
+
+    return render_tool_result(
+        f"Loaded VIC fee snapshot ({freshness}) refreshed {snapshot.refreshed_at.date().isoformat()}.",
+        {"snapshot": snapshot.model_dump(exclude=SNAPSHOT_INTERNAL_FIELDS)},
+        _meta(freshness, snapshot.refreshed_at),
     )
 
 
-async def _normalize(payload: dict[str, Any]) -> ToolEnvelope:
-    normalized = normalize_vehicle_request(payload)
-    return ToolEnvelope(
-        content=f"Normalized request for {normalized.vehicle_category} {normalized.transaction_type}.",
-        structuredContent={"normalizedRequest": normalized.model_dump(mode="json")},
-        meta=_meta("n/a", datetime.now(timezone.utc)),
+def _normalized(payload: dict[str, Any]) -> NormalizedVehicleRequest:
+    cache_key = _normalize_cache_key(payload)
+    if cache_key is None:
+        return normalize_vehicle_request(payload)
+    normalized = normalize_cache.get(cache_key)
+    if normalized is None:
+        # Invalid payloads raise here and are never cached.
+        normalized = normalize_vehicle_request(payload)
+        normalize_cache.set(cache_key, normalized)
+    return normalized
+
+
+def _normalize_cache_key(payload: dict[str, Any]) -> bytes | None:
+    # Top-level argument order is irrelevant, but nested dict order is kept: the order
+    # of concession_flags shows up in assumptions and concessions_applied.
+    if not isinstance(payload, dict):
+        return None
+    try:
+        canonical = json.dumps(sorted(payload.items()), separators=(",", ":"), allow_nan=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+async def _normalize(payload: dict[str, Any]) -> bytes:
+    normalized = _normalized(payload)
+    return render_tool_result(
+        f"Normalized request for {normalized.vehicle_category} {normalized.transaction_type}.",
+        {"normalizedRequest": normalized},
+        _meta("n/a", datetime.now(timezone.utc)),
     )
 
 
-async def _estimate(payload: dict[str, Any]) -> ToolEnvelope:
-    normalized = normalize_vehicle_request(payload)
-    snapshot = store.load() or fallback_snapshot()
-    result = estimate_registration_cost(normalized, snapshot)
+async def _estimate(payload: dict[str, Any]) -> bytes:
+    global _estimate_cache_version
+
+    normalized = _normalized(payload)
+    snapshot = await store.load()
+    if snapshot is None:
+        refresher.trigger()
+        # The estimate cache is keyed by store version; fallback results skip it.
+        return _render_estimate(normalized, fallback_snapshot())
+
+    if store.version != _estimate_cache_version:
+        estimate_cache.clear()
+        _estimate_cache_version = store.version
+
+    cache_key = _estimate_cache_key(normalized, snapshot, store.version)
+    cached = estimate_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rendered = _render_estimate(normalized, snapshot)
+    estimate_cache.set(cache_key, rendered)
+    return rendered
+
+
+def _render_estimate(normalized: NormalizedVehicleRequest, snapshot: FeeSnapshot) -> bytes:
+    # The slotted record serializes to the same bytes as EstimateResult.
+    result = estimate_record(normalized, snapshot)
     summary = f"Estimated VIC cost {result.total_min:.2f}-{result.total_max:.2f} AUD ({result.confidence} confidence)."
-    return ToolEnvelope(
-        content=summary,
-        structuredContent={"estimate": result.model_dump(mode="json")},
-        meta=_meta("snapshot", result.last_refresh),
+    return render_tool_result(
+        summary, {"estimate": result}, _meta("snapshot", result.last_refresh), ESTIMATE_RESULT_ADAPTER
     )
 
 
-async def _assumptions(payload: dict[str, Any]) -> ToolEnvelope:
-    normalized = normalize_vehicle_request(payload)
+def _estimate_cache_key(normalized: NormalizedVehicleRequest, snapshot: FeeSnapshot, version: int) -> bytes:
+    # Only the fields the estimator reads. Dict fields keep their insertion order
+    # because it shows up in concessions_applied.
+    canonical = [
+        version,
+        snapshot.refreshed_at.isoformat(),
+        normalized.transaction_type,
+        normalized.vehicle_category,
+        normalized.term_months,
+        normalized.use_type,
+        normalized.market_value_aud,
+        list(normalized.concession_flags.items()),
+        list(normalized.manual_overrides.items()),
+        normalized.unknown_fields,
+        normalized.assumptions,
+    ]
+    return hashlib.blake2b(json.dumps(canonical, separators=(",", ":")).encode("utf-8"), digest_size=16).digest()
+
+
+async def _estimate_batch(payload: dict[str, Any]) -> bytes:
+    vehicles = payload.get("vehicles") if isinstance(payload, dict) else None
+    if not isinstance(vehicles, list):
+        raise InvalidToolArguments("estimate_registration_cost_batch requires a 'vehicles' list")
+    if len(vehicles) > settings.mcp_max_batch_vehicles:
+        raise InvalidToolArguments(
+            f"estimate_registration_cost_batch accepts at most {settings.mcp_max_batch_vehicles} vehicles; "
+            "use POST /estimate/stream for larger fleets"
+        )
+
+    snapshot = await store.load()
+    if snapshot is None:
+        refresher.trigger()
+        snapshot = fallback_snapshot()
+    results: list[RowResult] = []
+    fleet_min = 0.0
+    fleet_max = 0.0
+    failed = 0
+    for index, vehicle in enumerate(vehicles):
+        row = price_row(index, vehicle, snapshot)
+        results.append(row)
+        if "error" in row:
+            failed += 1
+            continue
+        fleet_min += row["estimate"].total_min
+        fleet_max += row["estimate"].total_max
+    if not (math.isfinite(fleet_min) and math.isfinite(fleet_max)):
+        raise InvalidToolArguments("Fleet total is too large to represent; check manual_overrides")
+
+    estimated = len(vehicles) - failed
+    totals = {
+        "vehicle_count": len(vehicles),
+        "estimated_count": estimated,
+        "failed_count": failed,
+        "total_min": round(fleet_min, 2),
+        "total_max": round(fleet_max, 2),
+    }
+    summary = (
+        f"Estimated {estimated} of {len(vehicles)} vehicles: fleet cost "
+        f"{totals['total_min']:.2f}-{totals['total_max']:.2f} AUD ({failed} invalid)."
+    )
+    return render_tool_result(
+        summary,
+        {"results": results, "fleetTotals": totals},
+        _meta("snapshot", snapshot.refreshed_at),
+        ESTIMATE_BATCH_RESULT_ADAPTER,
+    )
+
+
+async def _assumptions(payload: dict[str, Any]) -> bytes:
+    normalized = _normalized(payload)
     confidence = "low" if normalized.unknown_fields else "high"
-    return ToolEnvelope(
-        content=f"Generated assumptions with {confidence} confidence.",
-        structuredContent={
+    return render_tool_result(
+        f"Generated assumptions with {confidence} confidence.",
+        {
             "assumptions": normalized.assumptions,
             "unknownFields": normalized.unknown_fields,
             "confidence": confidence,
         },
-        meta=_meta("n/a", datetime.now(timezone.utc)),
+        _meta("n/a", datetime.now(timezone.utc)),
     )
 
 
@@ -115,6 +276,24 @@ TOOLS: dict[str, ToolDef] = {
         security_schemes=[{"type": "noauth"}],
         handler=_estimate,
     ),
+    "estimate_registration_cost_batch": ToolDef(
+        name="estimate_registration_cost_batch",
+        description="Estimate Victorian registration costs for a fleet of vehicles with per-vehicle results and fleet totals.",
+        input_schema={
+            "type": "object",
+            "required": ["vehicles"],
+            "properties": {
+                "vehicles": {
+                    "type": "array",
+                    "maxItems": settings.mcp_max_batch_vehicles,
+                    "items": {"type": "object", "required": ["transaction_type", "vehicle_category"]},
+                }
+            },
+        },
+        annotations={"readOnlyHint": True},
+        security_schemes=[{"type": "noauth"}],
+        handler=_estimate_batch,
+    ),
     "explain_assumptions": ToolDef(
         name="explain_assumptions",
         description="Explain assumptions and uncertainty from unknown inputs.",
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, get_args
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the optional "batch" extra
+    np = None
+
+from vic_rego_estimator.models.schemas import FeeSnapshot, NormalizedVehicleRequest, TransactionType
+from vic_rego_estimator.tools.fee_schedule import (
+    BUSINESS_ADMIN_FEE,
+    CATEGORIES,
+    TERMS,
+    CompiledFeeSchedule,
+    compile_fee_schedule,
+)
+
+# Column engine for offline portfolio repricing. Mirrors estimate_registration_cost
+# component by component (manual_overrides are not supported) and produces identical
+# amounts; see tests/test_vectorized_estimator.py for the parity check.
+
+TRANSACTION_TYPES: tuple[str, ...] = get_args(TransactionType)
+
+
+@dataclass(frozen=True)
+class EstimateColumns:
+    registration_fee: Any
+    tac_charge: Any
+    transfer_fee: Any
+    duty_min: Any
+    duty_max: Any
+    number_plate_fee: Any
+    business_admin: Any
+    total_min: Any
+    total_max: Any
+
+    def __len__(self) -> int:
+        return len(self.total_min)
+
+
+def estimate_registration_cost_columns(
+    snapshot: FeeSnapshot,
+    *,
+    vehicle_category: Any,
+    term_months: Any,
+    transaction_type: Any,
+    market_value_aud: Any = None,
+    concessions: Mapping[str, Any] | None = None,
+    business_use: Any = None,
+) -> EstimateColumns:
+    _require_numpy()
+    category = _encode(vehicle_category, CATEGORIES, "vehicle_category")
+    transaction = _encode(transaction_type, TRANSACTION_TYPES, "transaction_type")
+    term = _encode_terms(term_months)
+    size = len(category)
+
+    if market_value_aud is None:
+        market_value = np.full(size, np.nan)
+    else:
+        market_value = np.asarray(market_value_aud, dtype=np.float64)
+    business = np.zeros(size, dtype=bool) if business_use is None else np.asarray(business_use, dtype=bool)
+
+    schedule = compile_fee_schedule(snapshot)
+    reg_table, tac_table = _term_tables(schedule)
+    discount = np.ones(size)
+    for flag, mask in (concessions or {}).items():
+        if flag in schedule.concession_names:
+            rule = schedule.concession_discounts[frozenset({flag})]
+            discount = np.where(np.asarray(mask, dtype=bool), np.minimum(discount, rule), discount)
+
+    registration = _round2(reg_table[category, term] * discount)
+    tac = _round2(tac_table[term])
+
+    is_transfer = transaction == TRANSACTION_TYPES.index("transfer")
+    transfer = np.where(is_transfer, schedule.transfer_fee, 0.0)
+
+    known_value = ~np.isnan(market_value)
+    thresholds = np.array(schedule.duty_thresholds, dtype=np.float64)
+    rates = np.array(schedule.duty_rates, dtype=np.float64)
+    band = np.clip(np.searchsorted(thresholds, np.where(known_value, market_value, 0.0), side="right") - 1, 0, None)
+    exact_duty = _round2(np.where(known_value, market_value, 0.0) * rates[band])
+    range_min, range_max = schedule.unknown_value_duty
+    duty_min = np.where(is_transfer, np.where(known_value, exact_duty, range_min), 0.0)
+    duty_max = np.where(is_transfer, np.where(known_value, exact_duty, range_max), 0.0)
+
+    plate = np.where(transaction == TRANSACTION_TYPES.index("new_registration"), schedule.number_plate_fee, 0.0)
+    admin = np.where(business, BUSINESS_ADMIN_FEE, 0.0)
+
+    # Same summation order as the scalar path; absent components add an exact 0.0.
+    total_min = _round2(registration + tac + transfer + duty_min + plate + admin)
+    total_max = _round2(registration + tac + transfer + duty_max + plate + admin)
+
+    return EstimateColumns(
+        registration_fee=registration,
+        tac_charge=tac,
+        transfer_fee=transfer,
+        duty_min=duty_min,
+        duty_max=duty_max,
+        number_plate_fee=plate,
+        business_admin=admin,
+        total_min=total_min,
+        total_max=total_max,
+    )
+
+
+def vehicle_columns(requests: Sequence[NormalizedVehicleRequest]) -> dict[str, Any]:
+    _require_numpy()
+    flags = sorted({flag for request in requests for flag in request.concession_flags})
+    return {
+        "vehicle_category": np.array([request.vehicle_category for request in requests]),
+        "term_months": np.array([request.term_months for request in requests]),
+        "transaction_type": np.array([request.transaction_type for request in requests]),
+        "market_value_aud": np.array(
+            [np.nan if request.market_value_aud is None else request.market_value_aud for request in requests],
+            dtype=np.float64,
+        ),
+        "concessions": {
+            flag: np.array([bool(request.concession_flags.get(flag)) for request in requests]) for flag in flags
+        },
+        "business_use": np.array([request.use_type == "business" for request in requests]),
+    }
+
+
+def _term_tables(schedule: CompiledFeeSchedule) -> tuple[Any, Any]:
+    reg_table = np.array(
+        [[schedule.registration_fee[(category, term)] for term in TERMS] for category in CATEGORIES]
+    )
+    tac_table = np.array([schedule.tac_charge[term] for term in TERMS])
+    return reg_table, tac_table
+
+
+def _encode(values: Any, vocabulary: tuple[str, ...], name: str) -> Any:
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        # Pre-encoded codes index the fee tables directly, so out-of-range codes would
+        # wrap around (negative) or raise IndexError deep inside the lookup.
+        if values.size and (values.min() < 0 or values.max() >= len(vocabulary)):
+            raise ValueError(f"{name} codes must be in range 0..{len(vocabulary) - 1}")
+        return values.astype(np.intp)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    lookup = {value: index for index, value in enumerate(vocabulary)}
+    unknown = [str(value) for value in uniques if value not in lookup]
+    if unknown:
+        raise ValueError(f"Unknown {name} values: {', '.join(unknown)}")
+    return np.array([lookup[value] for value in uniques], dtype=np.intp)[inverse.reshape(-1)]
+
+
+def _encode_terms(values: Any) -> Any:
+    values = np.asarray(values)
+    # Casting straight to intp would truncate 12.7 to a valid 12-month term.
+    if values.dtype.kind == "f" and not (np.isfinite(values) & (values == np.trunc(values))).all():
+        raise ValueError(f"term_months must be one of {TERMS}")
+    values = values.astype(np.intp)
+    lookup = np.full(max(TERMS) + 1, -1, dtype=np.intp)
+    lookup[list(TERMS)] = np.arange(len(TERMS))
+    if values.size and (values.min() < 0 or values.max() > max(TERMS)):
+        raise ValueError(f"term_months must be one of {TERMS}")
+    codes = lookup[values]
+    if (codes < 0).any():
+        raise ValueError(f"term_months must be one of {TERMS}")
+    return codes
+
+
+def _round2(values: Any) -> Any:
+    # np.round scales by 100 before rounding, which can land exactly on .5 where
+    # Python's round() (correctly rounded from the exact binary value) would not;
+    # those exact ties are re-rounded with round() so results match the scalar path.
+    scaled = np.asarray(values, dtype=np.float64) * 100
+    rounded = np.rint(scaled) / 100
+    ties = (scaled - np.floor(scaled)) == 0.5
+    if ties.any():
+        rounded[ties] = [round(float(value), 2) for value in np.asarray(values, dtype=np.float64)[ties]]
+    return rounded
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The vectorized estimator requires numpy; install the 'batch' extra.")
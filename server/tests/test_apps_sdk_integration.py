@@ -9,7 +9,7 @@ import vic_rego_estimator.main as main_module
 
 
 class RejectingAuthenticator:
-    def validate_authorization_header(self, header: str | None) -> dict:
+    async def validate_authorization_header(self, header: str | None) -> dict:
         raise AuthError("Missing bearer token", error="invalid_request")
 
     def challenge_header(self, error: str, description: str) -> str:
@@ -22,7 +22,7 @@ class RejectingAuthenticator:
 
 
 class AcceptingAuthenticator:
-    def validate_authorization_header(self, header: str | None) -> dict:
+    async def validate_authorization_header(self, header: str | None) -> dict:
         if not header:
             raise AuthError("Missing bearer token", error="invalid_request")
         return {"sub": "tester"}
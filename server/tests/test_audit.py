@@ -0,0 +1,59 @@
+import json
+import logging
+
+from vic_rego_estimator.audit import AuditLog
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(record.getMessage())
+
+
+def _event(status_code: int, request_id: str = "req") -> dict:
+    return {"event": "http_request", "request_id": request_id, "status_code": status_code, "path": "/mcp"}
+
+
+def test_listener_writes_sorted_json_lines_off_the_request_path():
+    handler = CollectingHandler()
+    audit = AuditLog(sample_rate=1.0, queue_size=100, handlers=[handler])
+    audit.start()
+
+    audit.record(_event(200, "req-1"))
+    audit.stop()
+
+    assert len(handler.lines) == 1
+    assert list(json.loads(handler.lines[0])) == ["event", "path", "request_id", "status_code"]
+    assert json.loads(handler.lines[0])["request_id"] == "req-1"
+
+
+def test_healthy_traffic_is_sampled_but_errors_always_log():
+    handler = CollectingHandler()
+    audit = AuditLog(sample_rate=0.25, queue_size=100, handlers=[handler], rng=lambda: 0.5)
+    audit.start()
+
+    for status_code in (200, 204, 304, 401, 403, 429, 500):
+        audit.record(_event(status_code))
+    audit.stop()
+
+    assert [json.loads(line)["status_code"] for line in handler.lines] == [401, 403, 429, 500]
+    assert audit.sampled_out == 3
+
+
+def test_queue_is_bounded_and_counts_dropped_events():
+    handler = CollectingHandler()
+    audit = AuditLog(sample_rate=1.0, queue_size=3, handlers=[handler])
+
+    for index in range(5):
+        audit.record(_event(500, f"req-{index}"))
+
+    assert audit.pending == 3
+    assert audit.dropped == 2
+
+    audit.start()
+    audit.stop()
+
+    assert [json.loads(line)["request_id"] for line in handler.lines] == ["req-0", "req-1", "req-2"]
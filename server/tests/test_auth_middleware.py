@@ -8,8 +8,10 @@ import vic_rego_estimator.main as main_module
 class StubAuthenticator:
     def __init__(self, should_fail: bool = False) -> None:
         self.should_fail = should_fail
+        self.validations = 0
 
-    def validate_authorization_header(self, header: str | None) -> dict:
+    async def validate_authorization_header(self, header: str | None) -> dict:
+        self.validations += 1
         if self.should_fail:
             raise AuthError("Missing bearer token", error="invalid_request")
         if not header:
@@ -79,3 +81,106 @@ def test_request_id_is_echoed_in_response_header(monkeypatch):
 
     assert response.status_code == 200
     assert response.headers["X-Request-ID"] == "req-123"
+
+
+def test_rejections_carry_request_id(monkeypatch):
+    monkeypatch.setattr(main_module, "authenticator", StubAuthenticator(should_fail=True))
+    client = TestClient(app)
+
+    res = client.post(
+        '/mcp',
+        headers={"X-Request-ID": "req-401"},
+        json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+    )
+
+    assert res.status_code == 401
+    assert res.headers["X-Request-ID"] == "req-401"
+    assert res.json()["request_id"] == "req-401"
+
+
+def test_rate_limit_keys_on_authenticated_subject(monkeypatch):
+    monkeypatch.setattr(main_module, "authenticator", StubAuthenticator())
+    monkeypatch.setattr(main_module.rate_limiter, "max_requests", 1)
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(app)
+
+    res = client.post(
+        '/mcp',
+        headers={"Authorization": "Bearer test-token"},
+        json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+    )
+
+    assert res.status_code == 200
+    assert set(main_module.rate_limiter._requests) == {"ip:testclient", "sub:tester"}
+
+
+def test_repeated_auth_failures_are_rate_limited_before_validation(monkeypatch):
+    authenticator = StubAuthenticator(should_fail=True)
+    monkeypatch.setattr(main_module, "authenticator", authenticator)
+    monkeypatch.setattr(main_module.rate_limiter, "max_requests", 3)
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(app)
+
+    statuses = [
+        client.post(
+            '/mcp',
+            headers={"Authorization": "Bearer forged"},
+            json={"jsonrpc": "2.0", "id": i, "method": "tools/list"},
+        ).status_code
+        for i in range(5)
+    ]
+
+    assert statuses == [401, 401, 401, 429, 429]
+    assert authenticator.validations == 3
+
+
+def test_forwarded_for_is_ignored_unless_proxy_hops_are_trusted(monkeypatch):
+    monkeypatch.setattr(main_module, "authenticator", None)
+    monkeypatch.setattr(main_module.rate_limiter, "max_requests", 1)
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(app)
+
+    statuses = [
+        client.post(
+            '/mcp',
+            headers={"X-Forwarded-For": f"203.0.113.{i}"},
+            json={"jsonrpc": "2.0", "id": i, "method": "tools/list"},
+        ).status_code
+        for i in range(2)
+    ]
+
+    assert statuses == [200, 429]
+    assert list(main_module.rate_limiter._requests) == ["ip:testclient"]
+
+
+def test_trusted_proxy_hop_supplies_the_client_ip(monkeypatch):
+    monkeypatch.setattr(main_module, "authenticator", None)
+    monkeypatch.setattr(main_module.settings, "trusted_proxy_hops", 1)
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(app)
+
+    res = client.post(
+        '/mcp',
+        headers={"X-Forwarded-For": "198.51.100.7, 203.0.113.9"},
+        json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+    )
+
+    assert res.status_code == 200
+    assert list(main_module.rate_limiter._requests) == ["ip:203.0.113.9"]
+
+
+def test_batch_weight_is_charged_to_ip_and_subject(monkeypatch):
+    monkeypatch.setattr(main_module, "authenticator", StubAuthenticator())
+    monkeypatch.setattr(main_module.rate_limiter, "max_requests", 10)
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(app)
+
+    res = client.post(
+        '/mcp',
+        headers={"Authorization": "Bearer test-token"},
+        json=[{"jsonrpc": "2.0", "id": i, "method": "tools/list"} for i in range(3)],
+    )
+
+    assert res.status_code == 200
+    assert len(main_module.rate_limiter._requests["ip:testclient"]) == 3
+    assert len(main_module.rate_limiter._requests["sub:tester"]) == 3
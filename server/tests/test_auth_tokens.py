@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from vic_rego_estimator.auth import AuthError, JWKSCache, OIDCAuthenticator
+
+ISSUER = "https://issuer.example/"
+AUDIENCE = "api://vic-rego"
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _int_b64url(value: int) -> str:
+    return _b64url(value.to_bytes((value.bit_length() + 7) // 8, byteorder="big"))
+
+
+def _jwks(kid: str = "key-1") -> dict:
+    numbers = PRIVATE_KEY.public_key().public_numbers()
+    return {"keys": [{"kty": "RSA", "kid": kid, "n": _int_b64url(numbers.n), "e": _int_b64url(numbers.e)}]}
+
+
+def _token(kid: str = "key-1", **claims) -> str:
+    now = int(time.time())
+    payload = {"iss": ISSUER, "aud": AUDIENCE, "sub": "tester", "iat": now, "exp": now + 300, **claims}
+    header_segment = _b64url(json.dumps({"alg": "RS256", "kid": kid}).encode())
+    payload_segment = _b64url(json.dumps(payload).encode())
+    signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+    signature = PRIVATE_KEY.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+    return f"{header_segment}.{payload_segment}.{_b64url(signature)}"
+
+
+class JWKSServer:
+    def __init__(self, kid: str = "key-1", cache_control: str | None = None) -> None:
+        self.kid = kid
+        self.cache_control = cache_control
+        self.requests = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        headers = {"Cache-Control": self.cache_control} if self.cache_control else {}
+        return httpx.Response(200, json=_jwks(self.kid), headers=headers)
+
+
+def _authenticator(server: JWKSServer, min_refetch_interval_seconds: float = 30) -> OIDCAuthenticator:
+    cache = JWKSCache(
+        "https://issuer.example/.well-known/jwks.json",
+        min_refetch_interval_seconds=min_refetch_interval_seconds,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(server.handler)),
+    )
+    return OIDCAuthenticator(
+        issuer=ISSUER,
+        audience=AUDIENCE,
+        client_id="chatgpt-connector",
+        jwks_url=cache.jwks_url,
+        authorization_url=f"{ISSUER}authorize",
+        algorithms=["RS256"],
+        required_scope=None,
+        jwks_cache=cache,
+    )
+
+
+def test_jwks_is_fetched_once_for_repeated_tokens():
+    server = JWKSServer()
+    authenticator = _authenticator(server)
+
+    async def scenario():
+        for index in range(3):
+            claims = await authenticator.validate_token(_token(jti=f"token-{index}"))
+            assert claims["sub"] == "tester"
+
+    asyncio.run(scenario())
+
+    assert server.requests == 1
+    assert authenticator.jwks_cache.fetches == 1
+    assert authenticator.jwks_cache.hits >= 2
+
+
+def test_unknown_kid_refetches_for_key_rotation():
+    server = JWKSServer(kid="key-1")
+    authenticator = _authenticator(server, min_refetch_interval_seconds=0)
+
+    async def scenario():
+        await authenticator.validate_token(_token(kid="key-1"))
+        server.kid = "key-2"
+        return await authenticator.validate_token(_token(kid="key-2"))
+
+    claims = asyncio.run(scenario())
+
+    assert claims["sub"] == "tester"
+    assert server.requests == 2
+
+
+def test_unknown_kid_refetch_is_rate_limited():
+    server = JWKSServer(kid="key-1")
+    authenticator = _authenticator(server, min_refetch_interval_seconds=60)
+
+    async def scenario():
+        await authenticator.validate_token(_token(kid="key-1"))
+        for _ in range(5):
+            with pytest.raises(AuthError, match="Unable to find signing key"):
+                await authenticator.validate_token(_token(kid="forged"))
+
+    asyncio.run(scenario())
+
+    assert server.requests == 1
+
+
+def test_cache_control_max_age_expires_keys():
+    server = JWKSServer(cache_control="public, max-age=0")
+    authenticator = _authenticator(server, min_refetch_interval_seconds=0)
+
+    async def scenario():
+        await authenticator.validate_token(_token(jti="first"))
+        await authenticator.validate_token(_token(jti="second"))
+
+    asyncio.run(scenario())
+
+    assert server.requests == 2
+
+
+def test_repeated_token_is_served_from_verified_token_cache():
+    server = JWKSServer()
+    authenticator = _authenticator(server)
+    token = _token()
+
+    async def scenario():
+        first = await authenticator.validate_token(token)
+        lookups_after_first = authenticator.jwks_cache.hits + authenticator.jwks_cache.misses
+        second = await authenticator.validate_token(token)
+        return first, second, lookups_after_first
+
+    first, second, lookups_after_first = asyncio.run(scenario())
+
+    assert second is first
+    assert authenticator.jwks_cache.hits + authenticator.jwks_cache.misses == lookups_after_first
+    assert authenticator.token_cache.hits == 1
+
+
+def test_cached_token_is_rejected_once_expired(monkeypatch):
+    server = JWKSServer()
+    authenticator = _authenticator(server)
+    token = _token(exp=int(time.time()) + 60)
+    asyncio.run(authenticator.validate_token(token))
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+
+    with pytest.raises(AuthError, match="invalid or expired"):
+        asyncio.run(authenticator.validate_token(token))
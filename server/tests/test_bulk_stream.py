@@ -0,0 +1,125 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.background import BackgroundTask
+from starlette.requests import ClientDisconnect
+
+import vic_rego_estimator.main as main_module
+from vic_rego_estimator.tools.bulk import PayloadReader, iter_lines
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(main_module, "authenticator", None)
+    main_module.rate_limiter._requests.clear()
+    return TestClient(main_module.app)
+
+
+def _chunks(*parts: bytes):
+    async def generate():
+        for part in parts:
+            yield part
+
+    return generate()
+
+
+async def _collect(chunks, max_line_bytes: int = 1024) -> list:
+    return [line async for batch in iter_lines(chunks, max_line_bytes) for line in batch]
+
+
+def test_iter_lines_reframes_chunks_and_skips_oversized_lines():
+    lines = asyncio.run(_collect(_chunks(b'{"a":', b'1}\n{"b":2}\n' + b"x" * 40, b"x" * 40 + b"\nlast"), 64))
+
+    assert lines[:2] == ['{"a":1}', '{"b":2}']
+    assert isinstance(lines[2], ValueError)
+    assert lines[3:] == ["last"]
+
+
+def test_csv_reader_keeps_header_across_chunks_and_nests_dotted_columns():
+    reader = PayloadReader("csv")
+    first = list(reader.feed(["transaction_type,vehicle_category,postcode,concession_flags.pensioner"]))
+    second = list(reader.feed(["renewal,passenger_car,,true", "renewal,motorcycle"]))
+
+    assert first == []
+    assert second[0] == {
+        "transaction_type": "renewal",
+        "vehicle_category": "passenger_car",
+        "concession_flags": {"pensioner": "true"},
+    }
+    assert isinstance(second[1], ValueError)
+
+
+def test_request_body_streaming_response_runs_background_and_maps_send_errors():
+    ran = []
+
+    async def body():
+        yield b"row\n"
+
+    async def send(message):
+        pass
+
+    async def broken_send(message):
+        raise OSError("connection reset")
+
+    async def receive():
+        raise AssertionError("the response must not read the request body")
+
+    async def scenario():
+        scope = {"type": "http", "asgi": {"spec_version": "2.3"}}
+        await main_module.RequestBodyStreamingResponse(body(), background=BackgroundTask(ran.append, "done"))(scope, receive, send)
+        with pytest.raises(ClientDisconnect):
+            await main_module.RequestBodyStreamingResponse(body())(scope, receive, broken_send)
+
+    asyncio.run(scenario())
+
+    assert ran == ["done"]
+
+
+def test_ndjson_stream_prices_rows_in_order_with_inline_errors(client: TestClient):
+    body = "\n".join(
+        [
+            json.dumps({"transaction_type": "renewal", "vehicle_category": "passenger_car"}),
+            json.dumps({"transaction_type": "renewal", "vehicle_category": "spaceship"}),
+            "not json",
+            "",
+            json.dumps({"transaction_type": "new_registration", "vehicle_category": "motorcycle", "term_months": 6}),
+        ]
+    )
+
+    res = client.post("/estimate/stream", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["index"] for row in rows] == [0, 1, 2, 3]
+    assert rows[0]["estimate"]["total_min"] > 0
+    assert rows[1]["error"]["fields"][0]["loc"] == ["vehicle_category"]
+    assert rows[2]["error"]["message"].startswith("Invalid JSON")
+    assert rows[3]["estimate"]["vehicle_category"] == "motorcycle"
+
+
+def test_csv_stream_returns_csv_results(client: TestClient):
+    body = (
+        "transaction_type,vehicle_category,term_months\n"
+        "renewal,passenger_car,12\n"
+        "renewal,spaceship,12\n"
+    )
+
+    res = client.post("/estimate/stream", content=body, headers={"Content-Type": "text/csv"})
+
+    assert res.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [row["index"] for row in rows] == ["0", "1"]
+    assert float(rows[0]["total_min"]) > 0
+    assert rows[0]["error"] == ""
+    assert rows[1]["error"].startswith("Invalid vehicle request: vehicle_category")
+
+
+def test_stream_rejects_unsupported_content_type(client: TestClient):
+    res = client.post("/estimate/stream", json=[{"transaction_type": "renewal"}])
+
+    assert res.status_code == 415
@@ -0,0 +1,96 @@
+import csv
+import json
+
+import pytest
+
+from vic_rego_estimator.cli import main, price_file
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+
+VEHICLES = [
+    {"transaction_type": "renewal", "vehicle_category": "passenger_car"},
+    {"transaction_type": "renewal", "vehicle_category": "spaceship"},
+    {"transaction_type": "transfer", "vehicle_category": "motorcycle", "market_value_aud": 20000},
+    {"transaction_type": "new_registration", "vehicle_category": "passenger_car", "term_months": 6},
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "snapshot.json"
+    path.write_text(fallback_snapshot().model_dump_json(), encoding="utf-8")
+    return path
+
+
+def test_ndjson_output_is_ordered_and_identical_across_worker_counts(tmp_path, snapshot_path):
+    source = tmp_path / "fleet.ndjson"
+    source.write_text("".join(json.dumps(vehicle) + "\n" for vehicle in VEHICLES * 5), encoding="utf-8")
+
+    stats = price_file(source, tmp_path / "serial.ndjson", snapshot_path, workers=1, chunk_size=3)
+    price_file(source, tmp_path / "pooled.ndjson", snapshot_path, workers=2, chunk_size=3)
+
+    serial = (tmp_path / "serial.ndjson").read_bytes()
+    assert serial == (tmp_path / "pooled.ndjson").read_bytes()
+    rows = [json.loads(line) for line in serial.splitlines()]
+    assert [row["index"] for row in rows] == list(range(20))
+    assert rows[1]["error"]["fields"][0]["loc"] == ["vehicle_category"]
+    assert rows[2]["estimate"]["transaction_type"] == "transfer"
+    assert stats["rows"] == 20
+    assert stats["errors"] == 5
+
+
+def test_cli_writes_csv_for_csv_input(tmp_path, snapshot_path, capsys):
+    source = tmp_path / "fleet.csv"
+    source.write_text(
+        "transaction_type,vehicle_category,term_months,concession_flags.pensioner\n"
+        "renewal,passenger_car,12,\n"
+        "renewal,passenger_car,12,true\n"
+        "renewal,spaceship,12,\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "priced.csv"
+
+    assert main([str(source), str(output), "--snapshot", str(snapshot_path), "--workers", "1"]) == 0
+
+    rows = list(csv.DictReader(output.open(encoding="utf-8")))
+    assert [row["index"] for row in rows] == ["0", "1", "2"]
+    assert float(rows[1]["total_min"]) <= float(rows[0]["total_min"])
+    assert rows[2]["error"].startswith("Invalid vehicle request")
+    assert "done: 3 rows (1 errors)" in capsys.readouterr().err
+
+
+def test_parquet_round_trip(tmp_path, snapshot_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    source = tmp_path / "fleet.parquet"
+    pq.write_table(pa.Table.from_pylist(VEHICLES), source)
+
+    price_file(source, tmp_path / "priced.parquet", snapshot_path, workers=1)
+
+    table = pq.read_table(tmp_path / "priced.parquet").to_pylist()
+    assert [row["index"] for row in table] == [0, 1, 2, 3]
+    assert table[1]["total_min"] is None
+    assert table[1]["error"].startswith("Invalid vehicle request")
+
+
+@pytest.mark.parametrize("option", ["--chunk-size", "--workers"])
+@pytest.mark.parametrize("value", ["0", "-2", "many"])
+def test_cli_rejects_non_positive_chunk_size_and_workers(tmp_path, snapshot_path, capsys, option, value):
+    source = tmp_path / "fleet.ndjson"
+    source.write_text(json.dumps(VEHICLES[0]) + "\n", encoding="utf-8")
+    output = tmp_path / "priced.ndjson"
+
+    with pytest.raises(SystemExit) as excinfo:
+        main([str(source), str(output), "--snapshot", str(snapshot_path), option, value])
+
+    assert excinfo.value.code != 0
+    assert "expected a positive integer" in capsys.readouterr().err
+    assert not output.exists()
+
+
+def test_price_file_rejects_zero_chunk_size(tmp_path, snapshot_path):
+    source = tmp_path / "fleet.ndjson"
+    source.write_text(json.dumps(VEHICLES[0]) + "\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="chunk_size"):
+        price_file(source, tmp_path / "priced.ndjson", snapshot_path, workers=1, chunk_size=0)
+    assert not (tmp_path / "priced.ndjson").exists()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import vic_rego_estimator.main as main_module
+import vic_rego_estimator.tools.registry as registry
+from vic_rego_estimator.storage.snapshot_store import LocalFileSnapshotBackend, SnapshotStore, fallback_snapshot
+from vic_rego_estimator.tools.normalize import normalize_vehicle_request
+
+
+@pytest.fixture
+def local_store(monkeypatch, tmp_path) -> SnapshotStore:
+    store = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json"), ttl_seconds=3600)
+    asyncio.run(store.save(fallback_snapshot()))
+    monkeypatch.setattr(registry, "store", store)
+    monkeypatch.setattr(main_module, "authenticator", None)
+    registry.estimate_cache.clear()
+    return store
+
+
+def _estimate(client: TestClient, arguments: dict, req_id: int = 1):
+    main_module.rate_limiter._requests.clear()
+    return client.post(
+        "/mcp",
+        json={
+            "jsonrpc": "2.0",
+            "id": req_id,
+            "method": "tools/call",
+            "params": {"name": "estimate_registration_cost", "arguments": arguments},
+        },
+    )
+
+
+def test_repeated_estimate_is_served_from_cache(local_store: SnapshotStore):
+    client = TestClient(main_module.app)
+    arguments = {"transaction_type": "renewal", "vehicle_category": "passenger_car"}
+    hits_before = registry.estimate_cache.hits
+
+    first = _estimate(client, arguments, req_id=1)
+    second = _estimate(client, arguments, req_id=2)
+
+    assert registry.estimate_cache.hits == hits_before + 1
+    assert first.json()["id"] == 1
+    assert second.json()["id"] == 2
+    assert first.json()["result"] == second.json()["result"]
+
+
+def test_new_snapshot_invalidates_cached_estimates(local_store: SnapshotStore):
+    client = TestClient(main_module.app)
+    arguments = {"transaction_type": "transfer", "vehicle_category": "passenger_car", "market_value_aud": 20000}
+    before = _estimate(client, arguments).json()["result"]["structuredContent"]["estimate"]
+
+    asyncio.run(local_store.save(fallback_snapshot().model_copy(update={"transfer_fee": 99.0})))
+    after = _estimate(client, arguments).json()["result"]["structuredContent"]["estimate"]
+
+    assert before["total_min"] + 99.0 - 46.7 == pytest.approx(after["total_min"])
+    assert len(registry.estimate_cache) == 1
+
+
+def _call(client: TestClient, tool: str, arguments: dict):
+    main_module.rate_limiter._requests.clear()
+    return client.post(
+        "/mcp",
+        json={"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": tool, "arguments": arguments}},
+    )
+
+
+def test_follow_up_tools_reuse_the_normalized_request(local_store: SnapshotStore, monkeypatch):
+    registry.normalize_cache.clear()
+    calls = []
+    monkeypatch.setattr(
+        registry,
+        "normalize_vehicle_request",
+        lambda payload: calls.append(payload) or normalize_vehicle_request(payload),
+    )
+    client = TestClient(main_module.app)
+    arguments = {"transaction_type": "transfer", "vehicle_category": "passenger_car", "postcode": "3000"}
+
+    normalized = _call(client, "normalize_vehicle_request", arguments).json()["result"]["structuredContent"]
+    assumptions = _call(client, "explain_assumptions", dict(reversed(arguments.items()))).json()["result"]
+    estimate = _call(client, "estimate_registration_cost", arguments).json()["result"]
+
+    assert len(calls) == 1
+    assert assumptions["structuredContent"]["assumptions"] == normalized["normalizedRequest"]["assumptions"]
+    assert estimate["structuredContent"]["estimate"]["total_min"] > 0
+
+
+def test_normalize_cache_key_keeps_nested_order_and_expires():
+    flags_ab = {"transaction_type": "renewal", "concession_flags": {"pensioner": True, "veteran": True}}
+    flags_ba = {"transaction_type": "renewal", "concession_flags": {"veteran": True, "pensioner": True}}
+    assert registry._normalize_cache_key(flags_ab) != registry._normalize_cache_key(flags_ba)
+    assert registry._normalize_cache_key({"year": float("nan")}) is None
+
+    key = registry._normalize_cache_key(flags_ab)
+    registry.normalize_cache.set(key, "normalized")
+    assert registry.normalize_cache.ttl_seconds > 0
+    assert registry.normalize_cache.get(key, now=time.time() + registry.normalize_cache.ttl_seconds + 1) is None
@@ -0,0 +1,110 @@
+import random
+
+from pydantic_core import to_json
+
+from vic_rego_estimator.models.schemas import EstimateResult, FeeLineItem, FeeSnapshot, NormalizedVehicleRequest
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+from vic_rego_estimator.tools.estimator import ESTIMATE_RECORD_ADAPTER, estimate_record, estimate_registration_cost
+from vic_rego_estimator.tools.fee_schedule import BUSINESS_ADMIN_FEE, CATEGORIES, compile_fee_schedule
+from vic_rego_estimator.tools.normalize import normalize_vehicle_request
+
+
+def reference_estimate(normalized: NormalizedVehicleRequest, snapshot: FeeSnapshot) -> EstimateResult:
+    # The original FeeLineItem-based implementation with the nested override loop.
+    schedule = compile_fee_schedule(snapshot)
+    lines: list[FeeLineItem] = []
+    assumptions = list(normalized.assumptions)
+
+    reg_fee = schedule.registration_fee[(normalized.vehicle_category, normalized.term_months)]
+    tac = schedule.tac_charge[normalized.term_months]
+    concessions_applied = [
+        flag for flag, enabled in normalized.concession_flags.items() if enabled and flag in schedule.concession_names
+    ]
+    reg_fee *= schedule.concession_discounts[frozenset(concessions_applied)]
+
+    lines.append(FeeLineItem(key="registration_fee", label="Registration fee", amount_min=round(reg_fee, 2), amount_max=round(reg_fee, 2), source=schedule.source_at(0)))
+    lines.append(FeeLineItem(key="tac_charge", label="TAC charge", amount_min=round(tac, 2), amount_max=round(tac, 2), source=schedule.source_at(0)))
+    if normalized.transaction_type == "transfer":
+        lines.append(FeeLineItem(key="transfer_fee", label="Transfer fee", amount_min=schedule.transfer_fee, amount_max=schedule.transfer_fee, source=schedule.source_at(2)))
+        if normalized.market_value_aud is None:
+            duty_min, duty_max = schedule.unknown_value_duty
+            assumptions.append("Used $10k-$45k market value range for duty.")
+        else:
+            duty_min = duty_max = schedule.duty_amount(normalized.market_value_aud)
+        lines.append(FeeLineItem(key="motor_vehicle_duty", label="Motor vehicle duty (stamp duty)", amount_min=duty_min, amount_max=duty_max, source=schedule.source_at(3)))
+    if normalized.transaction_type == "new_registration":
+        lines.append(FeeLineItem(key="number_plate_fee", label="Number plate fee", amount_min=schedule.number_plate_fee, amount_max=schedule.number_plate_fee, source=schedule.source_at(0)))
+    if normalized.use_type == "business":
+        lines.append(FeeLineItem(key="business_admin", label="Business processing surcharge", amount_min=BUSINESS_ADMIN_FEE, amount_max=BUSINESS_ADMIN_FEE, source=schedule.source_at(0), notes="May vary by channel."))
+
+    for key, value in normalized.manual_overrides.items():
+        for line in lines:
+            if line.key == key:
+                line.amount_min = value
+                line.amount_max = value
+                line.notes = "Manually overridden in widget"
+
+    total_min = round(sum(item.amount_min for item in lines), 2)
+    total_max = round(sum(item.amount_max for item in lines), 2)
+    uncertainty_points = len(normalized.unknown_fields) + (1 if total_min != total_max else 0)
+    confidence = "high" if uncertainty_points == 0 else "medium" if uncertainty_points <= 2 else "low"
+    score = max(0.3, round(1 - uncertainty_points * 0.15, 2))
+    return EstimateResult(
+        transaction_type=normalized.transaction_type,
+        vehicle_category=normalized.vehicle_category,
+        total_min=total_min,
+        total_max=total_max,
+        confidence=confidence,
+        confidence_score=score,
+        line_items=lines,
+        assumptions=assumptions,
+        concessions_applied=concessions_applied,
+        last_refresh=snapshot.refreshed_at,
+        source_urls=snapshot.sources,
+    )
+
+
+OVERRIDE_KEYS = ["registration_fee", "tac_charge", "transfer_fee", "motor_vehicle_duty", "number_plate_fee", "business_admin", "unknown"]
+
+
+def _random_request(rng: random.Random) -> NormalizedVehicleRequest:
+    payload = {
+        "transaction_type": rng.choice(["renewal", "transfer", "new_registration"]),
+        "vehicle_category": rng.choice(CATEGORIES),
+        "term_months": rng.choice([3, 6, 12]),
+        "use_type": rng.choice(["private", "business"]),
+        "concession_flags": {flag: rng.random() < 0.5 for flag in rng.sample(["pensioner", "veteran", "primary_producer", "other"], 2)},
+        "manual_overrides": {key: rng.choice([0, 12, 99.95, 1234.5]) for key in rng.sample(OVERRIDE_KEYS, rng.randint(0, 3))},
+    }
+    if rng.random() < 0.5:
+        payload["market_value_aud"] = rng.choice([0, 9999.99, 45000, 68999, 69000, 150000])
+    if rng.random() < 0.5:
+        payload.update(make="Toyota", model="Corolla", year=2020, fuel_type="petrol", postcode="3000")
+    return normalize_vehicle_request(payload)
+
+
+def test_records_match_reference_models_and_bytes():
+    rng = random.Random(7)
+    snapshot = fallback_snapshot()
+    for _ in range(2000):
+        normalized = _random_request(rng)
+        expected = reference_estimate(normalized, snapshot)
+
+        assert estimate_registration_cost(normalized, snapshot) == expected
+        assert ESTIMATE_RECORD_ADAPTER.dump_json(estimate_record(normalized, snapshot)) == to_json(expected)
+
+
+def test_overrides_replace_matching_lines_only():
+    normalized = normalize_vehicle_request(
+        {
+            "transaction_type": "renewal",
+            "vehicle_category": "passenger_car",
+            "manual_overrides": {"tac_charge": 100.0, "transfer_fee": 5.0},
+        }
+    )
+
+    record = estimate_record(normalized, fallback_snapshot())
+
+    assert [line.key for line in record.line_items] == ["registration_fee", "tac_charge"]
+    assert record.line_items[1].amount_min == 100.0
+    assert record.line_items[1].notes == "Manually overridden in widget"
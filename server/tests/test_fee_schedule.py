@@ -0,0 +1,45 @@
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+from vic_rego_estimator.tools.fee_schedule import compile_fee_schedule
+
+
+def test_schedule_is_reused_until_snapshot_changes():
+    snapshot = fallback_snapshot()
+
+    first = compile_fee_schedule(snapshot)
+    again = compile_fee_schedule(snapshot)
+    rebuilt = compile_fee_schedule(snapshot.model_copy(update={"transfer_fee": 50.0}))
+
+    assert again is first
+    assert rebuilt is not first
+    assert rebuilt.transfer_fee == 50.0
+
+
+def test_alternating_snapshots_keep_their_schedules():
+    live = fallback_snapshot().model_copy(update={"transfer_fee": 50.0})
+    pinned = fallback_snapshot()
+
+    first_live = compile_fee_schedule(live)
+    first_pinned = compile_fee_schedule(pinned)
+
+    assert compile_fee_schedule(live) is first_live
+    assert compile_fee_schedule(pinned) is first_pinned
+    assert compile_fee_schedule(fallback_snapshot()) is first_pinned
+
+
+def test_schedule_precomputes_lookups():
+    schedule = compile_fee_schedule(fallback_snapshot())
+
+    assert schedule.registration_fee[("passenger_car", 6)] == 493.22
+    assert schedule.registration_fee[("bus", 6)] == 600.0
+    assert schedule.tac_charge[3] == 132.5
+    assert schedule.concession_discounts[frozenset()] == 1.0
+    assert schedule.concession_discounts[frozenset({"pensioner", "veteran"})] == 0.5
+    assert schedule.unknown_value_duty == (420.0, 1890.0)
+
+
+def test_duty_bands_use_highest_threshold_reached():
+    schedule = compile_fee_schedule(fallback_snapshot())
+
+    assert schedule.duty_amount(68999) == round(68999 * 0.042, 2)
+    assert schedule.duty_amount(69000) == round(69000 * 0.048, 2)
+    assert schedule.duty_amount(150000) == round(150000 * 0.052, 2)
@@ -0,0 +1,79 @@
+from fastapi.testclient import TestClient
+
+import vic_rego_estimator.main as main_module
+import vic_rego_estimator.metrics as metrics_module
+from vic_rego_estimator.metrics import MetricFamily, MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ("method",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("method",), buckets=(0.1, 1.0))
+    registry.register_collector(lambda: [MetricFamily("age_seconds", "gauge", "Age.", [({"source": 'a"b'}, 2.5)])])
+
+    calls.inc("tools/list")
+    calls.inc("tools/list")
+    latency.observe("tools/list", value=0.05)
+    latency.observe("tools/list", value=0.5)
+    latency.observe("tools/list", value=3)
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{method="tools/list"} 2' in text
+    assert 'latency_seconds_bucket{method="tools/list",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{method="tools/list",le="1"} 2' in text
+    assert 'latency_seconds_bucket{method="tools/list",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{method="tools/list"} 3' in text
+    assert 'latency_seconds_sum{method="tools/list"} 3.55' in text
+    assert 'age_seconds{source="a\\"b"} 2.5' in text
+
+
+def test_multiprocess_exposition_sums_worker_files(monkeypatch, tmp_path):
+    workers = []
+    for pid in (101, 102):
+        registry = MetricsRegistry()
+        counter = registry.counter("calls_total", "Calls.", ("method",))
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(1.0,))
+        registry.register_collector(
+            lambda pid=pid: [
+                MetricFamily("cache_lookups_total", "counter", "Lookups.", [({"result": "hit"}, pid - 100)]),
+                MetricFamily("worker_pid", "gauge", "Worker.", [({}, pid)]),
+            ]
+        )
+        counter.inc("initialize", amount=pid - 100)
+        histogram.observe(value=0.5)
+        workers.append((pid, registry))
+
+    for pid, registry in workers:
+        monkeypatch.setattr(metrics_module.os, "getpid", lambda pid=pid: pid)
+        registry.flush(tmp_path)
+    text = workers[1][1].render(tmp_path)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["metrics_101.json", "metrics_102.json"]
+    assert 'calls_total{method="initialize"} 3' in text
+    assert 'latency_seconds_count 2' in text
+    assert 'cache_lookups_total{result="hit"} 3' in text
+    # Gauges describe the worker that served the scrape.
+    assert "worker_pid 102" in text
+
+
+def test_metrics_endpoint_reports_mcp_calls_by_method_and_tool(monkeypatch):
+    monkeypatch.setattr(main_module, "authenticator", None)
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(main_module.app)
+
+    client.post("/mcp", json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+    client.post(
+        "/mcp",
+        json={"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "nope", "arguments": {}}},
+    )
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'vic_rego_mcp_requests_total{method="tools/list",tool="",status="ok"}' in text
+    assert 'vic_rego_mcp_requests_total{method="tools/call",tool="unknown",status="404"}' in text
+    assert 'vic_rego_mcp_request_duration_seconds_bucket{method="tools/list",tool="",le="+Inf"}' in text
+    assert 'vic_rego_snapshot_cache_lookups_total{result="hit"}' in text
+    assert "vic_rego_rate_limit_rejections_total" in text
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from vic_rego_estimator.models.schemas import NormalizedVehicleRequest, VehicleRequest
+from vic_rego_estimator.tools.normalize import CATEGORY_DEFAULTS, CONCESSION_HINTS, normalize_vehicle_request
+
+
+def reference_normalize(payload: dict) -> NormalizedVehicleRequest:
+    # The original validate -> dump -> merge -> re-validate implementation.
+    req = VehicleRequest.model_validate(payload)
+    inferred_fields: dict[str, object] = {}
+    assumptions: list[str] = []
+    unknown_fields: list[str] = []
+
+    data = req.model_dump()
+    for field_name, default_value in CATEGORY_DEFAULTS[req.vehicle_category].items():
+        if data.get(field_name) is None:
+            data[field_name] = default_value
+            inferred_fields[field_name] = default_value
+            assumptions.append(f"Defaulted {field_name} to {default_value} based on vehicle category.")
+
+    if not req.postcode and not req.suburb:
+        unknown_fields.append("postcode_or_suburb")
+        assumptions.append("Geographic rating zone unknown; used metro baseline and widened TAC range.")
+
+    if req.transaction_type == "transfer" and req.market_value_aud is None:
+        unknown_fields.append("market_value_aud")
+        assumptions.append("Market value unknown; motor vehicle duty estimated as a range.")
+
+    for flag, enabled in req.concession_flags.items():
+        if enabled and flag in CONCESSION_HINTS:
+            assumptions.append(CONCESSION_HINTS[flag])
+
+    for required in ["make", "model", "year", "fuel_type"]:
+        if data.get(required) is None:
+            unknown_fields.append(required)
+
+    return NormalizedVehicleRequest(
+        **data,
+        inferred_fields=inferred_fields,
+        unknown_fields=sorted(set(unknown_fields)),
+        assumptions=assumptions,
+    )
+
+
+CHOICES = {
+    "transaction_type": ["renewal", "transfer", "new_registration", "cancel"],
+    "vehicle_category": [*CATEGORY_DEFAULTS, "spaceship"],
+    "make": ["Toyota", "Ford", "", None],
+    "model": ["Hilux", "Ranger", None],
+    "year": [2019, "2021", 1999.0, "old", None],
+    "body_type": ["wagon", "", None],
+    "fuel_type": ["petrol", "diesel", None],
+    "tare_kg": [1200, 1480.5, "1600", 0, None],
+    "gvm_kg": [3500, "9000", None],
+    "seats": [1, 7, "5", 2.5, None],
+    "postcode": ["3000", "3550", "", None],
+    "suburb": ["Carlton", "", None],
+    "use_type": ["private", "business", "fleet"],
+    "term_months": [3, 6, 12, "12", 9],
+    "market_value_aud": [0, 15000, "32000.5", None],
+    "concession_flags": [
+        {},
+        {"pensioner": True},
+        {"veteran": "true", "primary_producer": False},
+        {"unknown_flag": True, "pensioner": 1},
+        {"pensioner": "maybe"},
+    ],
+    "manual_overrides": [{}, {"tac_charge": 500}, {"registration_fee": "812.40"}, {"transfer_fee": "free"}],
+    "unexpected_field": ["ignored"],
+    "assumptions": ["injected", 5],
+    "inferred_fields": [{"tare_kg": 1}],
+}
+
+
+def _random_payload(rng: random.Random) -> dict:
+    return {field: rng.choice(values) for field, values in CHOICES.items() if rng.random() < 0.6}
+
+
+def _typed_dump(model: NormalizedVehicleRequest) -> dict:
+    # model_dump() == model_dump() would treat 1500 and 1500.0 as equal; compare types too.
+    return {name: (type(value), value) for name, value in model.__dict__.items()}
+
+
+def test_single_pass_normalizer_matches_reference_on_random_payloads():
+    rng = random.Random(20240601)
+    compared = 0
+    for _ in range(3000):
+        payload = _random_payload(rng)
+        try:
+            expected = reference_normalize(payload)
+        except ValidationError as exc:
+            with pytest.raises(ValidationError) as raised:
+                normalize_vehicle_request(payload)
+            assert str(raised.value) == str(exc)
+            continue
+
+        actual = normalize_vehicle_request(payload)
+        assert _typed_dump(actual) == _typed_dump(expected), payload
+        assert actual.model_fields_set == expected.model_fields_set
+        assert actual.model_dump_json() == expected.model_dump_json()
+        compared += 1
+
+    # Make sure the seed still exercises the success path, not just validation errors.
+    assert compared > 200
+
+
+def test_non_dict_payloads_behave_like_reference():
+    request = VehicleRequest(transaction_type="renewal", vehicle_category="motorcycle")
+    assert normalize_vehicle_request(request) == reference_normalize(request)
+
+    with pytest.raises(ValidationError) as raised:
+        normalize_vehicle_request(["renewal"])
+    with pytest.raises(ValidationError) as expected:
+        reference_normalize(["renewal"])
+    assert raised.value.errors() == expected.value.errors()
+
+
+def test_defaults_are_typed_but_reported_raw():
+    normalized = normalize_vehicle_request({"transaction_type": "renewal", "vehicle_category": "passenger_car"})
+
+    assert normalized.tare_kg == 1500.0 and isinstance(normalized.tare_kg, float)
+    assert normalized.inferred_fields["tare_kg"] == 1500 and isinstance(normalized.inferred_fields["tare_kg"], int)
+    assert "Defaulted tare_kg to 1500 based on vehicle category." in normalized.assumptions
@@ -104,7 +104,7 @@ def test_request_id_generated_when_missing(client: TestClient):
 
 def test_www_authenticate_header_contains_actionable_details(monkeypatch):
     class RejectingAuthenticator:
-        def validate_authorization_header(self, header: str | None) -> dict:
+        async def validate_authorization_header(self, header: str | None) -> dict:
             raise main_module.AuthError("Missing bearer token", error="invalid_request")
 
         def challenge_header(self, error: str, description: str) -> str:
@@ -129,3 +129,19 @@ def test_www_authenticate_header_contains_actionable_details(monkeypatch):
     assert 'resource="api://vic-rego"' in challenge
     assert 'client_id="chatgpt-connector"' in challenge
     assert 'error="invalid_request"' in challenge
+
+
+def test_batch_counts_each_request_against_rate_limit(monkeypatch, client: TestClient):
+    monkeypatch.setattr(main_module, "authenticator", None)
+    monkeypatch.setattr(main_module.rate_limiter, "max_requests", 3)
+    monkeypatch.setattr(main_module.rate_limiter, "window_seconds", 60)
+    main_module.rate_limiter._requests.clear()
+
+    batch = [{"jsonrpc": "2.0", "id": index, "method": "tools/list"} for index in range(3)]
+    first = client.post("/mcp", json=batch)
+    second = client.post("/mcp", json=batch)
+
+    assert first.status_code == 200
+    assert len(first.json()) == 3
+    assert second.status_code == 429
+    assert second.headers["Retry-After"]
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from vic_rego_estimator.rate_limit import (
+    GCRARateLimiter,
+    RedisRateLimiter,
+    SlidingWindowRateLimiter,
+)
+
+
+@pytest.fixture
+def redis_client():
+    # Runs GCRA_SCRIPT itself through fakeredis' embedded Lua interpreter.
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+def _run_checks(limiter, key, times, cost=1):
+    async def scenario():
+        return [await limiter.check(key, now=now, cost=cost) for now in times]
+
+    return asyncio.run(scenario())
+
+
+def test_redis_limiter_allows_burst_then_paces_requests(redis_client):
+    limiter = RedisRateLimiter(redis_client, max_requests=3, window_seconds=60)
+
+    decisions = _run_checks(limiter, "sub:alice", [1000.0, 1000.0, 1000.0, 1000.0, 1020.0])
+
+    assert [decision.allowed for decision in decisions] == [True, True, True, False, True]
+    assert decisions[3].retry_after_seconds == 20
+
+
+def test_redis_limiter_charges_batch_cost_and_isolates_identities(redis_client):
+    limiter = RedisRateLimiter(redis_client, max_requests=5, window_seconds=60)
+
+    async def scenario():
+        return (
+            await limiter.check("ip:1", now=0.0, cost=4),
+            await limiter.check("ip:1", now=0.0, cost=2),
+            await limiter.check("ip:2", now=0.0, cost=5),
+            set(await redis_client.keys("*")),
+        )
+
+    batch, single, other, keys = asyncio.run(scenario())
+
+    assert batch.allowed
+    assert not single.allowed
+    assert other.allowed
+    assert keys == {b"vic-rego:ratelimit:ip:1", b"vic-rego:ratelimit:ip:2"}
+
+
+def test_redis_limiter_fails_open_when_store_is_unavailable():
+    class BrokenClient:
+        async def eval(self, *args):
+            raise ConnectionError("redis down")
+
+    decision = asyncio.run(RedisRateLimiter(BrokenClient(), 1, 60).check("ip:1"))
+
+    assert decision.allowed
+
+
+def test_redis_limiter_shares_state_between_workers(redis_client):
+    workers = [RedisRateLimiter(redis_client, max_requests=2, window_seconds=60) for _ in range(3)]
+
+    async def scenario():
+        return [await worker.check("sub:alice", now=10.0) for worker in workers]
+
+    assert [decision.allowed for decision in asyncio.run(scenario())] == [True, True, False]
+
+
+def test_gcra_script_retry_after_on_redis_lua(redis_client):
+    limiter = RedisRateLimiter(redis_client, max_requests=2, window_seconds=10)
+
+    decisions = _run_checks(limiter, "sub:bob", [100.0, 100.0, 100.0, 105.0])
+
+    assert [decision.allowed for decision in decisions] == [True, True, False, True]
+    assert decisions[2].retry_after_seconds == 5
+
+
+def test_in_memory_gcra_matches_redis_script_decisions(redis_client):
+    times = [0.0, 0.0, 0.0, 0.0, 5.0, 19.0, 20.0, 20.0, 61.0]
+    local = _run_checks(GCRARateLimiter(max_requests=3, window_seconds=60), "ip:1", times)
+    shared = _run_checks(RedisRateLimiter(redis_client, max_requests=3, window_seconds=60), "ip:1", times)
+
+    assert local == shared
+    assert [decision.allowed for decision in local] == [True, True, True, False, False, False, True, False, True]
+
+
+def test_gcra_limiter_evicts_idle_identities():
+    limiter = GCRARateLimiter(max_requests=10, window_seconds=60)
+
+    async def scenario():
+        for index in range(1000):
+            await limiter.check(f"ip:{index}", now=0.0)
+        peak = len(limiter)
+        # Each identity's TAT is 6s out; later traffic drains the idle keys as it goes.
+        for index in range(600):
+            await limiter.check("sub:steady", now=10.0 + index * 6)
+        return peak
+
+    peak = asyncio.run(scenario())
+
+    assert peak == 1000
+    assert len(limiter) == 1
+    assert limiter.sweep(now=10_000.0) == 1
+    assert len(limiter) == 0
+
+
+def test_in_memory_limiter_remains_the_default():
+    from vic_rego_estimator.rate_limit import rate_limiter_from_settings
+
+    limiter = rate_limiter_from_settings()
+
+    assert isinstance(limiter, SlidingWindowRateLimiter)
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from vic_rego_estimator.storage.refresher import SnapshotRefresher
+from vic_rego_estimator.storage.snapshot_store import LocalFileSnapshotBackend, SnapshotStore, fallback_snapshot
+
+
+def test_run_once_records_status_and_swaps_snapshot(tmp_path):
+    store = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json"))
+    previous_seen = []
+
+    async def producer(previous):
+        previous_seen.append(previous)
+        return fallback_snapshot()
+
+    refresher = SnapshotRefresher(store, producer)
+
+    async def scenario():
+        assert await refresher.run_once()
+        assert await refresher.run_once()
+
+    asyncio.run(scenario())
+
+    assert previous_seen[0] is None
+    assert previous_seen[1] is not None
+    assert store.current is not None
+    assert refresher.status.last_success_at is not None
+    assert refresher.status.last_duration_seconds >= 0
+    assert refresher.status.consecutive_failures == 0
+
+
+def test_failures_back_off_exponentially_with_cap(tmp_path):
+    async def producer(previous):
+        raise RuntimeError("source down")
+
+    refresher = SnapshotRefresher(
+        SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json")),
+        producer,
+        interval_seconds=86400,
+        jitter_ratio=0,
+        retry_base_seconds=10,
+        retry_max_seconds=35,
+    )
+
+    delays = []
+
+    async def scenario():
+        for _ in range(4):
+            assert not await refresher.run_once()
+            delays.append(refresher.next_delay())
+
+    asyncio.run(scenario())
+
+    assert delays == [10, 20, 35, 35]
+    assert refresher.status.last_error == "RuntimeError: source down"
+    assert refresher.status.last_success_at is None
+
+
+def test_jitter_spreads_the_cadence():
+    async def producer(previous):
+        return fallback_snapshot()
+
+    store = SnapshotStore(backend=None)
+    low = SnapshotRefresher(store, producer, interval_seconds=1000, jitter_ratio=0.1, rng=lambda: 0.0)
+    high = SnapshotRefresher(store, producer, interval_seconds=1000, jitter_ratio=0.1, rng=lambda: 0.999999)
+
+    assert low.next_delay() == 900
+    assert 1099 < high.next_delay() <= 1100
+
+
+def test_initial_delay_resumes_from_stored_snapshot_age(tmp_path):
+    path = tmp_path / "latest.json"
+
+    async def producer(previous):
+        return fallback_snapshot()
+
+    async def scenario():
+        aged = fallback_snapshot().model_copy(
+            update={"refreshed_at": datetime.now(timezone.utc) - timedelta(seconds=400)}
+        )
+        await SnapshotStore(backend=LocalFileSnapshotBackend(path)).save(aged)
+        store = SnapshotStore(backend=LocalFileSnapshotBackend(path))
+        fresh = await SnapshotRefresher(store, producer, interval_seconds=1000, jitter_ratio=0).initial_delay()
+        empty = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "empty.json"))
+        missing = await SnapshotRefresher(empty, producer, interval_seconds=1000, jitter_ratio=0).initial_delay()
+        return fresh, missing
+
+    fresh, missing = asyncio.run(scenario())
+
+    assert 590 <= fresh <= 600
+    assert missing == 0
+
+
+def test_background_loop_refreshes_immediately_when_store_is_empty(tmp_path):
+    store = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json"))
+
+    async def scenario():
+        done = asyncio.Event()
+
+        async def producer(previous):
+            done.set()
+            return fallback_snapshot()
+
+        refresher = SnapshotRefresher(store, producer, interval_seconds=3600, jitter_ratio=0)
+        refresher.start()
+        await asyncio.wait_for(done.wait(), timeout=5)
+        while refresher.status.last_success_at is None:
+            await asyncio.sleep(0.001)
+        status = refresher.status.as_dict()
+        await refresher.stop()
+        return status, refresher.running
+
+    status, running = asyncio.run(scenario())
+
+    assert status["last_success_at"] is not None
+    assert status["next_refresh_at"] is not None
+    assert not running
@@ -1,4 +1,12 @@
-from vic_rego_estimator.scraping.parser import _parse_html_tables
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from vic_rego_estimator.config import settings
+from vic_rego_estimator.scraping.parser import _parse_html_tables, scrape_fee_snapshot
+from vic_rego_estimator.scraping.sources import VIC_SOURCES
 
 
 def test_parse_html_tables_fallbacks():
@@ -6,3 +14,82 @@ def test_parse_html_tables_fallbacks():
     parsed = _parse_html_tables(html)
     assert parsed['registration_fee_12'] == 990.5
     assert parsed['transfer_fee'] >= 48.8
+
+
+def test_scrape_fee_snapshot_fetches_sources_with_retries_and_timings(monkeypatch):
+    monkeypatch.setattr(settings, "scrape_retry_backoff_seconds", 0)
+    html = '<html><body><p>Registration fee $990.50</p><p>TAC $520.00</p><p>transfer $48.80</p><p>plate $42.20</p></body></html>'
+    calls: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        calls[url] = calls.get(url, 0) + 1
+        if url == VIC_SOURCES[0].url and calls[url] == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, text=html)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                return await scrape_fee_snapshot(client=client, executor=executor)
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot.light_vehicle_fee["12"] == 990.5
+    assert calls[VIC_SOURCES[0].url] == 2
+    assert set(snapshot.source_timings) == {source.url for source in VIC_SOURCES}
+    assert snapshot.source_timings[VIC_SOURCES[0].url]["attempts"] == 2
+    assert all(timing["fetch_ms"] >= 0 and timing["parse_ms"] >= 0 for timing in snapshot.source_timings.values())
+
+
+def test_scrape_fee_snapshot_raises_after_exhausting_retries(monkeypatch):
+    monkeypatch.setattr(settings, "scrape_retry_backoff_seconds", 0)
+    monkeypatch.setattr(settings, "scrape_retries", 1)
+
+    async def scenario():
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                await scrape_fee_snapshot(client=client, executor=executor)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(scenario())
+
+
+def test_scrape_fee_snapshot_skips_parsing_unchanged_sources():
+    html = '<html><body><p>Registration fee $990.50</p><p>TAC $520.00</p></body></html>'
+    etagged_url = VIC_SOURCES[0].url
+    seen_headers: list[httpx.Headers] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers)
+        if str(request.url) == etagged_url:
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=html, headers={"ETag": '"v1"'})
+        return httpx.Response(200, text=html)
+
+    class CountingExecutor(ThreadPoolExecutor):
+        submitted = 0
+
+        def submit(self, *args, **kwargs):
+            CountingExecutor.submitted += 1
+            return super().submit(*args, **kwargs)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with CountingExecutor(max_workers=2) as executor:
+                first = await scrape_fee_snapshot(client=client, executor=executor)
+                parses_after_first = CountingExecutor.submitted
+                second = await scrape_fee_snapshot(client=client, executor=executor, previous=first)
+                return first, second, parses_after_first
+
+    first, second, parses_after_first = asyncio.run(scenario())
+
+    assert parses_after_first == len(VIC_SOURCES)
+    assert CountingExecutor.submitted == parses_after_first
+    assert first.source_state[etagged_url].etag == '"v1"'
+    assert second.light_vehicle_fee == first.light_vehicle_fee
+    assert second.source_state == first.source_state
+    assert all(timing["reused"] == 1 for timing in second.source_timings.values())
+    assert any(headers.get("if-none-match") == '"v1"' for headers in seen_headers)
@@ -0,0 +1,46 @@
+from vic_rego_estimator.models.schemas import ToolEnvelope
+from vic_rego_estimator.serialization import json_bytes, render_tool_result
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+from vic_rego_estimator.tools.estimator import estimate_registration_cost
+from vic_rego_estimator.tools.normalize import normalize_vehicle_request
+
+
+def _envelope_bytes(envelope: ToolEnvelope) -> bytes:
+    # The previous path: model_dump, ToolEnvelope validation, then JSONResponse encoding.
+    return json_bytes(
+        {
+            "content": [{"type": "text", "text": envelope.content}],
+            "structuredContent": envelope.structuredContent,
+            "meta": envelope.meta,
+        }
+    )
+
+
+def test_render_tool_result_matches_model_dump_encoding_byte_for_byte():
+    snapshot = fallback_snapshot()
+    normalized = normalize_vehicle_request(
+        {
+            "transaction_type": "transfer",
+            "vehicle_category": "passenger_car",
+            "market_value_aud": 12345.678,
+            "make": "Škoda",
+            "concession_flags": {"pensioner": True},
+            "manual_overrides": {"tac_charge": 12.5},
+        }
+    )
+    estimate = estimate_registration_cost(normalized, snapshot)
+    meta = {"data_freshness": {"status": "snapshot", "last_refresh": snapshot.refreshed_at.isoformat()}}
+    structured = {"estimate": estimate, "normalizedRequest": normalized, "snapshot": snapshot, "rows": [{"index": 0}]}
+
+    expected = _envelope_bytes(
+        ToolEnvelope(
+            content="Estimated – “quoted”\n",
+            structuredContent={
+                key: value.model_dump(mode="json") if hasattr(value, "model_dump") else value
+                for key, value in structured.items()
+            },
+            meta=meta,
+        )
+    )
+
+    assert render_tool_result("Estimated – “quoted”\n", structured, meta) == expected
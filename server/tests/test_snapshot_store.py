@@ -0,0 +1,535 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import azure.storage.blob.aio as blob_aio
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceExistsError,
+    ResourceNotFoundError,
+    ResourceNotModifiedError,
+)
+
+from vic_rego_estimator.models.schemas import SourceState
+from vic_rego_estimator.storage import snapshot_store
+from vic_rego_estimator.storage.refresher import SnapshotRefresher
+from vic_rego_estimator.storage.snapshot_store import (
+    AzureBlobSnapshotBackend,
+    LocalFileSnapshotBackend,
+    SnapshotNotModified,
+    SnapshotStore,
+    fallback_snapshot,
+)
+
+
+class FakeBackend:
+    def __init__(self) -> None:
+        self.snapshot = fallback_snapshot()
+        self.etag = '"v1"'
+        self.reads: list[str | None] = []
+
+    async def open(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def read(self, etag: str | None = None):
+        self.reads.append(etag)
+        if etag == self.etag:
+            raise SnapshotNotModified()
+        return self.snapshot.model_dump_json().encode("utf-8"), self.etag
+
+    async def write(self, payload: bytes) -> str | None:
+        self.etag = '"uploaded"'
+        return self.etag
+
+
+def test_warm_load_is_served_from_memory():
+    async def scenario():
+        backend = FakeBackend()
+        store = SnapshotStore(backend=backend, ttl_seconds=3600)
+        first = await store.load()
+        second = await store.load()
+        return backend, store, first, second
+
+    backend, store, first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert len(backend.reads) == 1
+    assert store.version == 1
+
+
+def test_expired_cache_revalidates_with_etag_in_background():
+    async def scenario():
+        backend = FakeBackend()
+        store = SnapshotStore(backend=backend, ttl_seconds=0)
+        first = await store.load()
+        assert await store.load() is first
+        await store._refresh_task
+        return backend, store, first
+
+    backend, store, first = asyncio.run(scenario())
+
+    assert backend.reads[-1] == '"v1"'
+    assert store.version == 1
+
+
+def test_changed_blob_is_swapped_in_and_bumps_version():
+    async def scenario():
+        backend = FakeBackend()
+        store = SnapshotStore(backend=backend, ttl_seconds=0)
+        await store.load()
+        backend.snapshot = backend.snapshot.model_copy(
+            update={"refreshed_at": datetime(2030, 1, 1, tzinfo=timezone.utc)}
+        )
+        backend.etag = '"v2"'
+        await store.load()
+        await store._refresh_task
+        return store, await store.load()
+
+    store, snapshot = asyncio.run(scenario())
+
+    assert snapshot.refreshed_at.year == 2030
+    assert store.version == 2
+
+
+def test_save_updates_cache_without_read():
+    async def scenario():
+        backend = FakeBackend()
+        store = SnapshotStore(backend=backend, ttl_seconds=3600)
+        snapshot = fallback_snapshot()
+        await store.save(snapshot)
+        return backend, snapshot, await store.load()
+
+    backend, saved, loaded = asyncio.run(scenario())
+
+    assert loaded is saved
+    assert backend.reads == []
+
+
+class SlowReadBackend(FakeBackend):
+    async def read(self, etag: str | None = None):
+        await asyncio.sleep(0.01)
+        return await super().read(etag)
+
+
+def test_concurrent_cold_loads_share_one_backend_read():
+    async def scenario():
+        backend = SlowReadBackend()
+        store = SnapshotStore(backend=backend, ttl_seconds=3600)
+        return backend, await asyncio.gather(*(store.load() for _ in range(5)))
+
+    backend, loaded = asyncio.run(scenario())
+
+    assert backend.reads == [None]
+    assert all(snapshot is loaded[0] for snapshot in loaded)
+
+
+def test_expired_cache_without_backend_is_stamped_instead_of_rechecked():
+    async def scenario():
+        store = SnapshotStore(backend=None, ttl_seconds=0)
+        assert await store.load() is None
+        await store.save(fallback_snapshot())
+        checked_at = store._checked_at
+        await store.load()
+        first_task = store._refresh_task
+        await first_task
+        stamped = store._checked_at > checked_at
+        store._ttl_seconds = 3600
+        await store.load()
+        return stamped, first_task, store._refresh_task
+
+    stamped, first_task, later_task = asyncio.run(scenario())
+
+    assert stamped
+    assert later_task is first_task
+
+
+def test_local_file_backend_round_trip(tmp_path):
+    async def scenario():
+        path = tmp_path / "vic" / "latest.json"
+        writer = SnapshotStore(backend=LocalFileSnapshotBackend(path))
+        assert await writer.load() is None
+        await writer.save(fallback_snapshot())
+
+        reader = SnapshotStore(backend=LocalFileSnapshotBackend(path))
+        return await reader.load()
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot is not None
+    assert snapshot.light_vehicle_fee["12"] == 930.0
+
+
+def test_local_file_backend_reports_not_modified(tmp_path):
+    async def scenario():
+        backend = LocalFileSnapshotBackend(tmp_path / "latest.json")
+        etag = await backend.write(b"{}")
+        try:
+            await backend.read(etag)
+        except SnapshotNotModified:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+
+
+class FakeBlobClient:
+    def __init__(self) -> None:
+        self.data: bytes | None = None
+        self.etag: str | None = None
+        self.leased = False
+        self.uploads = 0
+        self.download_kwargs: list[dict] = []
+
+    async def download_blob(self, **kwargs):
+        self.download_kwargs.append(kwargs)
+        if self.data is None:
+            raise ResourceNotFoundError("BlobNotFound")
+        if kwargs.get("etag") == self.etag:
+            raise ResourceNotModifiedError("Not Modified")
+        return FakeDownloader(self.data, self.etag)
+
+    async def upload_blob(self, payload: bytes, overwrite: bool = False):
+        if self.data is not None and not overwrite:
+            raise ResourceExistsError("BlobAlreadyExists")
+        self.data = payload
+        self.uploads += 1
+        self.etag = f'"v{self.uploads}"'
+        return {"etag": self.etag}
+
+
+class FakeDownloader:
+    def __init__(self, data: bytes, etag: str | None) -> None:
+        self._data = data
+        self.properties = SimpleNamespace(etag=etag)
+
+    async def readall(self) -> bytes:
+        return self._data
+
+
+class FakeBlobService:
+    def __init__(self) -> None:
+        self.blobs: dict[str, FakeBlobClient] = {}
+        self.closed = False
+
+    def get_blob_client(self, container: str, blob: str) -> FakeBlobClient:
+        return self.blobs.setdefault(f"{container}/{blob}", FakeBlobClient())
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBlobLeaseClient:
+    durations: list[int] = []
+
+    def __init__(self, client: FakeBlobClient) -> None:
+        self._client = client
+
+    async def acquire(self, lease_duration: int) -> None:
+        if self._client.leased:
+            error = HttpResponseError("LeaseAlreadyPresent")
+            error.status_code = 409
+            raise error
+        self._client.leased = True
+        self.durations.append(lease_duration)
+
+    async def renew(self) -> None:
+        assert self._client.leased
+
+    async def release(self) -> None:
+        self._client.leased = False
+
+
+def _azure_backend(monkeypatch) -> tuple[AzureBlobSnapshotBackend, FakeBlobService]:
+    monkeypatch.setattr(blob_aio, "BlobLeaseClient", FakeBlobLeaseClient)
+    monkeypatch.setattr(FakeBlobLeaseClient, "durations", [])
+    service = FakeBlobService()
+    backend = AzureBlobSnapshotBackend("UseDevelopmentStorage=true", container="fees", blob_name="vic/latest.json")
+    # Pre-seed the clients so open() never builds a real BlobServiceClient.
+    backend._service = service
+    backend._client = service.get_blob_client(container="fees", blob="vic/latest.json")
+    return backend, service
+
+
+def test_azure_blob_backend_round_trip_and_conditional_reads(monkeypatch):
+    backend, service = _azure_backend(monkeypatch)
+
+    async def scenario():
+        writer = SnapshotStore(backend=backend)
+        assert await writer.load() is None
+        await writer.save(fallback_snapshot())
+
+        reader = SnapshotStore(backend=backend, ttl_seconds=0)
+        snapshot = await reader.load()
+        assert await reader.load() is snapshot
+        await reader._refresh_task
+        try:
+            await backend.read(backend._client.etag)
+        except SnapshotNotModified:
+            not_modified = True
+        else:
+            not_modified = False
+        await backend.close()
+        return snapshot, reader.version, not_modified
+
+    snapshot, version, not_modified = asyncio.run(scenario())
+
+    blob = service.blobs["fees/vic/latest.json"]
+    assert snapshot is not None
+    assert snapshot.light_vehicle_fee["12"] == 930.0
+    assert version == 1
+    assert not_modified
+    assert blob.download_kwargs[-1] == {"etag": blob.etag, "match_condition": MatchConditions.IfModified}
+    assert service.closed
+    assert backend._service is None
+
+
+def test_azure_blob_backend_leases_a_sibling_lock_blob(monkeypatch):
+    backend, service = _azure_backend(monkeypatch)
+
+    async def scenario():
+        await backend.write(b"{}")
+        first = await backend.acquire_lease(ttl_seconds=300)
+        second = await backend.acquire_lease(ttl_seconds=1)
+        await backend.renew_lease(first)
+        await backend.release_lease(first)
+        third = await backend.acquire_lease(ttl_seconds=1)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert first is not None
+    assert second is None
+    assert third is not None
+    # Blob leases are clamped to the service's 15-60 second range.
+    assert FakeBlobLeaseClient.durations == [60, 15]
+    assert service.blobs["fees/vic/latest.json.lock"].data == b""
+    assert service.blobs["fees/vic/latest.json"].data == b"{}"
+
+
+def test_concurrent_refreshes_share_one_scrape(tmp_path):
+    calls = 0
+
+    async def producer():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return fallback_snapshot()
+
+    async def scenario():
+        store = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json"))
+        results = await asyncio.gather(*(store.refresh(producer) for _ in range(5)))
+        return store, results
+
+    store, results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert store.current is results[0]
+    assert asyncio.run(LocalFileSnapshotBackend(tmp_path / "latest.json").acquire_lease(ttl_seconds=60)) is not None
+
+
+def test_close_cancels_an_in_flight_refresh_before_closing_the_backend(tmp_path):
+    events = []
+
+    class RecordingBackend(LocalFileSnapshotBackend):
+        async def write(self, payload):
+            events.append("write")
+            return await super().write(payload)
+
+        async def release_lease(self, lease):
+            events.append("release")
+            await super().release_lease(lease)
+
+        async def close(self):
+            events.append("close")
+
+    async def producer():
+        await asyncio.sleep(3600)
+        return fallback_snapshot()
+
+    async def scenario():
+        store = SnapshotStore(backend=RecordingBackend(tmp_path / "latest.json"))
+        caller = asyncio.create_task(store.refresh(producer))
+        await asyncio.sleep(0.05)
+        await store.close()
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        return store
+
+    store = asyncio.run(scenario())
+
+    assert events == ["release", "close"]
+    assert store._inflight_refresh.cancelled()
+
+
+def test_refresh_skips_scrape_while_another_process_holds_the_lease(tmp_path):
+    path = tmp_path / "latest.json"
+    calls = 0
+
+    async def producer():
+        nonlocal calls
+        calls += 1
+        return fallback_snapshot()
+
+    async def scenario():
+        await SnapshotStore(backend=LocalFileSnapshotBackend(path)).save(fallback_snapshot())
+        other_process = LocalFileSnapshotBackend(path)
+        lease = await other_process.acquire_lease(ttl_seconds=60)
+        store = SnapshotStore(backend=LocalFileSnapshotBackend(path))
+        snapshot = await store.refresh(producer)
+        await other_process.release_lease(lease)
+        return snapshot
+
+    snapshot = asyncio.run(scenario())
+
+    assert calls == 0
+    assert snapshot is not None
+
+
+def test_lockfile_is_exclusive_until_released_or_its_holder_exits(tmp_path):
+    path = tmp_path / "latest.json"
+
+    async def scenario():
+        backend = LocalFileSnapshotBackend(path)
+        held = await backend.acquire_lease(ttl_seconds=0)
+        contended = await backend.acquire_lease(ttl_seconds=0)
+        await backend.release_lease(held)
+        reacquired = await backend.acquire_lease(ttl_seconds=0)
+        # A crashed holder never releases; the kernel drops the lock with its file.
+        os.close(reacquired.fd)
+        after_crash = await LocalFileSnapshotBackend(path).acquire_lease(ttl_seconds=60)
+        return contended, reacquired, after_crash
+
+    contended, reacquired, after_crash = asyncio.run(scenario())
+
+    assert contended is None
+    assert reacquired is not None
+    assert after_crash is not None
+
+
+def test_only_one_of_many_concurrent_lockers_wins(tmp_path):
+    backends = [LocalFileSnapshotBackend(tmp_path / "latest.json") for _ in range(8)]
+
+    async def scenario():
+        return await asyncio.gather(*(backend.acquire_lease(ttl_seconds=0) for backend in backends))
+
+    leases = asyncio.run(scenario())
+
+    assert sum(lease is not None for lease in leases) == 1
+
+
+def test_lease_is_renewed_while_a_slow_refresh_runs(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot_store.settings, "snapshot_refresh_lease_seconds", 0.3)
+    renewals = []
+    released = []
+
+    class RenewalRecordingBackend(LocalFileSnapshotBackend):
+        async def renew_lease(self, lease):
+            renewals.append(lease)
+
+        async def release_lease(self, lease):
+            released.append(len(renewals))
+            await super().release_lease(lease)
+
+    async def producer():
+        await asyncio.sleep(0.5)
+        return fallback_snapshot()
+
+    async def scenario():
+        store = SnapshotStore(backend=RenewalRecordingBackend(tmp_path / "latest.json"))
+        await store.refresh(producer)
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+
+    assert len(renewals) >= 3
+    # Renewal stops once the lease is released.
+    assert released == [len(renewals)]
+
+
+def test_get_fee_snapshot_serves_fallback_and_wakes_refresher_without_scraping(monkeypatch, tmp_path):
+    import vic_rego_estimator.tools.registry as registry
+
+    calls = 0
+
+    async def scrape(previous):
+        nonlocal calls
+        calls += 1
+        return fallback_snapshot()
+
+    store = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json"))
+    refresher = SnapshotRefresher(store, scrape, interval_seconds=3600, jitter_ratio=0)
+    monkeypatch.setattr(registry, "store", store)
+    monkeypatch.setattr(registry, "refresher", refresher)
+
+    async def scenario():
+        # Park the loop as if a snapshot had just been refreshed.
+        refresher._wake = asyncio.Event()
+        refresher._task = asyncio.create_task(asyncio.sleep(3600))
+        first = await registry._get_snapshot({})
+        woken = refresher._wake.is_set()
+        refresher._task.cancel()
+        return first, woken
+
+    first, woken = asyncio.run(scenario())
+
+    assert calls == 0
+    assert json.loads(first)["meta"]["data_freshness"]["status"] == "fallback"
+    assert woken
+
+
+def test_get_fee_snapshot_keeps_scraper_state_out_of_the_tool_result(monkeypatch, tmp_path):
+    import vic_rego_estimator.tools.registry as registry
+
+    stored = fallback_snapshot().model_copy(
+        update={
+            "source_state": {"https://example.test/fees": SourceState(etag='"v1"', content_sha256="abc")},
+            "source_timings": {"https://example.test/fees": {"fetch_ms": 12.0}},
+        }
+    )
+    path = tmp_path / "latest.json"
+    store = SnapshotStore(backend=LocalFileSnapshotBackend(path))
+    monkeypatch.setattr(registry, "store", store)
+
+    async def scenario():
+        await store.save(stored)
+        return await registry._get_snapshot({})
+
+    snapshot = json.loads(asyncio.run(scenario()))["structuredContent"]["snapshot"]
+
+    assert "source_state" not in snapshot and "source_timings" not in snapshot
+    assert snapshot["transfer_fee"] == stored.transfer_fee
+    assert json.loads(path.read_bytes())["source_state"]["https://example.test/fees"]["etag"] == '"v1"'
+
+
+def test_estimate_batch_serves_fallback_and_wakes_refresher(monkeypatch, tmp_path):
+    import vic_rego_estimator.tools.registry as registry
+
+    async def scrape(previous):
+        return fallback_snapshot()
+
+    store = SnapshotStore(backend=LocalFileSnapshotBackend(tmp_path / "latest.json"))
+    refresher = SnapshotRefresher(store, scrape, interval_seconds=3600, jitter_ratio=0)
+    monkeypatch.setattr(registry, "store", store)
+    monkeypatch.setattr(registry, "refresher", refresher)
+
+    async def scenario():
+        refresher._wake = asyncio.Event()
+        refresher._task = asyncio.create_task(asyncio.sleep(3600))
+        result = await registry._estimate_batch(
+            {"vehicles": [{"transaction_type": "renewal", "vehicle_category": "passenger_car"}]}
+        )
+        woken = refresher._wake.is_set()
+        refresher._task.cancel()
+        return result, woken
+
+    result, woken = asyncio.run(scenario())
+
+    assert json.loads(result)["structuredContent"]["fleetTotals"]["estimated_count"] == 1
+    assert woken
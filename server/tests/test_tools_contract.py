@@ -1,7 +1,10 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
 from vic_rego_estimator.main import app
+import vic_rego_estimator.main as main_module
 
 
 @pytest.fixture
@@ -28,6 +31,44 @@ def test_tools_list(client: TestClient):
     assert all('securitySchemes' in tool for tool in tools)
 
 
+def test_tools_list_is_prerendered_with_etag(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    first = client.post('/mcp', json={"jsonrpc": "2.0", "id": "a", "method": "tools/list"})
+    second = client.post('/mcp', json={"jsonrpc": "2.0", "id": 7, "method": "tools/list"})
+
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.headers["ETag"].startswith('W/"')
+    assert first.json()["id"] == "a"
+    assert second.json()["id"] == 7
+    assert first.json()["result"] == second.json()["result"]
+
+    # POST is never answered with 304; the ETag is informational.
+    revalidated = client.post(
+        '/mcp',
+        headers={"If-None-Match": first.headers["ETag"]},
+        json={"jsonrpc": "2.0", "id": 8, "method": "tools/list"},
+    )
+    assert revalidated.status_code == 200
+    assert revalidated.json()["id"] == 8
+    assert revalidated.json()["result"] == first.json()["result"]
+
+
+def test_initialize_etag_tracks_security_schemes(monkeypatch, client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    monkeypatch.setattr(main_module, "authenticator", None)
+    noauth = client.post('/mcp', json={"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+
+    stale = client.post(
+        '/mcp',
+        headers={"If-None-Match": main_module.STATIC_INITIALIZE[True].etag},
+        json={"jsonrpc": "2.0", "id": 2, "method": "initialize"},
+    )
+
+    assert noauth.headers["ETag"] == main_module.STATIC_INITIALIZE[False].etag
+    assert stale.status_code == 200
+    assert stale.json()["result"]["securitySchemes"] == [{"type": "noauth"}]
+
+
 def test_estimate_transfer_unknown_value(client: TestClient):
     payload = {
         "jsonrpc": "2.0",
@@ -48,3 +89,185 @@ def test_estimate_transfer_unknown_value(client: TestClient):
     estimate = res.json()['result']['structuredContent']['estimate']
     assert estimate['total_max'] >= estimate['total_min']
     assert any(line['key'] == 'motor_vehicle_duty' for line in estimate['line_items'])
+
+
+def test_batch_returns_one_response_per_request(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize"},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+        {
+            "jsonrpc": "2.0",
+            "id": 3,
+            "method": "tools/call",
+            "params": {
+                "name": "estimate_registration_cost",
+                "arguments": {"transaction_type": "renewal", "vehicle_category": "passenger_car"},
+            },
+        },
+        {"jsonrpc": "2.0", "id": 4, "method": "bad/method"},
+        {"jsonrpc": "2.0", "id": 5, "method": "tools/call", "params": {"name": "not_a_real_tool"}},
+        {"jsonrpc": "2.0", "method": "tools/list"},
+    ]
+
+    res = client.post('/mcp', json=batch)
+
+    assert res.status_code == 200
+    responses = {item['id']: item for item in res.json()}
+    assert set(responses) == {1, 2, 3, 4, 5}
+    assert responses[1]['result']['serverInfo']['name'] == 'vic-rego-estimator'
+    assert responses[2]['result']['tools']
+    assert responses[3]['result']['structuredContent']['estimate']['total_min'] > 0
+    assert responses[4]['error']['code'] == -32601
+    assert responses[4]['error']['message'] == 'Unsupported MCP method: bad/method'
+    assert responses[5]['error']['code'] == -32602
+    assert responses[5]['error']['data']['recovery_steps'] == ["Retry using a tool name returned by tools/list."]
+
+
+def test_non_object_batch_entries_are_invalid_requests(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+
+    res = client.post('/mcp', json=[1, "tools/list", {"jsonrpc": "2.0", "id": 1, "method": "bad/method"}])
+
+    assert res.status_code == 200
+    invalid, bad_string, unsupported = res.json()
+    assert invalid['id'] is None and bad_string['id'] is None
+    assert invalid['error']['code'] == bad_string['error']['code'] == -32600
+    assert unsupported['error']['code'] == -32601
+
+
+def test_empty_batch_is_rejected(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+
+    res = client.post('/mcp', json=[])
+
+    assert res.status_code == 400
+
+
+def test_estimate_batch_reports_invalid_rows_inline(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    vehicles = [
+        {"transaction_type": "renewal", "vehicle_category": "passenger_car"},
+        {"transaction_type": "renewal", "vehicle_category": "spaceship"},
+        {"transaction_type": "new_registration", "vehicle_category": "motorcycle", "term_months": 6},
+    ]
+    payload = {
+        "jsonrpc": "2.0",
+        "id": 6,
+        "method": "tools/call",
+        "params": {"name": "estimate_registration_cost_batch", "arguments": {"vehicles": vehicles}},
+    }
+
+    res = client.post('/mcp', json=payload)
+
+    assert res.status_code == 200
+    structured = res.json()['result']['structuredContent']
+    results = structured['results']
+    assert [row['index'] for row in results] == [0, 1, 2]
+    assert 'estimate' in results[0] and 'estimate' in results[2]
+    assert results[1]['error']['fields'][0]['loc'] == ['vehicle_category']
+    totals = structured['fleetTotals']
+    assert totals['vehicle_count'] == 3
+    assert totals['failed_count'] == 1
+    assert totals['total_min'] == round(
+        results[0]['estimate']['total_min'] + results[2]['estimate']['total_min'], 2
+    )
+
+
+def _strict_json(text: str):
+    def reject(constant: str):
+        raise ValueError(f"non-standard JSON constant {constant}")
+
+    return json.loads(text, parse_constant=reject)
+
+
+def test_estimate_batch_rejects_non_finite_numbers_as_strict_json(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    body = (
+        b'{"jsonrpc":"2.0","id":9,"method":"tools/call","params":{"name":"estimate_registration_cost_batch",'
+        b'"arguments":{"vehicles":['
+        b'{"transaction_type":"transfer","vehicle_category":"passenger_car","market_value_aud":NaN},'
+        b'{"transaction_type":"renewal","vehicle_category":"passenger_car","manual_overrides":{"tac_charge":Infinity}},'
+        b'{"transaction_type":"renewal","vehicle_category":"passenger_car",'
+        b'"manual_overrides":{"registration_fee":1e308,"tac_charge":1e308}},'
+        b'{"transaction_type":"renewal","vehicle_category":"passenger_car"}]}}}'
+    )
+
+    res = client.post('/mcp', content=body, headers={"Content-Type": "application/json"})
+
+    assert res.status_code == 200
+    structured = _strict_json(res.text)['result']['structuredContent']
+    results = structured['results']
+    assert results[0]['error']['fields'][0]['loc'] == ['market_value_aud']
+    assert results[1]['error']['fields'][0]['loc'] == ['manual_overrides', 'tac_charge']
+    assert results[2]['error']['message'] == "Estimate total is too large to represent"
+    assert 'estimate' in results[3]
+    assert structured['fleetTotals']['failed_count'] == 3
+
+
+def test_estimate_rejects_non_finite_market_value():
+    main_module.rate_limiter._requests.clear()
+    client = TestClient(app, raise_server_exceptions=False)
+    body = (
+        b'{"jsonrpc":"2.0","id":10,"method":"tools/call","params":{"name":"estimate_registration_cost",'
+        b'"arguments":{"transaction_type":"transfer","vehicle_category":"passenger_car","market_value_aud":Infinity}}}'
+    )
+
+    res = client.post('/mcp', content=body, headers={"Content-Type": "application/json"})
+
+    assert res.status_code == 500
+    assert 'result' not in _strict_json(res.text)
+
+
+@pytest.mark.parametrize("arguments", [{}, {"vehicles": {"transaction_type": "renewal"}}])
+def test_estimate_batch_without_vehicle_list_is_invalid_params(client: TestClient, arguments):
+    main_module.rate_limiter._requests.clear()
+    call = {
+        "jsonrpc": "2.0",
+        "id": 11,
+        "method": "tools/call",
+        "params": {"name": "estimate_registration_cost_batch", "arguments": arguments},
+    }
+
+    single = client.post('/mcp', json=call)
+    batched = client.post('/mcp', json=[call])
+
+    assert single.status_code == 422
+    assert single.json()['detail'] == "estimate_registration_cost_batch requires a 'vehicles' list"
+    assert batched.json()[0]['error']['code'] == -32602
+
+
+def test_estimate_batch_caps_vehicle_count(monkeypatch, client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    monkeypatch.setattr(main_module.settings, "mcp_max_batch_vehicles", 2)
+    vehicle = {"transaction_type": "renewal", "vehicle_category": "passenger_car"}
+    call = {
+        "jsonrpc": "2.0",
+        "id": 12,
+        "method": "tools/call",
+        "params": {"name": "estimate_registration_cost_batch", "arguments": {"vehicles": [vehicle] * 3}},
+    }
+
+    res = client.post('/mcp', json=call)
+
+    assert res.status_code == 422
+    assert "at most 2 vehicles" in res.json()['detail']
+
+
+def test_estimate_batch_fleet_total_overflow_is_invalid_params(client: TestClient):
+    main_module.rate_limiter._requests.clear()
+    # Each vehicle total is finite; only their sum overflows.
+    vehicle = {"transaction_type": "renewal", "vehicle_category": "passenger_car", "manual_overrides": {"tac_charge": 1e308}}
+    call = {
+        "jsonrpc": "2.0",
+        "id": 13,
+        "method": "tools/call",
+        "params": {"name": "estimate_registration_cost_batch", "arguments": {"vehicles": [vehicle, vehicle]}},
+    }
+
+    single = client.post('/mcp', json=call)
+    batched = client.post('/mcp', json=[call])
+
+    assert single.status_code == 422
+    assert single.json()['detail'].startswith("Fleet total is too large to represent")
+    assert batched.json()[0]['error']['code'] == -32602
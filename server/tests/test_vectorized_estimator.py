@@ -0,0 +1,119 @@
+import itertools
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vic_rego_estimator.storage.snapshot_store import fallback_snapshot
+from vic_rego_estimator.tools.estimator import estimate_registration_cost
+from vic_rego_estimator.tools.normalize import normalize_vehicle_request
+from vic_rego_estimator.tools.vectorized import (
+    CATEGORIES,
+    TERMS,
+    TRANSACTION_TYPES,
+    estimate_registration_cost_columns,
+    vehicle_columns,
+)
+
+COLUMN_BY_LINE = {
+    "registration_fee": ("registration_fee", "registration_fee"),
+    "tac_charge": ("tac_charge", "tac_charge"),
+    "transfer_fee": ("transfer_fee", "transfer_fee"),
+    "motor_vehicle_duty": ("duty_min", "duty_max"),
+    "number_plate_fee": ("number_plate_fee", "number_plate_fee"),
+    "business_admin": ("business_admin", "business_admin"),
+}
+
+
+def _payloads() -> list[dict]:
+    rng = random.Random(20240601)
+    market_values = [None, 0, 68999.99, 69000, 99999.5, 100000, 1234.565, 45000.005]
+    market_values += [round(rng.uniform(1000, 250000), 2) for _ in range(40)]
+    concession_sets = [{}, {"pensioner": True}, {"veteran": True, "primary_producer": True}, {"pensioner": False}]
+
+    payloads = []
+    for category, term, transaction, use_type, concessions in itertools.product(
+        CATEGORIES, TERMS, TRANSACTION_TYPES, ["private", "business"], concession_sets
+    ):
+        payloads.append(
+            {
+                "vehicle_category": category,
+                "term_months": term,
+                "transaction_type": transaction,
+                "use_type": use_type,
+                "concession_flags": concessions,
+                "market_value_aud": rng.choice(market_values),
+            }
+        )
+    return payloads
+
+
+def test_vectorized_engine_matches_scalar_estimator():
+    snapshot = fallback_snapshot()
+    requests = [normalize_vehicle_request(payload) for payload in _payloads()]
+
+    columns = estimate_registration_cost_columns(snapshot, **vehicle_columns(requests))
+
+    assert len(columns) == len(requests)
+    for index, request in enumerate(requests):
+        scalar = estimate_registration_cost(request, snapshot)
+        lines = {line.key: line for line in scalar.line_items}
+        for key, (min_column, max_column) in COLUMN_BY_LINE.items():
+            amount_min = float(getattr(columns, min_column)[index])
+            amount_max = float(getattr(columns, max_column)[index])
+            if key in lines:
+                assert (amount_min, amount_max) == (lines[key].amount_min, lines[key].amount_max), (key, request)
+            else:
+                assert (amount_min, amount_max) == (0.0, 0.0), (key, request)
+        assert float(columns.total_min[index]) == scalar.total_min
+        assert float(columns.total_max[index]) == scalar.total_max
+
+
+def test_unknown_category_is_rejected():
+    with pytest.raises(ValueError, match="spaceship"):
+        estimate_registration_cost_columns(
+            fallback_snapshot(),
+            vehicle_category=np.array(["spaceship"]),
+            term_months=np.array([12]),
+            transaction_type=np.array(["renewal"]),
+        )
+
+
+@pytest.mark.parametrize("code", [-1, len(CATEGORIES)])
+def test_out_of_range_category_codes_are_rejected(code):
+    with pytest.raises(ValueError, match="vehicle_category codes"):
+        estimate_registration_cost_columns(
+            fallback_snapshot(),
+            vehicle_category=np.array([0, code]),
+            term_months=np.array([12, 12]),
+            transaction_type=np.array(["renewal", "renewal"]),
+        )
+
+
+@pytest.mark.parametrize("term", [12.7, 3.5, float("nan")])
+def test_non_integral_terms_are_rejected(term):
+    with pytest.raises(ValueError, match="term_months must be one of"):
+        estimate_registration_cost_columns(
+            fallback_snapshot(),
+            vehicle_category=np.array(["passenger_car", "passenger_car"]),
+            term_months=np.array([12.0, term]),
+            transaction_type=np.array(["renewal", "renewal"]),
+        )
+
+
+def test_integral_float_terms_are_accepted():
+    columns = estimate_registration_cost_columns(
+        fallback_snapshot(),
+        vehicle_category=np.array(["passenger_car"]),
+        term_months=np.array([12.0]),
+        transaction_type=np.array(["renewal"]),
+    )
+    reference = estimate_registration_cost_columns(
+        fallback_snapshot(),
+        vehicle_category=np.array(["passenger_car"]),
+        term_months=np.array([12]),
+        transaction_type=np.array(["renewal"]),
+    )
+
+    assert float(columns.total_min[0]) == float(reference.total_min[0])